@@ -0,0 +1,37 @@
+"""
+The `kumanui` console command, installed by `pip install -e .`.
+
+This package is only the entry point. The tools are the standalone scripts
+in _assets/scripts/, which import each other by flat name
+(`from token_utils import load_graph`) so that they run as plain scripts.
+Importing `kumanui` leaves sys.path alone; `main()` puts the scripts
+directory first on sys.path when the command runs and hands over to the same
+dispatcher as `python3 _assets/scripts/kumanui.py`.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+# Generators resolve tokens/ and dist/ from their own location, so the
+# install has to be editable and this path is the checkout's.
+SCRIPTS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"
+)
+
+__all__ = ["SCRIPTS_DIR", "main"]
+
+
+def main(argv: list[str] | None = None) -> int:
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    import importlib.util
+
+    # The dispatcher is also named kumanui.py; load it under another name so
+    # it does not replace this package in sys.modules
+    path = os.path.join(SCRIPTS_DIR, "kumanui.py")
+    spec = importlib.util.spec_from_file_location("_kumanui_cli", path)
+    cli = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cli)
+    return cli.main(argv)
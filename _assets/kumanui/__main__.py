@@ -0,0 +1,5 @@
+"""`python -m kumanui` runs the command line entry point."""
+
+from kumanui import main
+
+raise SystemExit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Generate themes for many token files (one per tenant) on a process pool.
+
+Each input file is a complete colors.yaml-style token file. Outputs are
+namespaced by tenant name, under dist/tenants/ so that no tenant (say one
+called css) writes over the repository's own dist/ artifacts:
+
+  dist/tenants/<tenant>/kumanui.css
+  dist/tenants/<tenant>/Kumanui.terminal   (with --formats css,terminal)
+  dist/tenants/<tenant>/preview.svg        (with --formats preview; preview-png adds .png)
+
+The tenant name is the file stem, or the parent directory name for files
+called colors.yaml (tenants/acme/colors.yaml -> acme). A file that fails to
+load or render is reported in the summary and does not stop the run.
+
+Usage:
+  python3 _assets/scripts/kumanui.py batch tenants/
+  python3 _assets/scripts/kumanui.py batch 'tenants/*.yaml' --out build/themes -j 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_OUT = ROOT / "dist/tenants"
+FORMATS = ("css", "terminal", "preview", "preview-png")
+TOKEN_SUFFIXES = (".yaml", ".yml")
+
+
+class TenantJob(NamedTuple):
+    tenant: str
+    source: str
+    out_dir: str
+    formats: tuple[str, ...]
+    font_name: str
+    font_size: float
+
+
+class TenantResult(NamedTuple):
+    tenant: str
+    source: str
+    seconds: float
+    outputs: list[str]
+    error: str | None
+
+
+def tenant_name(path: Path) -> str:
+    return path.parent.name if path.stem == "colors" else path.stem
+
+
+def find_token_files(patterns: list[str]) -> list[Path]:
+    """Expand directories (recursively) and globs into token file paths."""
+    found: dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(p for p in path.rglob("*") if p.suffix in TOKEN_SUFFIXES)
+        else:
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True))
+        for match in matches:
+            if match.is_file():
+                found[match] = None
+    return list(found)
+
+
+def build_tenant(job: TenantJob) -> TenantResult:
+    """Render every requested format for one tenant; never raises."""
+    start = time.perf_counter()
+    outputs: list[str] = []
+    try:
+        from token_utils import load_graph
+
+        graph = load_graph(Path(job.source))
+        out_dir = Path(job.out_dir) / job.tenant
+        if "css" in job.formats:
+            from generate_css import write_css
+
+            outputs.append(str(write_css(graph, out_dir / "kumanui.css")))
+        if "terminal" in job.formats:
+            from generate_macos_terminal import write_profile
+
+            out = write_profile(
+                graph, out_dir / "Kumanui.terminal", job.font_name, job.font_size
+            )
+            outputs.append(str(out))
+        if "preview" in job.formats or "preview-png" in job.formats:
+            from preview import write_preview
+
+            png = "preview-png" in job.formats
+            outputs += map(str, write_preview(graph, out_dir / "preview.svg", png))
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return TenantResult(
+        job.tenant, job.source, time.perf_counter() - start, outputs, error
+    )
+
+
+def run_batch(jobs: list[TenantJob], workers: int | None = None) -> list[TenantResult]:
+    if not jobs:
+        return []
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [build_tenant(job) for job in jobs]
+    # Several tenants per task keeps pickling/IPC overhead small for thousands
+    chunksize = max(1, len(jobs) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(build_tenant, jobs, chunksize=chunksize))
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("inputs", nargs="+", help="Token files, directories or globs")
+    ap.add_argument(
+        "--out", default=str(DEFAULT_OUT), help="Output root (default: dist/tenants/)"
+    )
+    ap.add_argument(
+        "--formats",
+        default="css",
+        help=f"Comma-separated outputs: {', '.join(FORMATS)} (default: css)",
+    )
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes")
+    ap.add_argument("--font-name", default="SF Mono Terminal")
+    ap.add_argument("--font-size", type=float, default=12.0)
+    ap.add_argument("--summary", help="Also write the summary as JSON to this path")
+
+
+def run(args: argparse.Namespace) -> int:
+    formats = tuple(f.strip() for f in args.formats.split(",") if f.strip())
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        print(f"ERROR: unknown format(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    jobs: list[TenantJob] = []
+    duplicates: list[TenantResult] = []
+    seen: dict[str, Path] = {}
+    for path in find_token_files(args.inputs):
+        tenant = tenant_name(path)
+        if tenant in seen:
+            error = f"duplicate tenant name (see {seen[tenant]})"
+            duplicates.append(TenantResult(tenant, str(path), 0.0, [], error))
+            continue
+        seen[tenant] = path
+        jobs.append(
+            TenantJob(
+                tenant, str(path), args.out, formats, args.font_name, args.font_size
+            )
+        )
+
+    results = run_batch(jobs, args.jobs) + duplicates
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if r.error]
+    rate = len(results) / elapsed if elapsed > 0 else 0.0
+
+    for r in failed:
+        print(f"[batch] FAILED {r.tenant} ({r.source}): {r.error}", file=sys.stderr)
+    print(
+        f"[batch] {len(results) - len(failed)} ok, {len(failed)} failed, "
+        f"{len(results)} themes in {elapsed:.2f} s ({rate:.1f} themes/sec)"
+    )
+
+    if args.summary:
+        summary = {
+            "themes": len(results),
+            "ok": len(results) - len(failed),
+            "failed": len(failed),
+            "seconds": round(elapsed, 4),
+            "themes_per_sec": round(rate, 2),
+            "failures": [
+                {"tenant": r.tenant, "source": r.source, "error": r.error}
+                for r in failed
+            ],
+        }
+        out = Path(args.summary)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Generate themes for many token files")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
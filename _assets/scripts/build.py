@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Build Kumanui resources in a single process.
+
+Tokens are parsed and compiled once, then the build targets run as a small
+dependency graph on a thread pool so independent targets overlap:
+
+  css        dist/css/kumanui.css
+  css-min    dist/css/kumanui.min.css (+ .gz, .br)
+  terminal   dist/macos-terminal/Kumanui.terminal
+  swatches   _assets/swatches/*.svg
+  readme     README.md generated blocks (after swatches)
+  package    dist/kumanui-<version>.zip (after css, css-min, terminal, readme)
+
+css, css-min, terminal and readme are incremental: build_cache.py records which token
+paths each one read and skips it while those tokens, its generator code and
+its outputs are unchanged (pass --force to rebuild anyway).
+
+With --watch the process stays alive after the first build, waits for edits
+to the token file (inotify, or polling with --poll) and rebuilds; the cache
+limits each rebuild to the targets whose token inputs changed.
+
+Usage:
+  python3 _assets/scripts/kumanui.py build            # css terminal swatches readme
+  python3 _assets/scripts/kumanui.py build css readme
+  python3 _assets/scripts/kumanui.py build package    # full release build
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from build_cache import BuildCache
+from token_utils import TokenGraph, TokenGraphError, TrackingGraph, load_graph
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPTS_DIR.parents[1]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+DIST_DIR = ROOT / "dist"
+CSS_OUT = DIST_DIR / "css/kumanui.css"
+CSS_MIN_OUT = DIST_DIR / "css/kumanui.min.css"
+TERMINAL_OUT = DIST_DIR / "macos-terminal/Kumanui.terminal"
+VERSION_PATH = ROOT / "VERSION"
+PACKAGE_DOCS = ["README.md", "build.md", "LICENSE"]
+
+DEFAULT_FONT_NAME = "SF Mono Terminal"
+DEFAULT_FONT_SIZE = 12.0
+
+
+class BuildContext(NamedTuple):
+    graph: TokenGraph
+    font_name: str
+    font_size: float
+    package_name: str | None
+    cache: BuildCache | None = None
+
+
+class Target(NamedTuple):
+    name: str
+    deps: tuple[str, ...]
+    run: Callable[[BuildContext], str]
+    # Files hashed into the cache key; targets without inputs are never cached
+    inputs: tuple[Path, ...] = ()
+    outputs: tuple[Path, ...] = ()
+    options: Callable[[BuildContext], object] | None = None
+
+
+class TargetResult(NamedTuple):
+    name: str
+    status: str  # "ok", "cached", "failed" or "skipped"
+    seconds: float
+    detail: str
+
+
+def _rel(path: Path) -> str:
+    try:
+        return str(path.relative_to(ROOT))
+    except ValueError:
+        return str(path)
+
+
+def build_css(ctx: BuildContext) -> str:
+    from generate_css import write_css
+
+    return _rel(write_css(ctx.graph, CSS_OUT))
+
+
+def build_css_min(ctx: BuildContext) -> str:
+    from generate_css import generate_css, write_css_min
+
+    full = len(generate_css(ctx.graph).encode("utf-8"))
+    variants = write_css_min(ctx.graph, CSS_MIN_OUT)
+    labels = {".css": "min", ".gz": "gz", ".br": "br"}
+    sizes = ", ".join(
+        f"{labels[p.suffix]} {n} B (-{100.0 * (full - n) / full:.0f}%)"
+        for p, n in variants
+    )
+    return f"{_rel(CSS_MIN_OUT)} [{sizes}]"
+
+
+def build_terminal(ctx: BuildContext) -> str:
+    from generate_macos_terminal import write_profile
+
+    return _rel(write_profile(ctx.graph, TERMINAL_OUT, ctx.font_name, ctx.font_size))
+
+
+def build_swatches(ctx: BuildContext) -> str:
+    from generate_readme import write_swatches
+
+    return f"{len(write_swatches(ctx.graph))} swatches"
+
+
+def build_readme(ctx: BuildContext) -> str:
+    from generate_readme import README_PATH, load_version, render_readme
+
+    current = README_PATH.read_text(encoding="utf-8")
+    readme = render_readme(ctx.graph, current, load_version(VERSION_PATH))
+    if readme == current:
+        return "up to date"
+    README_PATH.write_text(readme, encoding="utf-8")
+    return _rel(README_PATH)
+
+
+def build_package(ctx: BuildContext) -> str:
+    """Zip docs, the assets they reference, tokens and generated resources."""
+    version = VERSION_PATH.read_text(encoding="utf-8").split("\n", 1)[0].strip()
+    out = DIST_DIR / (ctx.package_name or f"kumanui-{version or '0.0.0'}.zip")
+
+    members: dict[str, Path] = {}
+    asset_re = re.compile(r'_assets/[^"\) ]+')
+    for doc in PACKAGE_DOCS:
+        path = ROOT / doc
+        members[doc] = path
+        for asset in asset_re.findall(path.read_text(encoding="utf-8")):
+            if (ROOT / asset).is_file():
+                members[asset] = ROOT / asset
+    trees = [
+        ("tokens", "tokens"),
+        ("dist/css", "css"),
+        ("dist/macos-terminal", "macos-terminal"),
+    ]
+    for src, dest in trees:
+        base = ROOT / src
+        if not base.is_dir():
+            continue
+        for path in base.rglob("*"):
+            if path.is_file():
+                members[f"{dest}/{path.relative_to(base).as_posix()}"] = path
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for arcname in sorted(members):
+            zf.write(members[arcname], arcname)
+    return _rel(out)
+
+
+def _code(module: str) -> tuple[Path, ...]:
+    return (SCRIPTS_DIR / module, SCRIPTS_DIR / "token_utils.py")
+
+
+TARGETS: dict[str, Target] = {
+    t.name: t
+    for t in (
+        Target(
+            "css",
+            (),
+            build_css,
+            inputs=_code("generate_css.py")
+            + (SCRIPTS_DIR / "color_math.py", SCRIPTS_DIR / "exporters/model.py"),
+            outputs=(CSS_OUT,),
+        ),
+        Target(
+            "css-min",
+            (),
+            build_css_min,
+            inputs=_code("generate_css.py")
+            + (SCRIPTS_DIR / "color_math.py", SCRIPTS_DIR / "exporters/model.py"),
+            outputs=(
+                CSS_MIN_OUT,
+                Path(f"{CSS_MIN_OUT}.gz"),
+                Path(f"{CSS_MIN_OUT}.br"),
+            ),
+            # The .br sibling exists only with brotli installed
+            options=lambda ctx: [importlib.util.find_spec("brotli") is not None],
+        ),
+        Target(
+            "terminal",
+            (),
+            build_terminal,
+            inputs=_code("generate_macos_terminal.py")
+            + (
+                SCRIPTS_DIR / "nskeyed.py",
+                SCRIPTS_DIR / "sRGB_IEC61966-2.1.icc",
+                SCRIPTS_DIR / "exporters/model.py",
+                SCRIPTS_DIR / "color_math.py",
+            ),
+            outputs=(TERMINAL_OUT,),
+            options=lambda ctx: [ctx.font_name, ctx.font_size],
+        ),
+        Target("swatches", (), build_swatches),
+        Target(
+            "readme",
+            ("swatches",),
+            build_readme,
+            inputs=_code("generate_readme.py")
+            + (
+                SCRIPTS_DIR / "color_math.py",
+                SCRIPTS_DIR / "exporters/model.py",
+                VERSION_PATH,
+            ),
+            outputs=(ROOT / "README.md",),
+        ),
+        Target("package", ("css", "css-min", "terminal", "readme"), build_package),
+    )
+}
+DEFAULT_TARGETS = ["css", "css-min", "terminal", "swatches", "readme"]
+
+
+def expand_targets(names: list[str], *, with_deps: bool = True) -> list[str]:
+    """Return the requested targets (plus dependencies) in dependency order."""
+    ordered: list[str] = []
+
+    def visit(name: str) -> None:
+        if name in ordered:
+            return
+        if with_deps:
+            for dep in TARGETS[name].deps:
+                visit(dep)
+        ordered.append(name)
+
+    for name in names:
+        visit(name)
+    return ordered
+
+
+def run_targets(
+    ctx: BuildContext, names: list[str], *, jobs: int | None = None
+) -> list[TargetResult]:
+    """Run targets on a thread pool, starting each once its deps succeed.
+
+    A failed target does not abort the build; targets depending on it are
+    reported as skipped. Targets found fresh in ``ctx.cache`` are not run.
+    """
+    selected = set(names)
+    pending = {n: {d for d in TARGETS[n].deps if d in selected} for n in names}
+    results: dict[str, TargetResult] = {}
+
+    def timed(name: str) -> TargetResult:
+        target = TARGETS[name]
+        cache = ctx.cache if target.inputs else None
+        options = target.options(ctx) if target.options else None
+        start = time.perf_counter()
+        try:
+            if cache and cache.is_fresh(
+                name, ctx.graph, target.inputs, target.outputs, options
+            ):
+                detail, status = "unchanged", "cached"
+            else:
+                tracked = TrackingGraph(ctx.graph)
+                detail = target.run(ctx._replace(graph=tracked))
+                status = "ok"
+                if cache:
+                    cache.record(
+                        name,
+                        ctx.graph,
+                        tracked.reads,
+                        target.inputs,
+                        target.outputs,
+                        options,
+                    )
+        except Exception as e:
+            detail, status = str(e) or type(e).__name__, "failed"
+            if cache:
+                cache.forget(name)
+        return TargetResult(name, status, time.perf_counter() - start, detail)
+
+    def skip_dependents(failed: str) -> None:
+        for name, deps in list(pending.items()):
+            if failed in deps and name in pending:
+                del pending[name]
+                results[name] = TargetResult(
+                    name, "skipped", 0.0, f"{failed} did not build"
+                )
+                skip_dependents(name)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        running: dict[Future, str] = {}
+        while pending or running:
+            for name in [n for n, deps in pending.items() if not deps]:
+                del pending[name]
+                running[pool.submit(timed, name)] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                del running[fut]
+                res = fut.result()
+                results[res.name] = res
+                if res.status not in ("ok", "cached"):
+                    skip_dependents(res.name)
+                    continue
+                for deps in pending.values():
+                    deps.discard(res.name)
+    return [results[n] for n in names if n in results]
+
+
+def print_report(results: list[TargetResult], load_seconds: float, total: float) -> None:
+    width = max([len(r.name) for r in results] + [len("tokens")])
+    print(f"[build] {'tokens':<{width}}  {load_seconds * 1000:8.1f} ms  loaded once")
+    for r in results:
+        timing = f"{r.seconds * 1000:8.1f} ms" if r.status != "skipped" else " " * 11
+        if r.status == "ok":
+            label = r.detail
+        elif r.status == "cached":
+            label = f"cached ({r.detail})"
+        else:
+            label = f"{r.status.upper()}: {r.detail}"
+        print(f"[build] {r.name:<{width}}  {timing}  {label}")
+    print(f"[build] {'total':<{width}}  {total * 1000:8.1f} ms  wall")
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument(
+        "targets",
+        nargs="*",
+        metavar="target",
+        help=f"Targets to build: {', '.join(TARGETS)} "
+        f"(default: {' '.join(DEFAULT_TARGETS)})",
+    )
+    ap.add_argument(
+        "--only",
+        action="store_true",
+        help="Build only the named targets, without their dependencies",
+    )
+    ap.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the build cache and rebuild every selected target",
+    )
+    ap.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rebuild affected targets when tokens change",
+    )
+    ap.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll for changes instead of using inotify",
+    )
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="Worker threads")
+    ap.add_argument("--font-name", default=DEFAULT_FONT_NAME)
+    ap.add_argument("--font-size", type=float, default=DEFAULT_FONT_SIZE)
+    ap.add_argument(
+        "--package-name", default=None, help="ZIP filename for the package target"
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    unknown = [t for t in args.targets if t not in TARGETS]
+    if unknown:
+        print(f"ERROR: unknown build target(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    try:
+        graph = load_graph(TOKENS_PATH)
+    except TokenGraphError as e:
+        # Schema and reference problems stop the build before any target runs
+        for problem in e.problems:
+            print(f"ERROR: {problem}", file=sys.stderr)
+        return 2
+    load_seconds = time.perf_counter() - start
+
+    cache = BuildCache()
+    if args.force:
+        for name in TARGETS:
+            cache.forget(name)
+    ctx = BuildContext(
+        graph, args.font_name, args.font_size, args.package_name, cache
+    )
+    names = expand_targets(args.targets or DEFAULT_TARGETS, with_deps=not args.only)
+    results = run_targets(ctx, names, jobs=args.jobs)
+    cache.save()
+    print_report(results, load_seconds, time.perf_counter() - start)
+    if args.watch:
+        return watch(ctx, names, args)
+    return 0 if all(r.status in ("ok", "cached") for r in results) else 1
+
+
+def watch(ctx: BuildContext, names: list[str], args: argparse.Namespace) -> int:
+    """Rebuild on every token edit until interrupted."""
+    from watch import iter_changes
+
+    watched = [TOKENS_PATH, VERSION_PATH]
+    print(f"[watch] Watching {', '.join(_rel(p) for p in watched)} (Ctrl-C to stop)")
+    try:
+        for changed in iter_changes(watched, poll=args.poll):
+            start = time.perf_counter()
+            try:
+                graph = load_graph(TOKENS_PATH)
+            except Exception as e:
+                print(f"[watch] ERROR: {e}", file=sys.stderr)
+                continue
+            results = run_targets(ctx._replace(graph=graph), names, jobs=args.jobs)
+            ctx.cache.save()
+            elapsed = (time.perf_counter() - start) * 1000
+            built = [r for r in results if r.status != "cached"]
+            summary = ", ".join(
+                f"{r.name} {r.seconds * 1000:.1f} ms"
+                if r.status == "ok"
+                else f"{r.name} {r.status.upper()}: {r.detail}"
+                for r in built
+            )
+            changed_names = ", ".join(sorted(_rel(p) for p in changed))
+            print(
+                f"[watch] {changed_names} -> {summary or 'nothing affected'} "
+                f"({elapsed:.1f} ms)"
+            )
+    except KeyboardInterrupt:
+        print()
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Build Kumanui resources from tokens")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
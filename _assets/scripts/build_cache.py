@@ -0,0 +1,114 @@
+"""
+Incremental build cache for `kumanui build`.
+
+Each cached target records the token paths it read while building (via
+token_utils.TrackingGraph), a digest of the resolved values behind those
+paths, digests of its input files (generator code, VERSION, ...) and of the
+outputs it wrote. A target is skipped when all of these still match, so only
+the token subtrees a generator actually depends on can invalidate it.
+Everything is content-hashed; file mtimes are never consulted, which keeps
+the cache valid across git checkouts.
+
+The manifest lives at dist/.kumanui-build.json.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from token_utils import TokenGraph, digest_reads
+
+ROOT = Path(__file__).resolve().parents[2]
+MANIFEST_PATH = ROOT / "dist/.kumanui-build.json"
+MANIFEST_VERSION = 1
+
+
+def file_digest(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _key(path: Path) -> str:
+    try:
+        return path.relative_to(ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def _normalize(options: object) -> object:
+    # Compare options the way they look after a JSON round trip (tuples -> lists)
+    return json.loads(json.dumps(options))
+
+
+class BuildCache:
+    """Load, query and update the build manifest. Safe to share across threads."""
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._targets: dict[str, dict] = {}
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+            self._targets = dict(data.get("targets") or {})
+
+    def is_fresh(
+        self,
+        name: str,
+        graph: TokenGraph,
+        inputs: Iterable[Path],
+        outputs: Iterable[Path],
+        options: object = None,
+    ) -> bool:
+        with self._lock:
+            rec = self._targets.get(name)
+        if not rec or rec.get("options") != _normalize(options):
+            return False
+        for kind, paths in (("inputs", inputs), ("outputs", outputs)):
+            recorded = rec.get(kind, {})
+            paths = list(paths)
+            if set(recorded) != {_key(p) for p in paths}:
+                return False
+            if any(recorded[_key(p)] != file_digest(p) for p in paths):
+                return False
+        return rec.get("tokens") == digest_reads(graph, rec.get("reads", ()))
+
+    def record(
+        self,
+        name: str,
+        graph: TokenGraph,
+        reads: Iterable[str],
+        inputs: Iterable[Path],
+        outputs: Iterable[Path],
+        options: object = None,
+    ) -> None:
+        reads = sorted(reads)
+        rec = {
+            "reads": reads,
+            "tokens": digest_reads(graph, reads),
+            "inputs": {_key(p): file_digest(p) for p in inputs},
+            "outputs": {_key(p): file_digest(p) for p in outputs},
+            "options": _normalize(options),
+        }
+        with self._lock:
+            self._targets[name] = rec
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            self._targets.pop(name, None)
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"version": MANIFEST_VERSION, "targets": self._targets}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        tmp.replace(self.path)
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Check that generated artifacts are up to date with the tokens, in one pass.
+
+Artifacts:
+
+  readme     README.md generated blocks and download line
+  swatches   _assets/swatches/*.svg exists for every palette color
+  css        dist/css/kumanui.css
+  css-min    dist/css/kumanui.min.css (and .gz/.br)
+  terminal   dist/macos-terminal/Kumanui.terminal
+
+A manifest (dist/.kumanui-check.json) records, per artifact, a hash of its
+inputs (token file, VERSION, generator code) and of its output files as last
+verified. When both still match, the artifact is up to date without loading
+tokens or importing a generator, so an unchanged tree is checked in a few
+milliseconds (cheap enough for a pre-commit hook). Only artifacts whose
+hashes moved are regenerated in memory and compared with the files; if they
+match (e.g. a comment-only token edit), the manifest is refreshed.
+
+Exits 1 if anything is stale or missing. --write regenerates those files.
+
+Usage:
+  python3 _assets/scripts/kumanui.py check
+  python3 _assets/scripts/kumanui.py check --diff
+  python3 _assets/scripts/kumanui.py check --write
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import hashlib
+import importlib.util
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPTS_DIR.parents[1]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+VERSION_PATH = ROOT / "VERSION"
+README_PATH = ROOT / "README.md"
+CSS_OUT = ROOT / "dist/css/kumanui.css"
+CSS_MIN_OUT = ROOT / "dist/css/kumanui.min.css"
+TERMINAL_OUT = ROOT / "dist/macos-terminal/Kumanui.terminal"
+MANIFEST_PATH = ROOT / "dist/.kumanui-check.json"
+MANIFEST_VERSION = 1
+README_BLOCK_RE = re.compile(
+    r"<!--\s*BEGIN:(\w+).*?-->(.*?)<!--\s*END:\1\s*-->", re.DOTALL
+)
+
+# Shared by every generator: token loading and the schema
+_COMMON = ("token_utils.py", "token_schema.py")
+
+
+class Artifact(NamedTuple):
+    name: str
+    # Generator code (relative to the scripts directory), besides _COMMON
+    code: tuple[str, ...]
+    # graph -> {output path: expected bytes, or None if it must not exist}
+    render: Callable[[object], dict[Path, bytes | None]]
+    # Also hashed into the input key
+    extra_inputs: tuple[Path, ...] = ()
+    # Environment the output depends on, hashed into the input key as well
+    options: Callable[[], object] | None = None
+
+
+def _render_readme(graph) -> dict[Path, bytes]:
+    from generate_readme import load_version, render_readme
+
+    current = README_PATH.read_text(encoding="utf-8") if README_PATH.exists() else ""
+    text = render_readme(graph, current, load_version(VERSION_PATH))
+    return {README_PATH: text.encode("utf-8")}
+
+
+def _render_swatches(graph) -> dict[Path, bytes]:
+    from generate_readme import palette_hexes, swatch_path, swatch_svg
+
+    outputs: dict[Path, bytes] = {}
+    for hexv in palette_hexes(graph):
+        path = swatch_path(hexv)
+        # Like write_swatches: existing swatches (some hand-tuned) are kept as is
+        try:
+            outputs[path] = path.read_bytes()
+        except FileNotFoundError:
+            outputs[path] = swatch_svg(hexv).encode("utf-8")
+    return outputs
+
+
+def _render_css(graph) -> dict[Path, bytes]:
+    from generate_css import generate_css
+
+    return {CSS_OUT: generate_css(graph).encode("utf-8")}
+
+
+def _render_css_min(graph) -> dict[Path, bytes | None]:
+    from generate_css import SUFFIXES, generate_css_min, precompress
+
+    data = generate_css_min(graph).encode("utf-8")
+    compressed = precompress(data)
+    outputs: dict[Path, bytes | None] = {CSS_MIN_OUT: data}
+    for enc, suffix in SUFFIXES.items():
+        # None: no brotli here, so a .br on disk would be stale (see write_css_min)
+        outputs[Path(f"{CSS_MIN_OUT}{suffix}")] = compressed.get(enc)
+    return outputs
+
+
+def _render_terminal(graph) -> dict[Path, bytes]:
+    from build import DEFAULT_FONT_NAME, DEFAULT_FONT_SIZE
+    from generate_macos_terminal import render_profile
+
+    data = render_profile(graph, DEFAULT_FONT_NAME, DEFAULT_FONT_SIZE, seed=TERMINAL_OUT)
+    return {TERMINAL_OUT: data}
+
+
+ARTIFACTS: dict[str, Artifact] = {
+    a.name: a
+    for a in (
+        Artifact(
+            "readme",
+            ("generate_readme.py", "color_math.py", "exporters/model.py"),
+            _render_readme,
+            (VERSION_PATH,),
+        ),
+        Artifact("swatches", ("generate_readme.py",), _render_swatches),
+        Artifact(
+            "css",
+            ("generate_css.py", "color_math.py", "exporters/model.py"),
+            _render_css,
+        ),
+        Artifact(
+            "css-min",
+            ("generate_css.py", "color_math.py", "exporters/model.py"),
+            _render_css_min,
+            # The .br sibling exists only with brotli installed
+            options=lambda: importlib.util.find_spec("brotli") is not None,
+        ),
+        Artifact(
+            "terminal",
+            (
+                "generate_macos_terminal.py",
+                "nskeyed.py",
+                "sRGB_IEC61966-2.1.icc",
+                "exporters/model.py",
+                "color_math.py",
+                "build.py",
+            ),
+            _render_terminal,
+        ),
+    )
+}
+
+
+class Result(NamedTuple):
+    name: str
+    status: str  # "ok", "cached", "stale" or "written"
+    # (path, expected bytes or None) for each stale (or rewritten) file
+    stale: list[tuple[Path, bytes | None]]
+
+
+def _rel(path: Path) -> str:
+    try:
+        return path.relative_to(ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def _digest(data: bytes | None) -> str | None:
+    return None if data is None else hashlib.sha256(data).hexdigest()
+
+
+def _file_digest(path: Path, memo: dict[Path, str | None]) -> str | None:
+    if path not in memo:
+        try:
+            memo[path] = _digest(path.read_bytes())
+        except FileNotFoundError:
+            memo[path] = None
+    return memo[path]
+
+
+def input_key(artifact: Artifact, tokens: Path, memo: dict[Path, str | None]) -> str:
+    """Hash of everything the artifact is generated from."""
+    h = hashlib.sha256(f"{MANIFEST_VERSION}:{artifact.name}".encode())
+    paths = [tokens, *artifact.extra_inputs]
+    paths += [SCRIPTS_DIR / name for name in (*_COMMON, *artifact.code)]
+    for path in paths:
+        h.update(f"{_rel(path)}={_file_digest(path, memo)};".encode())
+    if artifact.options:
+        h.update(repr(artifact.options()).encode())
+    return h.hexdigest()
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return dict(data.get("artifacts") or {})
+
+
+def save_manifest(entries: dict[str, dict], path: Path = MANIFEST_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    data = {"version": MANIFEST_VERSION, "artifacts": entries}
+    tmp.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+def _outputs_match(entry: dict, memo: dict[Path, str | None]) -> bool:
+    outputs = entry.get("outputs") or {}
+    return bool(outputs) and all(
+        _file_digest(ROOT / rel, memo) == digest for rel, digest in outputs.items()
+    )
+
+
+def check(
+    names: list[str],
+    tokens: Path = TOKENS_PATH,
+    write: bool = False,
+    manifest_path: Path = MANIFEST_PATH,
+) -> list[Result]:
+    """Verify the named artifacts, updating the manifest; see the module docstring."""
+    memo: dict[Path, str | None] = {}
+    manifest = load_manifest(manifest_path)
+    keys = {name: input_key(ARTIFACTS[name], tokens, memo) for name in names}
+    results: dict[str, Result] = {}
+    todo: list[str] = []
+    for name in names:
+        entry = manifest.get(name)
+        if entry and entry.get("inputs") == keys[name] and _outputs_match(entry, memo):
+            results[name] = Result(name, "cached", [])
+        else:
+            todo.append(name)
+
+    if todo:
+        from token_utils import load_graph
+
+        graph = load_graph(tokens)
+        for name in todo:
+            expected = ARTIFACTS[name].render(graph)
+            stale: list[tuple[Path, bytes | None]] = []
+            for path, data in expected.items():
+                if _file_digest(path, memo) != _digest(data):
+                    stale.append((path, data))
+            status = "ok"
+            if stale and write:
+                for path, data in stale:
+                    if data is None:
+                        path.unlink(missing_ok=True)
+                        continue
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(data)
+                status = "written"
+            elif stale:
+                status = "stale"
+            results[name] = Result(name, status, stale)
+            if status == "stale":
+                manifest.pop(name, None)
+            else:
+                manifest[name] = {
+                    "inputs": keys[name],
+                    "outputs": {_rel(p): _digest(d) for p, d in expected.items()},
+                }
+        save_manifest(manifest, manifest_path)
+    return [results[name] for name in names]
+
+
+def _diff(path: Path, expected: bytes | None) -> str:
+    try:
+        current = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    except FileNotFoundError:
+        current = []
+    except UnicodeDecodeError:
+        if expected is None:
+            return f"(binary file {_rel(path)} should be removed)\n"
+        return f"(binary file {_rel(path)} differs)\n"
+    if expected is None:
+        expected = b""
+    lines = difflib.unified_diff(
+        current,
+        expected.decode("utf-8").splitlines(keepends=True),
+        f"a/{_rel(path)}",
+        f"b/{_rel(path)}",
+    )
+    return "".join(lines)
+
+
+def _stale_detail(path: Path, expected: bytes | None) -> str:
+    if expected is None:
+        return "should not exist (cannot be regenerated here)"
+    if not path.exists():
+        return "missing"
+    if path == README_PATH:
+        # Name the generated blocks that moved
+        current = dict(README_BLOCK_RE.findall(path.read_text(encoding="utf-8")))
+        wanted = dict(README_BLOCK_RE.findall(expected.decode("utf-8")))
+        blocks = [b for b in wanted if current.get(b) != wanted[b]]
+        return f"blocks: {', '.join(blocks)}" if blocks else "download line"
+    return "out of date"
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument(
+        "artifacts",
+        nargs="*",
+        metavar="artifact",
+        help=f"Artifacts to check: {', '.join(ARTIFACTS)} (default: all)",
+    )
+    ap.add_argument("--write", action="store_true", help="Regenerate stale artifacts")
+    ap.add_argument("--diff", action="store_true", help="Show a diff for stale files")
+    ap.add_argument("--tokens", default=str(TOKENS_PATH), help="Token file")
+
+
+def run(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    unknown = [a for a in args.artifacts if a not in ARTIFACTS]
+    if unknown:
+        print(f"ERROR: unknown artifact(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    try:
+        results = check(args.artifacts or list(ARTIFACTS), Path(args.tokens), args.write)
+    except Exception as e:
+        from token_utils import TokenGraphError
+
+        if not isinstance(e, (OSError, TokenGraphError)):
+            raise
+        for problem in getattr(e, "problems", None) or [str(e)]:
+            print(f"ERROR: {problem}", file=sys.stderr)
+        return 2
+
+    stale = 0
+    for r in results:
+        for path, expected in r.stale:
+            if r.status == "written":
+                verb = "removed" if expected is None else "wrote"
+                print(f"[check] {r.name}: {verb} {_rel(path)}")
+                continue
+            stale += 1
+            print(f"[check] {r.name}: {_rel(path)} {_stale_detail(path, expected)}")
+            if args.diff:
+                sys.stdout.write(_diff(path, expected))
+    elapsed = (time.perf_counter() - start) * 1000
+    counts = {s: sum(r.status == s for r in results) for s in ("cached", "ok", "written")}
+    print(
+        f"[check] {len(results)} artifacts: {counts['cached']} unchanged, "
+        f"{counts['ok']} verified, {counts['written']} rewritten, "
+        f"{sum(r.status == 'stale' for r in results)} stale ({elapsed:.1f} ms)"
+    )
+    return 1 if stale else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Check generated artifacts against tokens")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,78 +1,481 @@
 #!/usr/bin/env python3
-from __future__ import annotations
-import yaml
-from pathlib import Path
-
-ROOT = Path(__file__).resolve().parents[2]
-TOKENS_PATH = ROOT / "tokens/colors.yaml"
-
-
-def hex_to_rgb01(h: str):
-    s = h.lstrip("#")
-    r = int(s[0:2], 16) / 255
-    g = int(s[2:4], 16) / 255
-    b = int(s[4:6], 16) / 255
-    return r, g, b
-
+"""
+WCAG 2 (and APCA) contrast checks for Kumanui colors.
 
-def srgb_to_linear(c: float) -> float:
-    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+Usage:
+  python3 _assets/scripts/check_contrast.py
+      Key-color report (base hues on Black Dark, dark hues on White Light)
+  python3 _assets/scripts/check_contrast.py --matrix dist/contrast.npy \
+      --fg 'semantics.web.*' --bg '*background' [--candidates brand.txt]
+      Full N x N contrast matrix over every palette and semantic color (plus
+      optional candidate hex colors) computed in one vectorized NumPy pass,
+      written as .npy or .csv, with a filtered pass/fail report on stdout.
+      Rows are the text color and columns the background: a translucent
+      token (alpha < 1) is composited over each background first, like
+      `kumanui audit` does, while backgrounds are taken as opaque. Pairs of
+      tokens that alias the same color are left out of the report.
+      With --metric apca the matrix holds signed APCA Lc instead (not
+      symmetric either) and pairs are gated on |Lc| >= --min-lc, with the
+      polarity of each pair reported.
+  python3 _assets/scripts/check_contrast.py --cvd [--fg GLOB --bg GLOB] [--strict]
+      Simulate protan/deutan/tritan color vision (Machado 2009) for all colors
+      in one matrix operation and list pairs that lose contrast or become
+      indistinguishable (OKLab distance) under any simulation.
+"""
 
+from __future__ import annotations
 
-def rel_lum(hexv: str) -> float:
-    r, g, b = hex_to_rgb01(hexv)
-    rl, gl, bl = map(srgb_to_linear, (r, g, b))
-    return 0.2126 * rl + 0.7152 * gl + 0.0722 * bl
+import argparse
+import fnmatch
+import re
+import sys
+import time
+from pathlib import Path
 
+from color_math import (
+    CVD_MATRICES,
+    LUMA_WEIGHTS,
+    Color,
+    apca_lc_array,
+    apca_luminance_array,
+    apca_polarity,
+    composite_rgb8_array,
+    contrast_ratio,
+    hex_to_rgb8_array,
+    linear_to_oklab,
+    relative_luminance_array,
+    require_numpy,
+    rgb8_to_linear,
+    simulate_cvd,
+)
+from token_utils import TokenGraph, TokenGraphError, load_graph
 
-def contrast(hex_a: str, hex_b: str) -> float:
-    la, lb = rel_lum(hex_a), rel_lum(hex_b)
-    L1, L2 = (la, lb) if la > lb else (lb, la)
-    return (L1 + 0.05) / (L2 + 0.05)
+ROOT = Path(__file__).resolve().parents[2]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+CANDIDATE_RE = re.compile(r"#?([0-9A-Fa-f]{6})([0-9A-Fa-f]{2})?")
 
 
-def main() -> int:
-    tokens = yaml.safe_load(TOKENS_PATH.read_text())
-    bg = tokens["palette"]["black"]["dark"][
-        "value"
-    ]  # Dark Black (dark background case)
-    palette = tokens["palette"]
+def key_color_report(graph: TokenGraph) -> int:
+    bg = graph.hex("palette.black.dark")  # Dark Black (dark background case)
+    hues = ["black", "white", "red", "green", "blue", "yellow", "magenta", "cyan"]
     base_colors = {
-        "Black Base": palette["black"]["base"]["value"],
-        "White Base": palette["white"]["base"]["value"],
-        "Red Base": palette["red"]["base"]["value"],
-        "Green Base": palette["green"]["base"]["value"],
-        "Blue Base": palette["blue"]["base"]["value"],
-        "Yellow Base": palette["yellow"]["base"]["value"],
-        "Magenta Base": palette["magenta"]["base"]["value"],
-        "Cyan Base": palette["cyan"]["base"]["value"],
+        f"{hue.capitalize()} Base": graph.hex(f"palette.{hue}.base") for hue in hues
     }
     print(f"Dark background (Black Dark {bg})")
     print("Name, Hex, Contrast, Pass(4.5)")
     for name, hexv in base_colors.items():
-        ratio = contrast(hexv, bg)
+        ratio = contrast_ratio(hexv, bg)
         print(f"{name}, {hexv}, {ratio:.2f}, {'PASS' if ratio>=4.5 else 'FAIL'}")
 
     # Light background case: use Light White as background, check dark hues for text
-    light_bg = palette["white"]["light"]["value"]
+    light_bg = graph.hex("palette.white.light")
     dark_colors = {
-        "Black Dark": palette["black"]["dark"]["value"],
-        "White Dark": palette["white"]["dark"]["value"],
-        "Red Dark": palette["red"]["dark"]["value"],
-        "Green Dark": palette["green"]["dark"]["value"],
-        "Blue Dark": palette["blue"]["dark"]["value"],
-        "Yellow Dark": palette["yellow"]["dark"]["value"],
-        "Magenta Dark": palette["magenta"]["dark"]["value"],
-        "Cyan Dark": palette["cyan"]["dark"]["value"],
+        f"{hue.capitalize()} Dark": graph.hex(f"palette.{hue}.dark") for hue in hues
     }
     print()
     print(f"Light background (White Light {light_bg})")
     print("Name, Hex, Contrast, Pass(4.5)")
     for name, hexv in dark_colors.items():
-        ratio = contrast(hexv, light_bg)
+        ratio = contrast_ratio(hexv, light_bg)
         print(f"{name}, {hexv}, {ratio:.2f}, {'PASS' if ratio>=4.5 else 'FAIL'}")
     return 0
 
 
+# ---------------------------------------------------------------------------
+# Vectorized engine
+# ---------------------------------------------------------------------------
+
+# Rows per block when filling large matrices, bounding temporaries to
+# roughly block * N floats regardless of N
+MATRIX_BLOCK_ROWS = 1024
+
+
+def collect_colors(graph: TokenGraph) -> list[tuple[str, Color]]:
+    """Return (path, color with its alpha) for every palette and semantic token."""
+    return [
+        (path, graph.color(path))
+        for path in graph
+        if path.startswith(("palette.", "semantics.")) and graph.token(path).hex
+    ]
+
+
+def read_candidates(path: Path) -> list[tuple[str, Color]]:
+    """Read extra colors, one #RRGGBB[AA] per line (optionally "name,hex").
+
+    Blank lines and comments ("#" followed by a space) are skipped; any
+    other line that is not a color raises ValueError naming file and line.
+    """
+    colors: list[tuple[str, Color]] = []
+    lines = path.read_text(encoding="utf-8").splitlines()
+    for lineno, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line == "#" or line.startswith("#") and line[1].isspace():
+            continue
+        name, _, value = line.rpartition(",")
+        match = CANDIDATE_RE.fullmatch(value.strip())
+        if match is None:
+            raise ValueError(
+                f"{path}:{lineno}: expected #RRGGBB or #RRGGBBAA, got {value.strip()!r}"
+            )
+        rgb, aa = match.groups()
+        alpha = int(aa, 16) / 255 if aa else 1.0
+        color = Color(f"#{rgb.upper()}", alpha)
+        colors.append((name.strip() or f"candidate.{color.hex8[1:]}", color))
+    return colors
+
+
+def _composite_rows(colors: list[tuple[str, Color]], matrix, metric: str) -> None:
+    """Redo the rows of translucent colors, composited over every column."""
+    np = require_numpy()
+    rgb = hex_to_rgb8_array([c.hex for _, c in colors])
+    if metric == "apca":
+        bg = apca_luminance_array(rgb)
+    else:
+        bg = relative_luminance_array(rgb) + 0.05
+    for i, (_, color) in enumerate(colors):
+        if color.alpha >= 1.0:
+            continue
+        fg = composite_rgb8_array(rgb[i], color.alpha, rgb)
+        if metric == "apca":
+            matrix[i] = apca_lc_array(apca_luminance_array(fg), bg)
+        else:
+            fg_offset = relative_luminance_array(fg) + 0.05
+            matrix[i] = np.maximum(fg_offset, bg) / np.minimum(fg_offset, bg)
+
+
+def luminance_array(hexes: list[str]):
+    """Relative luminance for many hex colors at once (float64 array)."""
+    return relative_luminance_array(hex_to_rgb8_array(hexes))
+
+
+def contrast_matrix(lum, dtype=None):
+    """All-pairs WCAG contrast: out[i, j] = ratio of color i against color j."""
+    np = require_numpy()
+    dtype = dtype or np.float64
+    n = len(lum)
+    offset = np.asarray(lum, dtype=np.float64) + 0.05
+    out = np.empty((n, n), dtype=dtype)
+    for start in range(0, n, MATRIX_BLOCK_ROWS):
+        rows = offset[start : start + MATRIX_BLOCK_ROWS, None]
+        block = out[start : start + MATRIX_BLOCK_ROWS]
+        np.divide(np.maximum(rows, offset), np.minimum(rows, offset), out=block)
+    return out
+
+
+def apca_matrix(y, dtype=None):
+    """All-pairs APCA: out[i, j] = Lc of color i as text on color j.
+
+    `y` is APCA luminance (apca_luminance_array). Lc is signed, positive for
+    dark-on-light, and out[i, j] != -out[j, i] in general.
+    """
+    np = require_numpy()
+    dtype = dtype or np.float64
+    n = len(y)
+    y = np.asarray(y, dtype=np.float64)
+    out = np.empty((n, n), dtype=dtype)
+    for start in range(0, n, MATRIX_BLOCK_ROWS):
+        rows = y[start : start + MATRIX_BLOCK_ROWS, None]
+        out[start : start + MATRIX_BLOCK_ROWS] = apca_lc_array(rows, y)
+    return out
+
+
+def write_matrix(path: Path, names: list[str], matrix) -> None:
+    """Write .npy (with a sibling .names.txt for row/column labels) or CSV."""
+    np = require_numpy()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".npy":
+        np.save(path, matrix)
+        names_path = path.with_suffix(".names.txt")
+        names_path.write_text("\n".join(names) + "\n", encoding="utf-8")
+        return
+    with path.open("w", encoding="utf-8") as f:
+        f.write("," + ",".join(names) + "\n")
+        for name, row in zip(names, matrix):
+            f.write(name + "," + ",".join(f"{v:.2f}" for v in row) + "\n")
+
+
+def report_pairs(
+    colors: list[tuple[str, Color]],
+    matrix,
+    fg: str,
+    bg: str,
+    min_ratio: float,
+    fail_only: bool,
+    metric: str = "wcag",
+) -> int:
+    """Print pairs whose names match the fg/bg globs; return the failure count.
+
+    With metric "apca", `matrix` holds signed Lc and `min_ratio` is the
+    minimum |Lc|. Pairs of tokens with the same color (aliases of one
+    palette entry) are skipped rather than reported as failing at 1:1.
+    """
+    np = require_numpy()
+    names = [n for n, _ in colors]
+    fg_idx = [i for i, n in enumerate(names) if fnmatch.fnmatchcase(n, fg)]
+    bg_idx = [i for i, n in enumerate(names) if fnmatch.fnmatchcase(n, bg)]
+    sub = matrix[np.ix_(fg_idx, bg_idx)]
+    apca = metric == "apca"
+    passed = (np.abs(sub) if apca else sub) >= min_ratio
+    show = ~passed if fail_only else np.ones_like(passed)
+
+    if apca:
+        print(
+            "Name, Background, Hex, Background Hex, Lc, Polarity, "
+            f"Pass(Lc {min_ratio:g})"
+        )
+    else:
+        print(f"Name, Background, Hex, Background Hex, Contrast, Pass({min_ratio:g})")
+    failures = aliases = 0
+    for fi, bi in np.argwhere(show):
+        i, j = fg_idx[fi], bg_idx[bi]
+        if i == j:
+            continue
+        if colors[i][1] is colors[j][1]:
+            aliases += 1
+            continue
+        ok = bool(passed[fi, bi])
+        failures += not ok
+        value = f"{sub[fi, bi]:.2f}"
+        if apca:
+            value += f", {apca_polarity(float(sub[fi, bi]))}"
+        print(
+            f"{names[i]}, {names[j]}, {colors[i][1].hex8}, {colors[j][1].hex8}, "
+            f"{value}, {'PASS' if ok else 'FAIL'}"
+        )
+    if aliases:
+        print(f"Skipped {aliases} pairs of tokens with the same color", file=sys.stderr)
+    return failures
+
+
+def matrix_report(
+    args: argparse.Namespace, graph: TokenGraph, candidates: list[tuple[str, Color]]
+) -> int:
+    np = require_numpy()
+    colors = collect_colors(graph) + candidates
+    dtype = np.float32 if args.float32 else np.float64
+    hexes = [c.hex for _, c in colors]
+    if args.metric == "apca":
+        matrix = apca_matrix(apca_luminance_array(hex_to_rgb8_array(hexes)), dtype)
+        threshold = args.min_lc
+    else:
+        matrix = contrast_matrix(luminance_array(hexes), dtype=dtype)
+        threshold = args.min_ratio
+    _composite_rows(colors, matrix, args.metric)
+    if args.matrix:
+        write_matrix(Path(args.matrix), [n for n, _ in colors], matrix)
+        n = len(colors)
+        kind = "APCA Lc" if args.metric == "apca" else "contrast"
+        print(f"Wrote {n}x{n} {kind} matrix: {args.matrix}", file=sys.stderr)
+    if not (args.fg or args.bg):
+        return 0
+    failures = report_pairs(
+        colors,
+        matrix,
+        args.fg or "*",
+        args.bg or "*",
+        threshold,
+        args.fail_only,
+        args.metric,
+    )
+    return 1 if failures and args.strict else 0
+
+
+def select_pairs(
+    colors: list[tuple[str, Color]], fg: str, bg: str
+) -> list[tuple[int, int]]:
+    """Index pairs matching the globs, one per distinct pair of colors.
+
+    Tokens that alias the same color would otherwise repeat every finding.
+    Opaque pairs are unordered; a translucent foreground is composited over
+    the background, so its pairs keep their order.
+    """
+    fg_idx = [i for i, (n, _) in enumerate(colors) if fnmatch.fnmatchcase(n, fg)]
+    bg_idx = [j for j, (n, _) in enumerate(colors) if fnmatch.fnmatchcase(n, bg)]
+    seen: set[object] = set()
+    pairs: list[tuple[int, int]] = []
+    for i in fg_idx:
+        for j in bg_idx:
+            a, b = colors[i][1], colors[j][1]
+            if a is b:
+                continue
+            key = (a, b) if a.alpha < 1.0 else frozenset((a, b))
+            if key not in seen:
+                seen.add(key)
+                pairs.append((i, j))
+    return pairs
+
+
+def parse_cvd_kinds(types: str, severities: str) -> list[tuple[str, float]]:
+    kinds = [
+        (t.strip(), float(s))
+        for t in types.split(",")
+        if t.strip()
+        for s in severities.split(",")
+        if s.strip()
+    ]
+    unknown = [k for k in kinds if k not in CVD_MATRICES]
+    if unknown:
+        available = ", ".join(f"{t}@{s:g}" for t, s in CVD_MATRICES)
+        raise ValueError(f"Unknown simulation(s) {unknown}; available: {available}")
+    return kinds
+
+
+def cvd_report(
+    args: argparse.Namespace, graph: TokenGraph, candidates: list[tuple[str, Color]]
+) -> int:
+    """Flag pairs that pass under normal vision but not under a CVD simulation."""
+    np = require_numpy()
+    start = time.perf_counter()
+    try:
+        kinds = parse_cvd_kinds(args.cvd_types, args.cvd_severity)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    colors = collect_colors(graph) + candidates
+    names = [n for n, _ in colors]
+    pairs = select_pairs(colors, args.fg or "*", args.bg or "*")
+    fg_idx = np.array([i for i, _ in pairs], dtype=np.intp)
+    bg_idx = np.array([j for _, j in pairs], dtype=np.intp)
+
+    rgb = hex_to_rgb8_array([c.hex for _, c in colors])
+    alpha = np.array([c.alpha for _, c in colors])
+    weights = np.array(LUMA_WEIGHTS)
+
+    def simulated(rgb8):
+        # Row 0 is normal vision, then one row per simulation: (S, N, 3)
+        lin = rgb8_to_linear(rgb8)
+        return np.concatenate([lin[None], simulate_cvd(lin, kinds)])
+
+    # Translucent foregrounds are composited over their background first
+    fg_sims = simulated(composite_rgb8_array(rgb[fg_idx], alpha[fg_idx], rgb[bg_idx]))
+    bg_sims = simulated(rgb[bg_idx])
+    fl, bl = fg_sims @ weights + 0.05, bg_sims @ weights + 0.05
+    ratio = np.maximum(fl, bl) / np.minimum(fl, bl)
+    delta_e = np.linalg.norm(linear_to_oklab(fg_sims) - linear_to_oklab(bg_sims), axis=-1)
+
+    if args.matrix:
+        base = Path(args.matrix)
+        luminance = simulated(rgb) @ weights
+        matrices = [contrast_matrix(luminance[s]) for s in range(1, len(kinds) + 1)]
+        # Like the pair check: translucent rows over each column, then simulated
+        bg_offset = luminance + 0.05
+        for i in np.flatnonzero(alpha < 1.0):
+            fg = composite_rgb8_array(rgb[i], alpha[i], rgb)
+            fg_offset = simulated(fg) @ weights + 0.05
+            rows = np.maximum(fg_offset, bg_offset) / np.minimum(fg_offset, bg_offset)
+            for s, matrix in enumerate(matrices, start=1):
+                matrix[i] = rows[s]
+        for (kind, severity), matrix in zip(kinds, matrices):
+            path = base.with_name(f"{base.stem}.{kind}-{severity:g}{base.suffix}")
+            write_matrix(path, names, matrix)
+            print(f"Wrote {path}", file=sys.stderr)
+
+    lost_contrast = (ratio[0] >= args.min_ratio) & (ratio[1:] < args.min_ratio)
+    merged = (delta_e[0] >= args.min_delta_e) & (delta_e[1:] < args.min_delta_e)
+    flagged = lost_contrast | merged
+
+    print(
+        "Simulation, Name, Other, Hex, Other Hex, Contrast, Normal Contrast, "
+        "DeltaE, Issue"
+    )
+    for s, p in np.argwhere(flagged):
+        kind, severity = kinds[s]
+        i, j = pairs[p]
+        issue = "indistinguishable" if merged[s, p] else f"contrast<{args.min_ratio:g}"
+        print(
+            f"{kind}@{severity:g}, {names[i]}, {names[j]}, {colors[i][1].hex8}, "
+            f"{colors[j][1].hex8}, {ratio[s + 1, p]:.2f}, {ratio[0, p]:.2f}, "
+            f"{delta_e[s + 1, p]:.3f}, {issue}"
+        )
+    elapsed = (time.perf_counter() - start) * 1000
+    counts = ", ".join(
+        f"{kind}@{severity:g}: {int(flagged[s].sum())}"
+        for s, (kind, severity) in enumerate(kinds)
+    )
+    print(
+        f"[cvd] {len(colors)} colors, {len(pairs)} pairs, {len(kinds)} simulations "
+        f"in {elapsed:.1f} ms; flagged {counts}",
+        file=sys.stderr,
+    )
+    return 1 if flagged.any() and args.strict else 0
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--matrix", help="Write the full contrast matrix (.npy or .csv)")
+    ap.add_argument(
+        "--candidates",
+        action="append",
+        help="File of extra colors to evaluate (hex or name,hex per line)",
+    )
+    ap.add_argument("--fg", help="Glob of foreground color names to report")
+    ap.add_argument("--bg", help="Glob of background color names to report")
+    ap.add_argument("--min-ratio", type=float, default=4.5, help="Pass threshold")
+    ap.add_argument(
+        "--metric",
+        choices=("wcag", "apca"),
+        default="wcag",
+        help="Matrix/report metric: WCAG 2 ratio or APCA Lc (default: wcag)",
+    )
+    ap.add_argument(
+        "--min-lc", type=float, default=60.0, help="APCA pass threshold on |Lc|"
+    )
+    ap.add_argument("--fail-only", action="store_true", help="List failing pairs only")
+    ap.add_argument(
+        "--strict", action="store_true", help="Exit 1 if any reported pair fails"
+    )
+    ap.add_argument(
+        "--float32", action="store_true", help="Compute/store the matrix as float32"
+    )
+    ap.add_argument(
+        "--cvd",
+        action="store_true",
+        help="Re-check pairs under color vision deficiency simulations",
+    )
+    ap.add_argument(
+        "--cvd-types",
+        default="protan,deutan,tritan",
+        help="Comma-separated simulations (default: protan,deutan,tritan)",
+    )
+    ap.add_argument(
+        "--cvd-severity",
+        default="0.5,1.0",
+        help="Comma-separated severities: 0.5 and/or 1.0 (default: both)",
+    )
+    ap.add_argument(
+        "--min-delta-e",
+        type=float,
+        default=0.04,
+        help="OKLab distance below which two colors count as indistinguishable",
+    )
+    ap.add_argument("--tokens", default=str(TOKENS_PATH), help="Token file")
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        graph = load_graph(Path(args.tokens))
+    except TokenGraphError as e:
+        for problem in e.problems:
+            print(f"ERROR: {problem}", file=sys.stderr)
+        return 2
+    candidates: list[tuple[str, Color]] = []
+    try:
+        for cand in args.candidates or []:
+            candidates += read_candidates(Path(cand))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    if args.cvd:
+        return cvd_report(args, graph, candidates)
+    if args.matrix or args.fg or args.bg or args.candidates:
+        return matrix_report(args, graph, candidates)
+    return key_color_report(graph)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="WCAG contrast report for Kumanui colors")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
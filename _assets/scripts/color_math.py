@@ -0,0 +1,616 @@
+#!/usr/bin/env python3
+"""
+Shared color math for the Kumanui scripts.
+
+Token colors are always 8-bit sRGB, so linearization goes through a
+precomputed 256-entry table instead of a pow() per channel. Scalar helpers
+(relative luminance, contrast, HSL) need only the standard library; the
+batched conversions work on NumPy arrays whose last axis holds the three
+channels:
+
+  sRGB (0..1) <-> linear sRGB <-> OKLab <-> OKLCH
+  sRGB (0..1) <-> HSL (hue in degrees, saturation/lightness 0..1)
+
+Color is the scalar counterpart for single token colors: interned, with
+its conversions cached on first use.
+
+Usage:
+  python3 _assets/scripts/color_math.py --bench [N]
+      Time the table-based and batched paths against the scalar functions
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from functools import lru_cache
+
+from token_utils import hex_to_rgb
+
+# WCAG 2 relative luminance weights for linear R, G, B
+LUMA_WEIGHTS = (0.2126, 0.7152, 0.0722)
+
+# https://bottosson.github.io/posts/oklab/
+_LINEAR_TO_LMS = (
+    (0.4122214708, 0.5363325363, 0.0514459929),
+    (0.2119034982, 0.6806995451, 0.1073969566),
+    (0.0883024619, 0.2817188376, 0.6299787005),
+)
+_LMS_TO_OKLAB = (
+    (0.2104542553, 0.7936177850, -0.0040720468),
+    (1.9779984951, -2.4285922050, 0.4505937099),
+    (0.0259040371, 0.7827717662, -0.8086757660),
+)
+_OKLAB_TO_LMS = (
+    (1.0, 0.3963377774, 0.2158037573),
+    (1.0, -0.1055613458, -0.0638541728),
+    (1.0, -0.0894841775, -1.2914855480),
+)
+_LMS_TO_LINEAR = (
+    (4.0767416621, -3.3077115913, 0.2309699292),
+    (-1.2684380046, 2.6097574011, -0.3413193965),
+    (-0.0041960863, -0.7034186147, 1.7076147010),
+)
+
+
+def srgb_to_linear(c: float) -> float:
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+
+def linear_to_srgb(c: float) -> float:
+    return c * 12.92 if c <= 0.0031308 else 1.055 * c ** (1 / 2.4) - 0.055
+
+
+# Linear value of every 8-bit channel value
+LINEAR_LUT: tuple[float, ...] = tuple(srgb_to_linear(i / 255) for i in range(256))
+# Each channel's contribution to relative luminance, so luminance is 3 lookups
+_LUMA_LUT = tuple(tuple(w * v for v in LINEAR_LUT) for w in LUMA_WEIGHTS)
+
+
+def relative_luminance_rgb(r: int, g: int, b: int) -> float:
+    """WCAG relative luminance of 8-bit sRGB channels."""
+    lr, lg, lb = _LUMA_LUT
+    return lr[r] + lg[g] + lb[b]
+
+
+def relative_luminance(hexv: str) -> float:
+    return relative_luminance_rgb(*hex_to_rgb(hexv))
+
+
+def contrast_ratio(hex_a: str, hex_b: str) -> float:
+    """WCAG 2 contrast ratio (1..21) between two hex colors."""
+    la, lb = relative_luminance(hex_a), relative_luminance(hex_b)
+    if la < lb:
+        la, lb = lb, la
+    return (la + 0.05) / (lb + 0.05)
+
+
+# APCA (APCA-W3 0.0.98G-4g). Lc is signed by polarity: positive for dark text
+# on a light background, negative for light text on a dark one. It uses its
+# own luminance estimate (plain 2.4 exponent, slightly different weights).
+APCA_WEIGHTS = (0.2126729, 0.7151522, 0.0721750)
+APCA_EXPONENT = 2.4
+_APCA_BLACK_THRESHOLD = 0.022
+_APCA_BLACK_CLAMP = 1.414
+_APCA_DELTA_Y_MIN = 0.0005
+_APCA_SCALE = 1.14
+_APCA_OFFSET = 0.027
+_APCA_LO_CLIP = 0.1
+# Exponents: normal polarity (bg, text), reverse polarity (bg, text)
+_APCA_NORMAL = (0.56, 0.57)
+_APCA_REVERSE = (0.65, 0.62)
+APCA_LUT = tuple((i / 255) ** APCA_EXPONENT for i in range(256))
+_APCA_Y_LUT = tuple(tuple(w * v for v in APCA_LUT) for w in APCA_WEIGHTS)
+
+
+def apca_luminance_rgb(r: int, g: int, b: int) -> float:
+    """APCA screen luminance (Ys) of 8-bit sRGB channels."""
+    lr, lg, lb = _APCA_Y_LUT
+    return lr[r] + lg[g] + lb[b]
+
+
+def apca_lc_y(y_text: float, y_bg: float) -> float:
+    """APCA Lc from two APCA luminances (text first)."""
+    if y_text < _APCA_BLACK_THRESHOLD:
+        y_text += (_APCA_BLACK_THRESHOLD - y_text) ** _APCA_BLACK_CLAMP
+    if y_bg < _APCA_BLACK_THRESHOLD:
+        y_bg += (_APCA_BLACK_THRESHOLD - y_bg) ** _APCA_BLACK_CLAMP
+    if abs(y_bg - y_text) < _APCA_DELTA_Y_MIN:
+        return 0.0
+    if y_bg > y_text:
+        bg_exp, text_exp = _APCA_NORMAL
+        sapc = (y_bg**bg_exp - y_text**text_exp) * _APCA_SCALE
+        return 0.0 if sapc < _APCA_LO_CLIP else (sapc - _APCA_OFFSET) * 100
+    bg_exp, text_exp = _APCA_REVERSE
+    sapc = (y_bg**bg_exp - y_text**text_exp) * _APCA_SCALE
+    return 0.0 if sapc > -_APCA_LO_CLIP else (sapc + _APCA_OFFSET) * 100
+
+
+def apca_lc(text_hex: str, bg_hex: str) -> float:
+    """APCA lightness contrast (about -108..106) of text on a background."""
+    return apca_lc_y(
+        apca_luminance_rgb(*hex_to_rgb(text_hex)), apca_luminance_rgb(*hex_to_rgb(bg_hex))
+    )
+
+
+def apca_polarity(lc: float) -> str:
+    """Label for the sign of an APCA Lc ("none" when there is no contrast)."""
+    if lc > 0:
+        return "dark-on-light"
+    return "light-on-dark" if lc < 0 else "none"
+
+
+def composite_hex(fg: str, alpha: float, bg: str) -> str:
+    """Composite a translucent color onto an opaque one, in 8-bit sRGB like browsers."""
+    if alpha >= 1.0:
+        return fg.upper()
+    f, b = hex_to_rgb(fg), hex_to_rgb(bg)
+    return "#" + "".join(f"{round(x * alpha + y * (1 - alpha)):02X}" for x, y in zip(f, b))
+
+
+def rgb_to_hsl(r: int, g: int, b: int) -> tuple[int, int, int]:
+    """8-bit sRGB to rounded (hue degrees, saturation %, lightness %)."""
+    rf, gf, bf = r / 255.0, g / 255.0, b / 255.0
+    mx, mn = max(rf, gf, bf), min(rf, gf, bf)
+    l = (mx + mn) / 2.0
+    if mx == mn:
+        h = s = 0.0
+    else:
+        d = mx - mn
+        s = d / (2.0 - mx - mn) if l > 0.5 else d / (mx + mn)
+        if mx == rf:
+            h = (gf - bf) / d + (6 if gf < bf else 0)
+        elif mx == gf:
+            h = (bf - rf) / d + 2
+        else:
+            h = (rf - gf) / d + 4
+        h /= 6.0
+    return round(h * 360), round(s * 100), round(l * 100)
+
+
+def _mul3(m: tuple, v: tuple) -> tuple[float, float, float]:
+    return tuple(row[0] * v[0] + row[1] * v[1] + row[2] * v[2] for row in m)
+
+
+def linear_to_oklch(r: float, g: float, b: float) -> tuple[float, float, float]:
+    """Scalar linear sRGB to OKLCH (hue in degrees, 0..360)."""
+    lms = _mul3(_LINEAR_TO_LMS, (r, g, b))
+    lms = tuple(math.copysign(abs(c) ** (1 / 3), c) for c in lms)
+    L, a, b_ = _mul3(_LMS_TO_OKLAB, lms)
+    return L, math.hypot(a, b_), math.degrees(math.atan2(b_, a)) % 360.0
+
+
+class Color:
+    """An 8-bit sRGB color with its alpha; immutable and interned.
+
+    The channels are packed into one int (``value``, 0xRRGGBB). Alpha keeps
+    the token's float, since profiles archive it as given. Color("#0a84ff")
+    returns the same object on every call, and derived values are computed
+    on first access and cached on it, so a color shared by many themes is
+    parsed and converted once per process. Interned colors are never freed.
+    """
+
+    __slots__ = (
+        "value", "alpha", "hex", "_rgb01", "_linear", "_luminance", "_hsl", "_oklch"
+    )
+
+    # (hex as given or packed int, alpha) -> Color
+    _interned: dict[tuple[str | int, float], Color] = {}
+
+    def __new__(cls, color: str | int, alpha: float = 1.0) -> Color:
+        self = cls._interned.get((color, alpha))
+        if self is not None:
+            return self
+        if isinstance(color, str):
+            r, g, b = hex_to_rgb(color)
+            value = r << 16 | g << 8 | b
+        else:
+            value = color
+            if not 0 <= value <= 0xFFFFFF:
+                raise ValueError(f"RGB value out of range: {color:#x}")
+        self = cls._interned.get((value, alpha))
+        if self is None:
+            self = object.__new__(cls)
+            init = object.__setattr__
+            init(self, "value", value)
+            init(self, "alpha", alpha)
+            init(self, "hex", f"#{value:06X}")
+            for name in ("_rgb01", "_linear", "_luminance", "_hsl", "_oklch"):
+                init(self, name, None)
+            cls._interned[(value, alpha)] = self
+        cls._interned[(color, alpha)] = self
+        return self
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Color is immutable")
+
+    def __reduce__(self):
+        return Color, (self.value, self.alpha)
+
+    def __repr__(self) -> str:
+        alpha = "" if self.alpha >= 1.0 else f", {self.alpha}"
+        return f"Color('{self.hex}'{alpha})"
+
+    @property
+    def rgb(self) -> tuple[int, int, int]:
+        v = self.value
+        return v >> 16, v >> 8 & 0xFF, v & 0xFF
+
+    @property
+    def hex8(self) -> str:
+        """#RRGGBB, or #RRGGBBAA when translucent."""
+        if self.alpha >= 1.0:
+            return self.hex
+        return f"{self.hex}{round(self.alpha * 255):02X}"
+
+    @property
+    def rgb01(self) -> tuple[float, float, float]:
+        if self._rgb01 is None:
+            r, g, b = self.rgb
+            object.__setattr__(self, "_rgb01", (r / 255.0, g / 255.0, b / 255.0))
+        return self._rgb01
+
+    @property
+    def linear(self) -> tuple[float, float, float]:
+        if self._linear is None:
+            linear = tuple(LINEAR_LUT[c] for c in self.rgb)
+            object.__setattr__(self, "_linear", linear)
+        return self._linear
+
+    @property
+    def luminance(self) -> float:
+        """WCAG relative luminance."""
+        if self._luminance is None:
+            object.__setattr__(self, "_luminance", relative_luminance_rgb(*self.rgb))
+        return self._luminance
+
+    @property
+    def hsl(self) -> tuple[int, int, int]:
+        """Rounded (hue degrees, saturation %, lightness %), as in the README."""
+        if self._hsl is None:
+            object.__setattr__(self, "_hsl", rgb_to_hsl(*self.rgb))
+        return self._hsl
+
+    @property
+    def oklch(self) -> tuple[float, float, float]:
+        if self._oklch is None:
+            object.__setattr__(self, "_oklch", linear_to_oklch(*self.linear))
+        return self._oklch
+
+    def over(self, background: str | Color) -> str:
+        """Composite onto an opaque background, for formats without alpha."""
+        if isinstance(background, Color):
+            background = background.hex
+        return composite_hex(self.hex, self.alpha, background)
+
+
+# ---------------------------------------------------------------------------
+# Batched conversions (NumPy)
+
+
+def require_numpy():
+    try:
+        import numpy as np  # type: ignore
+    except Exception:
+        print(
+            "ERROR: NumPy not installed. Install with: pip3 install numpy",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return np
+
+
+def hex_to_rgb8_array(hexes: list[str]):
+    """(N, 3) uint8 array from '#RRGGBB' strings (alpha digits are ignored)."""
+    np = require_numpy()
+    raw = bytes.fromhex("".join(h.strip().lstrip("#")[:6] for h in hexes))
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+
+
+def composite_rgb8_array(fg, alpha, bg):
+    """composite_hex for broadcast (..., 3) uint8 arrays, rounded the same way."""
+    np = require_numpy()
+    alpha = np.asarray(alpha, dtype=np.float64)[..., None]
+    mixed = fg.astype(np.float64) * alpha + bg.astype(np.float64) * (1 - alpha)
+    return np.rint(mixed).astype(np.uint8)
+
+
+def rgb_array_to_hex(rgb) -> list[str]:
+    """'#RRGGBB' strings from sRGB floats in 0..1 (clipped and rounded)."""
+    np = require_numpy()
+    rgb8 = np.rint(np.clip(rgb, 0.0, 1.0) * 255).astype(np.uint8).reshape(-1, 3)
+    raw = rgb8.tobytes().hex().upper()
+    return ["#" + raw[i : i + 6] for i in range(0, len(raw), 6)]
+
+
+@lru_cache(maxsize=1)
+def linear_lut():
+    """LINEAR_LUT as a float64 array, for indexing with uint8 channel arrays."""
+    np = require_numpy()
+    return np.array(LINEAR_LUT)
+
+
+def rgb8_to_linear(rgb8):
+    return linear_lut()[rgb8]
+
+
+def relative_luminance_array(rgb8):
+    """Relative luminance of (..., 3) uint8 sRGB colors."""
+    np = require_numpy()
+    return rgb8_to_linear(rgb8) @ np.array(LUMA_WEIGHTS)
+
+
+@lru_cache(maxsize=1)
+def apca_lut():
+    np = require_numpy()
+    return np.array(APCA_LUT)
+
+
+def apca_luminance_array(rgb8):
+    """APCA screen luminance of (..., 3) uint8 sRGB colors."""
+    np = require_numpy()
+    return apca_lut()[rgb8] @ np.array(APCA_WEIGHTS)
+
+
+def apca_lc_array(y_text, y_bg):
+    """APCA Lc for broadcast arrays of text and background APCA luminances."""
+    np = require_numpy()
+    y_text = np.asarray(y_text, dtype=np.float64)
+    y_bg = np.asarray(y_bg, dtype=np.float64)
+    t = np.where(
+        y_text < _APCA_BLACK_THRESHOLD,
+        y_text + np.clip(_APCA_BLACK_THRESHOLD - y_text, 0, None) ** _APCA_BLACK_CLAMP,
+        y_text,
+    )
+    b = np.where(
+        y_bg < _APCA_BLACK_THRESHOLD,
+        y_bg + np.clip(_APCA_BLACK_THRESHOLD - y_bg, 0, None) ** _APCA_BLACK_CLAMP,
+        y_bg,
+    )
+    normal = b > t
+    bg_exp = np.where(normal, _APCA_NORMAL[0], _APCA_REVERSE[0])
+    text_exp = np.where(normal, _APCA_NORMAL[1], _APCA_REVERSE[1])
+    sapc = (b**bg_exp - t**text_exp) * _APCA_SCALE
+    lc = np.where(
+        normal,
+        np.where(sapc < _APCA_LO_CLIP, 0.0, sapc - _APCA_OFFSET),
+        np.where(sapc > -_APCA_LO_CLIP, 0.0, sapc + _APCA_OFFSET),
+    )
+    return np.where(np.abs(b - t) < _APCA_DELTA_Y_MIN, 0.0, lc * 100)
+
+
+def srgb_to_linear_array(rgb):
+    np = require_numpy()
+    rgb = np.asarray(rgb, dtype=np.float64)
+    a = np.abs(rgb)
+    curve = np.sign(rgb) * ((a + 0.055) / 1.055) ** 2.4
+    return np.where(a <= 0.04045, rgb / 12.92, curve)
+
+
+def linear_to_srgb_array(lin):
+    np = require_numpy()
+    lin = np.asarray(lin, dtype=np.float64)
+    a = np.abs(lin)
+    curve = np.sign(lin) * (1.055 * a ** (1 / 2.4) - 0.055)
+    return np.where(a <= 0.0031308, lin * 12.92, curve)
+
+
+def linear_to_oklab(lin):
+    np = require_numpy()
+    lms = np.cbrt(np.asarray(lin, dtype=np.float64) @ np.array(_LINEAR_TO_LMS).T)
+    return lms @ np.array(_LMS_TO_OKLAB).T
+
+
+def oklab_to_linear(lab):
+    np = require_numpy()
+    lms = (np.asarray(lab, dtype=np.float64) @ np.array(_OKLAB_TO_LMS).T) ** 3
+    return lms @ np.array(_LMS_TO_LINEAR).T
+
+
+def oklab_to_oklch(lab):
+    """OKLab to OKLCH with hue in degrees (0..360)."""
+    np = require_numpy()
+    lab = np.asarray(lab, dtype=np.float64)
+    L, a, b = lab[..., 0], lab[..., 1], lab[..., 2]
+    h = np.degrees(np.arctan2(b, a)) % 360.0
+    return np.stack([L, np.hypot(a, b), h], axis=-1)
+
+
+def oklch_to_oklab(lch):
+    np = require_numpy()
+    lch = np.asarray(lch, dtype=np.float64)
+    L, C, h = lch[..., 0], lch[..., 1], np.radians(lch[..., 2])
+    return np.stack([L, C * np.cos(h), C * np.sin(h)], axis=-1)
+
+
+def srgb_to_oklch(rgb):
+    return oklab_to_oklch(linear_to_oklab(srgb_to_linear_array(rgb)))
+
+
+def oklch_to_srgb(lch):
+    """OKLCH to sRGB floats; out-of-gamut colors fall outside 0..1."""
+    return linear_to_srgb_array(oklab_to_linear(oklch_to_oklab(lch)))
+
+
+# Color vision deficiency simulation, applied to linear sRGB. Machado,
+# Oliveira & Fernandes (2009), "A Physiologically-based Model for Simulation
+# of Color Vision Deficiency", severities 0.5 (anomalous trichromacy) and
+# 1.0 (dichromacy).
+CVD_MATRICES: dict[tuple[str, float], tuple[tuple[float, float, float], ...]] = {
+    ("protan", 0.5): (
+        (0.458064, 0.679578, -0.137642),
+        (0.092785, 0.846313, 0.060902),
+        (-0.007494, -0.016807, 1.024301),
+    ),
+    ("protan", 1.0): (
+        (0.152286, 1.052583, -0.204868),
+        (0.114503, 0.786281, 0.099216),
+        (-0.003882, -0.048116, 1.051998),
+    ),
+    ("deutan", 0.5): (
+        (0.547494, 0.607765, -0.155259),
+        (0.181692, 0.781742, 0.036566),
+        (-0.010410, 0.027275, 0.983136),
+    ),
+    ("deutan", 1.0): (
+        (0.367322, 0.860646, -0.227968),
+        (0.280085, 0.672501, 0.047413),
+        (-0.011820, 0.042940, 0.968881),
+    ),
+    ("tritan", 0.5): (
+        (1.017277, 0.027029, -0.044306),
+        (-0.006113, 0.958479, 0.047634),
+        (0.006379, 0.248708, 0.744913),
+    ),
+    ("tritan", 1.0): (
+        (1.255528, -0.076749, -0.178779),
+        (-0.078411, 0.930809, 0.147602),
+        (0.004733, 0.691367, 0.303900),
+    ),
+}
+
+
+def simulate_cvd(lin, kinds: list[tuple[str, float]]):
+    """Apply several CVD simulations at once: (N, 3) linear -> (S, N, 3) linear."""
+    np = require_numpy()
+    matrices = np.array([CVD_MATRICES[kind] for kind in kinds])
+    return np.clip(np.einsum("sij,nj->sni", matrices, lin), 0.0, 1.0)
+
+
+def in_srgb_gamut(rgb, eps: float = 1e-6):
+    np = require_numpy()
+    return np.all((rgb >= -eps) & (rgb <= 1.0 + eps), axis=-1)
+
+
+def gamut_map_oklch(lch, iterations: int = 20):
+    """Reduce chroma (keeping lightness and hue) until colors fit in sRGB.
+
+    Runs a fixed number of bisection steps over the whole array, so the cost
+    does not depend on how many colors are out of gamut.
+    """
+    np = require_numpy()
+    lch = np.array(lch, dtype=np.float64)
+    lch[..., 0] = np.clip(lch[..., 0], 0.0, 1.0)
+    lo = np.zeros(lch.shape[:-1])
+    hi = lch[..., 1].copy()
+    fits = in_srgb_gamut(oklch_to_srgb(lch))
+    lo = np.where(fits, hi, lo)
+    probe = lch.copy()
+    for _ in range(iterations):
+        mid = (lo + hi) / 2.0
+        probe[..., 1] = mid
+        ok = in_srgb_gamut(oklch_to_srgb(probe))
+        lo = np.where(ok, mid, lo)
+        hi = np.where(ok, hi, mid)
+    lch[..., 1] = lo
+    return lch
+
+
+def rgb8_to_oklab(rgb8):
+    return linear_to_oklab(rgb8_to_linear(rgb8))
+
+
+def rgb8_to_oklch(rgb8):
+    return oklab_to_oklch(rgb8_to_oklab(rgb8))
+
+
+def srgb_to_hsl_array(rgb):
+    """sRGB floats to HSL: hue in degrees, saturation and lightness in 0..1."""
+    np = require_numpy()
+    rgb = np.asarray(rgb, dtype=np.float64)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    mx, mn = rgb.max(axis=-1), rgb.min(axis=-1)
+    d = mx - mn
+    l = (mx + mn) / 2.0
+    chroma = d > 0
+    safe_d = np.where(chroma, d, 1.0)
+    s = np.where(chroma, d / np.where(chroma, 1.0 - np.abs(2.0 * l - 1.0), 1.0), 0.0)
+    h = np.where(
+        mx == r,
+        ((g - b) / safe_d) % 6.0,
+        np.where(mx == g, (b - r) / safe_d + 2.0, (r - g) / safe_d + 4.0),
+    )
+    h = np.where(chroma, h * 60.0, 0.0)
+    return np.stack([h, s, l], axis=-1)
+
+
+def hsl_to_srgb_array(hsl):
+    np = require_numpy()
+    hsl = np.asarray(hsl, dtype=np.float64)
+    h, s, l = hsl[..., 0], hsl[..., 1], hsl[..., 2]
+    a = s * np.minimum(l, 1.0 - l)
+    k = (np.array([0.0, 8.0, 4.0]) + h[..., None] / 30.0) % 12.0
+    c = np.clip(np.minimum(k - 3.0, 9.0 - k), -1.0, 1.0)
+    return l[..., None] - a[..., None] * c
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+
+
+def _time(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(n: int) -> None:
+    np = require_numpy()
+    rng = np.random.default_rng(0)
+    rgb8 = rng.integers(0, 256, size=(n, 3), dtype=np.uint8)
+    triples = [tuple(int(v) for v in row) for row in rgb8]
+    hexes = ["#%02X%02X%02X" % t for t in triples]
+    y = apca_luminance_array(rgb8)
+
+    def scalar_lum():
+        for r, g, b in triples:
+            rl, gl, bl = (srgb_to_linear(c / 255) for c in (r, g, b))
+            0.2126 * rl + 0.7152 * gl + 0.0722 * bl
+
+    def lut_lum():
+        for r, g, b in triples:
+            relative_luminance_rgb(r, g, b)
+
+    rows = [
+        ("luminance, scalar pow()", _time(scalar_lum)),
+        ("luminance, scalar LUT", _time(lut_lum)),
+        ("luminance, batched LUT", _time(lambda: relative_luminance_array(rgb8))),
+        ("APCA Lc, scalar", _time(lambda: [apca_lc_y(*p) for p in zip(y[:-1], y[1:])])),
+        ("APCA Lc, batched", _time(lambda: apca_lc_array(y[:-1], y[1:]))),
+        ("hex parse, batched", _time(lambda: hex_to_rgb8_array(hexes))),
+        ("HSL, scalar", _time(lambda: [rgb_to_hsl(*t) for t in triples])),
+        ("HSL, batched", _time(lambda: srgb_to_hsl_array(rgb8 / 255.0))),
+        ("HSL, interned Color", _time(lambda: [Color(h).hsl for h in hexes])),
+        ("OKLCH, batched", _time(lambda: rgb8_to_oklch(rgb8))),
+    ]
+    print(f"{n} colors, best of 5")
+    for label, seconds in rows:
+        rate = n / seconds / 1e6 if seconds > 0 else float("inf")
+        print(f"  {label:<26} {seconds * 1000:9.2f} ms  {rate:8.2f} M colors/s")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Kumanui color math utilities")
+    ap.add_argument(
+        "--bench",
+        nargs="?",
+        type=int,
+        const=100_000,
+        metavar="N",
+        help="Benchmark conversions on N random colors (default: 100000)",
+    )
+    args = ap.parse_args()
+    if args.bench is None:
+        ap.print_help()
+        return 0
+    bench(args.bench)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Contrast audit over the color pairings the themes actually use.
+
+Pairs are derived from the token tree rather than listed by hand:
+
+  web.<mode>    text, mutedText, heading, link, linkHover on background and
+                surface (4.5:1); accent on them as a UI color (3:1);
+                code.text on code.bg
+  terminal      text, boldText and every ANSI color on background; the ANSI
+                black (dark background) or white (light background) family
+                is reported as skipped, since it is meant to blend in
+
+Each pair is measured with both the WCAG 2 ratio and APCA Lc (signed: positive
+for dark text on light, negative for light on dark); --metric picks which one
+gates pass/fail (wcag by default, apca, or both). APCA thresholds apply to
+|Lc|: 60 for text and 45 for UI colors by default.
+
+Every text pair is also checked on the selection color composited over its
+background, and translucent foregrounds are composited before measuring, so
+the ratio is what is actually on screen.
+
+Results go to stdout and optionally to JSON and JUnit XML. They are cached
+under dist/.kumanui-cache/ by a hash of the resolved tokens, this code and
+the thresholds, so re-running on an unchanged theme only reloads the result.
+Exits 1 if any pair fails.
+
+Usage:
+  python3 _assets/scripts/kumanui.py audit [--json FILE|-] [--junit FILE]
+  python3 _assets/scripts/kumanui.py audit --metric both --min-lc-text 75
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, NamedTuple
+from xml.etree import ElementTree as ET
+
+from color_math import (
+    apca_lc,
+    apca_polarity,
+    composite_hex,
+    contrast_ratio,
+    relative_luminance,
+)
+from token_utils import SNAPSHOT_DIR, TokenGraph, TokenGraphError, digest_reads, load_graph
+
+ROOT = Path(__file__).resolve().parents[2]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+CACHE_DIR = SNAPSHOT_DIR / "contrast-audit"
+AUDIT_VERSION = 3
+METRICS = ("wcag", "apca", "both")
+
+WEB_TEXT = ("text", "mutedText", "heading", "link", "linkHover")
+WEB_UI = ("accent",)
+WEB_SURFACES = ("background", "surface")
+TERMINAL_TEXT = ("text", "boldText")
+
+
+class Pair(NamedTuple):
+    group: str
+    fg: str
+    bg: str
+    # Translucent layer composited over `bg` first (e.g. the selection)
+    over: str | None
+    min_ratio: float
+    # Minimum |APCA Lc|
+    min_lc: float
+    skip: str | None = None
+
+
+def _present(graph: TokenGraph, prefix: str, keys: tuple[str, ...]) -> list[str]:
+    return [f"{prefix}.{k}" for k in keys if f"{prefix}.{k}" in graph]
+
+
+def _with_selection(
+    group: str,
+    fgs: list[str],
+    bgs: list[str],
+    selection: str | None,
+    limits: tuple[float, float],
+) -> Iterator[Pair]:
+    for bg in bgs:
+        for fg in fgs:
+            yield Pair(group, fg, bg, None, *limits)
+            if selection is not None:
+                yield Pair(group, fg, bg, selection, *limits)
+
+
+def derive_pairs(
+    graph: TokenGraph,
+    min_text: float,
+    min_ui: float,
+    min_lc_text: float = 60.0,
+    min_lc_ui: float = 45.0,
+) -> list[Pair]:
+    """Every (foreground, background) pairing implied by semantics."""
+    text_limits = (min_text, min_lc_text)
+    ui_limits = (min_ui, min_lc_ui)
+    pairs: list[Pair] = []
+    for mode in graph.children("semantics.web"):
+        prefix = f"semantics.web.{mode}"
+        group = f"web.{mode}"
+        bgs = _present(graph, prefix, WEB_SURFACES)
+        selection = f"{prefix}.selection" if f"{prefix}.selection" in graph else None
+        text = _present(graph, prefix, WEB_TEXT)
+        pairs += _with_selection(group, text, bgs, selection, text_limits)
+        pairs += _with_selection(
+            group, _present(graph, prefix, WEB_UI), bgs, None, ui_limits
+        )
+        code = f"{prefix}.code"
+        if f"{code}.text" in graph and f"{code}.bg" in graph:
+            pairs += _with_selection(
+                group, [f"{code}.text"], [f"{code}.bg"], selection, text_limits
+            )
+
+    term = "semantics.terminal"
+    bg = f"{term}.background"
+    if bg in graph:
+        selection = f"{term}.selection" if f"{term}.selection" in graph else None
+        pairs += _with_selection(
+            "terminal", _present(graph, term, TERMINAL_TEXT), [bg], selection, text_limits
+        )
+        blend = "black" if relative_luminance(graph.hex(bg)) < 0.5 else "white"
+        blend_reason = f"ANSI {blend} is meant to blend with the background"
+        for kind in ("standard", "bright"):
+            for hue in graph.children(f"{term}.ansi.{kind}"):
+                fg = f"{term}.ansi.{kind}.{hue}"
+                skip = blend_reason if hue == blend else None
+                pairs.append(Pair("terminal", fg, bg, None, *text_limits, skip))
+                if selection is not None and skip is None:
+                    pairs.append(Pair("terminal", fg, bg, selection, *text_limits))
+    return pairs
+
+
+def _short(path: str) -> str:
+    for prefix in ("semantics.web.", "semantics.terminal."):
+        if path.startswith(prefix):
+            path = path[len(prefix) :]
+            return path.split(".", 1)[1] if prefix == "semantics.web." else path
+    return path
+
+
+def measure(graph: TokenGraph, pair: Pair, metric: str = "wcag") -> dict[str, object]:
+    """Composite the pair as it is drawn and return its result record.
+
+    `metric` ("wcag", "apca" or "both") selects what must pass; both values
+    are always recorded.
+    """
+    bg_hex = graph.hex(pair.bg)
+    bg_name = _short(pair.bg)
+    if pair.over is not None:
+        bg_hex = composite_hex(graph.hex(pair.over), graph.token(pair.over).alpha, bg_hex)
+        bg_name = f"{_short(pair.over)} over {bg_name}"
+    fg_hex = composite_hex(graph.hex(pair.fg), graph.token(pair.fg).alpha, bg_hex)
+    ratio = contrast_ratio(fg_hex, bg_hex)
+    lc = apca_lc(fg_hex, bg_hex)
+    failed = []
+    if metric != "apca" and ratio < pair.min_ratio:
+        failed.append("wcag")
+    if metric != "wcag" and abs(lc) < pair.min_lc:
+        failed.append("apca")
+    if pair.skip is not None:
+        status = "skip"
+    else:
+        status = "fail" if failed else "pass"
+    record: dict[str, object] = {
+        "group": pair.group,
+        "name": f"{_short(pair.fg)} on {bg_name}",
+        "fg": pair.fg,
+        "bg": pair.bg,
+        "over": pair.over,
+        "fg_hex": fg_hex,
+        "bg_hex": bg_hex,
+        "ratio": round(ratio, 2),
+        "min_ratio": pair.min_ratio,
+        "apca_lc": round(lc, 1),
+        "min_lc": pair.min_lc,
+        "polarity": apca_polarity(lc),
+        "status": status,
+    }
+    if pair.skip is not None:
+        record["reason"] = pair.skip
+    elif failed:
+        record["failed"] = failed
+    return record
+
+
+def audit(
+    graph: TokenGraph,
+    min_text: float = 4.5,
+    min_ui: float = 3.0,
+    metric: str = "wcag",
+    min_lc_text: float = 60.0,
+    min_lc_ui: float = 45.0,
+) -> dict[str, object]:
+    pairs = derive_pairs(graph, min_text, min_ui, min_lc_text, min_lc_ui)
+    results = [measure(graph, p, metric) for p in pairs]
+    summary = {"pairs": len(results), "pass": 0, "fail": 0, "skip": 0}
+    for r in results:
+        summary[r["status"]] += 1
+    name = graph.raw.get("meta", {}).get("name", "")
+    return {"theme": name, "metric": metric, "summary": summary, "results": results}
+
+
+# ---------------------------------------------------------------------------
+# Cache
+
+
+def cache_key(graph: TokenGraph, options: dict[str, object]) -> str:
+    h = hashlib.sha256(f"{AUDIT_VERSION}:{json.dumps(options, sort_keys=True)}".encode())
+    for name in ("contrast_audit.py", "color_math.py"):
+        h.update(Path(__file__).with_name(name).read_bytes())
+    h.update(digest_reads(graph, graph).encode("ascii"))
+    return h.hexdigest()
+
+
+def cached_audit(
+    graph: TokenGraph, options: dict[str, object], use_cache: bool = True
+) -> tuple[dict[str, object], bool]:
+    """Return (report, whether it came from the cache).
+
+    `options` are audit()'s keyword arguments.
+    """
+    key = cache_key(graph, options)
+    path = CACHE_DIR / f"{key[:32]}.json"
+    if use_cache:
+        try:
+            return json.loads(path.read_text(encoding="utf-8")), True
+        except (OSError, ValueError):
+            pass
+    report = audit(graph, **options)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report), encoding="utf-8")
+    except OSError:
+        pass
+    return report, False
+
+
+# ---------------------------------------------------------------------------
+# Output
+
+
+def junit_xml(report: dict[str, object]) -> bytes:
+    suites = ET.Element("testsuites", name=f"contrast {report['theme']}".strip())
+    groups: dict[str, ET.Element] = {}
+    for r in report["results"]:
+        suite = groups.get(r["group"])
+        if suite is None:
+            suite = ET.SubElement(suites, "testsuite", name=f"contrast.{r['group']}")
+            groups[r["group"]] = suite
+        case = ET.SubElement(
+            suite, "testcase", classname=f"contrast.{r['group']}", name=r["name"]
+        )
+        detail = (
+            f"{r['fg_hex']} on {r['bg_hex']}: {r['ratio']:.2f}:1, Lc {r['apca_lc']:.1f}"
+        )
+        if r["status"] == "fail":
+            reasons = []
+            if "wcag" in r["failed"]:
+                reasons.append(f"{r['ratio']:.2f}:1 < {r['min_ratio']}:1")
+            if "apca" in r["failed"]:
+                reasons.append(f"|Lc {r['apca_lc']:.1f}| < {r['min_lc']}")
+            failure = ET.SubElement(case, "failure", message="; ".join(reasons))
+            failure.text = detail
+        elif r["status"] == "skip":
+            ET.SubElement(case, "skipped", message=r.get("reason", ""))
+        else:
+            ET.SubElement(case, "system-out").text = detail
+    for suite in groups.values():
+        cases = list(suite)
+        suite.set("tests", str(len(cases)))
+        suite.set("failures", str(sum(1 for c in cases if c.find("failure") is not None)))
+        suite.set("skipped", str(sum(1 for c in cases if c.find("skipped") is not None)))
+    summary = report["summary"]
+    suites.set("tests", str(summary["pairs"]))
+    suites.set("failures", str(summary["fail"]))
+    suites.set("skipped", str(summary["skip"]))
+    ET.indent(suites)
+    return ET.tostring(suites, encoding="utf-8", xml_declaration=True) + b"\n"
+
+
+def _write(target: str, data: bytes) -> None:
+    if target == "-":
+        sys.stdout.buffer.write(data)
+        sys.stdout.flush()
+        return
+    path = Path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--tokens", default=str(TOKENS_PATH), help="Token file")
+    ap.add_argument("--json", help="Write the report as JSON ('-' for stdout)")
+    ap.add_argument("--junit", help="Write the report as JUnit XML")
+    ap.add_argument("--min-text", type=float, default=4.5, help="Text pair threshold")
+    ap.add_argument("--min-ui", type=float, default=3.0, help="UI color threshold")
+    ap.add_argument(
+        "--metric",
+        choices=METRICS,
+        default="wcag",
+        help="Which metric must pass: WCAG 2 ratio, APCA Lc or both (default: wcag)",
+    )
+    ap.add_argument(
+        "--min-lc-text", type=float, default=60.0, help="Text pair threshold on |Lc|"
+    )
+    ap.add_argument(
+        "--min-lc-ui", type=float, default=45.0, help="UI color threshold on |Lc|"
+    )
+    ap.add_argument("--no-cache", action="store_true", help="Recompute even if cached")
+    ap.add_argument("--all", action="store_true", help="List passing pairs too")
+
+
+def run(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    try:
+        graph = load_graph(Path(args.tokens))
+    except (OSError, TokenGraphError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    options = {
+        "min_text": args.min_text,
+        "min_ui": args.min_ui,
+        "metric": args.metric,
+        "min_lc_text": args.min_lc_text,
+        "min_lc_ui": args.min_lc_ui,
+    }
+    report, cached = cached_audit(graph, options, not args.no_cache)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        _write(args.json, json.dumps(report, indent=2).encode("utf-8") + b"\n")
+    if args.junit:
+        _write(args.junit, junit_xml(report))
+
+    # Keep stdout machine-readable when the JSON goes there
+    log = sys.stderr if args.json == "-" or args.junit == "-" else sys.stdout
+    for r in report["results"]:
+        if r["status"] == "fail" or args.all:
+            print(
+                f"{r['status'].upper():<4}  {r['group']:<10} {r['name']:<50} "
+                f"{r['ratio']:>6.2f}  Lc {r['apca_lc']:>6.1f}  "
+                f"(min {r['min_ratio']}, Lc {r['min_lc']:g})",
+                file=log,
+            )
+    s = report["summary"]
+    source = "cached" if cached else "computed"
+    print(
+        f"[audit] {s['pairs']} pairs: {s['pass']} pass, {s['fail']} fail, "
+        f"{s['skip']} skipped ({source}, {elapsed:.1f} ms)",
+        file=log,
+    )
+    return 1 if s["fail"] else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Audit contrast of semantic color pairs")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Build a 3D LUT (.cube) that recolors images into the Kumanui palette, and
+apply one to PNG frames.
+
+The LUT maps every sRGB color to the nearest palette tier in OKLab, or with
+--blend SIGMA to a Gaussian-weighted mix of them (smoother on photos). The
+same table works in ffmpeg (lut3d), DaVinci Resolve, Photoshop, etc.
+
+With images, each PNG is streamed through the LUT in bands of rows with
+trilinear interpolation (the standard .cube behavior), so memory stays
+bounded regardless of frame size. With Pillow installed, frames of up to
+16 MP are decoded whole first, which bounds memory at that size instead
+(see png_stream). Frames are spread over a process pool.
+
+Usage:
+  python3 _assets/scripts/kumanui.py lut -o dist/lut/kumanui-65.cube --size 65
+  python3 _assets/scripts/kumanui.py lut --blend 0.04 -o dist/lut/kumanui-soft.cube
+  python3 _assets/scripts/kumanui.py lut --apply frames/*.png --out dist/recolored
+  python3 _assets/scripts/kumanui.py lut --cube film.cube --apply shot.png --out out/
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from color_math import require_numpy
+
+ROOT = Path(__file__).resolve().parents[2]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+DEFAULT_OUT = ROOT / "dist/lut/kumanui.cube"
+RECOLOR_DIR = ROOT / "dist/recolored"
+# Pixels per band while applying (about 40 MB of float32 temporaries)
+BAND_PIXELS = 1 << 20
+
+
+def read_cube(path: Path):
+    """Parse a .cube file into a (size, size, size, 3) [b, g, r] float32 table."""
+    np = require_numpy()
+    size = None
+    domain_min, domain_max = [0.0] * 3, [1.0] * 3
+    values: list[str] = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key = line.split(None, 1)[0]
+            if key == "LUT_3D_SIZE":
+                size = int(line.split()[1])
+            elif key == "DOMAIN_MIN":
+                domain_min = [float(v) for v in line.split()[1:4]]
+            elif key == "DOMAIN_MAX":
+                domain_max = [float(v) for v in line.split()[1:4]]
+            elif key == "LUT_3D_INPUT_RANGE":
+                low, high = (float(v) for v in line.split()[1:3])
+                domain_min, domain_max = [low] * 3, [high] * 3
+            elif key == "LUT_1D_SIZE":
+                raise ValueError(f"{path}: 1D LUTs are not supported")
+            elif key != "TITLE":
+                values.append(line)
+    if size is None:
+        raise ValueError(f"{path}: missing LUT_3D_SIZE")
+    if domain_min != [0.0] * 3 or domain_max != [1.0] * 3:
+        raise ValueError(f"{path}: only the 0..1 domain is supported")
+    table = np.array(" ".join(values).split(), dtype=np.float32)
+    if table.size != size**3 * 3:
+        raise ValueError(f"{path}: expected {size**3} entries, found {table.size // 3}")
+    return table.reshape(size, size, size, 3)
+
+
+def apply_table(table, band):
+    """Trilinear lookup of a uint8 (..., 3+) band; alpha passes through."""
+    np = require_numpy()
+    size = table.shape[0]
+    # Per-channel cell index and fraction for all 256 input values
+    pos = np.arange(256, dtype=np.float32) * ((size - 1) / 255)
+    lo = np.minimum(pos.astype(np.intp), size - 2)
+    frac = (pos - lo)[..., None]
+    flat = table.reshape(-1, 3)
+    rgb = band[..., :3]
+    ri, gi, bi = lo[rgb[..., 0]], lo[rgb[..., 1]], lo[rgb[..., 2]]
+    rf, gf, bf = frac[rgb[..., 0]], frac[rgb[..., 1]], frac[rgb[..., 2]]
+    base = (bi * size + gi) * size + ri
+    out = np.zeros(rgb.shape, dtype=np.float32)
+    for db in (0, 1):
+        wb = bf if db else 1 - bf
+        for dg in (0, 1):
+            wg = wb * (gf if dg else 1 - gf)
+            for dr in (0, 1):
+                w = wg * (rf if dr else 1 - rf)
+                out += w * flat[base + (db * size + dg) * size + dr]
+    result = band.copy()
+    result[..., :3] = np.clip(out * 255 + 0.5, 0, 255).astype(np.uint8)
+    return result
+
+
+def apply_png(table, src: Path, dst: Path) -> tuple[int, int]:
+    """Recolor one PNG through the LUT; return (width, height)."""
+    from png_stream import PngWriter, read_bands
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(dst.name + ".tmp")
+    with src.open("rb") as f:
+        header, bands = read_bands(f, BAND_PIXELS)
+        channels = 4 if header.channels in (2, 4) else 3
+        with tmp.open("wb") as out:
+            writer = PngWriter(out, header.width, header.height, channels)
+            for band in bands:
+                writer.write(apply_table(table, band))
+            writer.close()
+    os.replace(tmp, dst)
+    return header.width, header.height
+
+
+def _apply_job(job: tuple[object, str, str]) -> tuple[str, int, int, str | None]:
+    table, src, dst = job
+    try:
+        width, height = apply_png(table, Path(src), Path(dst))
+    except (OSError, ValueError) as e:
+        return src, 0, 0, str(e)
+    return src, width, height, None
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("-o", "--output", default=str(DEFAULT_OUT), help="Output .cube file")
+    ap.add_argument(
+        "--size", type=int, default=33, help="Lattice points per axis (33 or 65 typical)"
+    )
+    ap.add_argument(
+        "--blend",
+        type=float,
+        default=0.0,
+        metavar="SIGMA",
+        help="Blend palette colors with this OKLab softness instead of snapping",
+    )
+    ap.add_argument("--tokens", default=str(TOKENS_PATH), help="Token file")
+    ap.add_argument("--name", default="Kumanui", help="LUT title")
+    ap.add_argument("--apply", nargs="+", metavar="PNG", help="Recolor these PNG files")
+    ap.add_argument("--cube", help="Apply this .cube file instead of the generated LUT")
+    ap.add_argument(
+        "--out", default=str(RECOLOR_DIR), help="Directory for recolored PNGs"
+    )
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes")
+
+
+def run(args: argparse.Namespace) -> int:
+    from exporters.lut import format_cube, palette_lut
+    from token_utils import TokenGraphError, load_graph
+
+    start = time.perf_counter()
+    try:
+        if args.cube:
+            table = read_cube(Path(args.cube))
+        else:
+            size = args.size
+            flat = palette_lut(load_graph(Path(args.tokens)), size, args.blend)
+            if not args.apply:
+                out = Path(args.output)
+                out.parent.mkdir(parents=True, exist_ok=True)
+                out.write_text(format_cube(flat, size, args.name), encoding="utf-8")
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"[lut] wrote {out} ({size}^3, {elapsed:.0f} ms)")
+                return 0
+            table = flat.astype("float32").reshape(size, size, size, 3)
+    except (OSError, TokenGraphError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+    out_dir = Path(args.out)
+    jobs = [(table, src, str(out_dir / Path(src).name)) for src in args.apply]
+    workers = min(len(jobs), args.jobs or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_apply_job, jobs))
+    else:
+        results = [_apply_job(job) for job in jobs]
+    failed = 0
+    pixels = 0
+    for src, width, height, error in results:
+        if error is not None:
+            failed += 1
+            print(f"ERROR: {src}: {error}", file=sys.stderr)
+        else:
+            pixels += width * height
+            print(f"[lut] {src} -> {out_dir / Path(src).name} ({width}x{height})")
+    elapsed = time.perf_counter() - start
+    print(f"[lut] {len(jobs) - failed} images, {pixels / 1e6:.1f} MP in {elapsed:.2f} s")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Build or apply a Kumanui 3D LUT")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
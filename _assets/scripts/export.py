@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Export the theme to terminal and editor formats in one pass.
+
+Tokens are loaded once into a shared ThemeModel (see exporters/) and every
+selected format is rendered from it. Formats come from the exporter
+registry; plugins can add more through the "kumanui.exporters" entry point
+group.
+
+Usage:
+  python3 _assets/scripts/kumanui.py export                 # all formats
+  python3 _assets/scripts/kumanui.py export kitty alacritty --out dist/themes
+  python3 _assets/scripts/kumanui.py export --list
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from exporters import BUILTIN_EXPORTERS, available_exporters, render_all
+from token_utils import TokenGraphError, load_graph
+
+ROOT = Path(__file__).resolve().parents[2]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+DEFAULT_OUT = ROOT / "dist"
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument(
+        "formats", nargs="*", help="Formats to export (default: all built-in formats)"
+    )
+    ap.add_argument("--out", default=str(DEFAULT_OUT), help="Output root (default: dist/)")
+    ap.add_argument("--tokens", default=str(TOKENS_PATH), help="Token file")
+    ap.add_argument("--name", default="Kumanui", help="Theme name in the outputs")
+    ap.add_argument("--list", action="store_true", help="List available formats")
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.list:
+        for name, exporter in available_exporters().items():
+            print(f"{name:<18} {exporter.filename:<36} {exporter.description}")
+        return 0
+
+    names = args.formats or list(BUILTIN_EXPORTERS)
+    start = time.perf_counter()
+    try:
+        graph = load_graph(Path(args.tokens))
+        outputs = render_all(graph, names, args.name)
+    except (KeyError, TokenGraphError, ValueError) as e:
+        message = e.args[0] if isinstance(e, KeyError) else e
+        print(f"ERROR: {message}", file=sys.stderr)
+        return 2
+
+    out_root = Path(args.out)
+    for name, (filename, data) in outputs.items():
+        path = out_root / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        print(f"[export] {name:<18} {path}")
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"[export] {len(outputs)} formats in {elapsed:.1f} ms")
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Export the theme to other formats")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,168 @@
+"""
+Registry of theme exporters.
+
+An exporter is a callable taking a ThemeModel and returning the file
+contents (str or bytes). Built-in exporters are listed here as
+"module:function" strings and imported only when selected; third-party
+exporters are discovered through the "kumanui.exporters" entry point group,
+which is scanned only when a format is not built in (or for --list). A
+plugin's callable may set a ``filename`` attribute (relative output path);
+otherwise "<name>/kumanui.<name>" is used.
+
+render_all() builds the model once and renders every selected format from it.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import Callable, NamedTuple, Union
+
+from color_math import Color
+from exporters.model import (
+    ANSI_NAMES,
+    CodeColors,
+    Palette,
+    PaletteHue,
+    ThemeModel,
+    WebSemantics,
+    palette_tiers,
+    theme_model,
+)
+from token_utils import TokenGraph
+
+__all__ = [
+    "ANSI_NAMES",
+    "BUILTIN_EXPORTERS",
+    "CodeColors",
+    "Color",
+    "ENTRY_POINT_GROUP",
+    "Exporter",
+    "Palette",
+    "PaletteHue",
+    "ThemeModel",
+    "WebSemantics",
+    "available_exporters",
+    "get_exporter",
+    "palette_tiers",
+    "render_all",
+    "theme_model",
+]
+
+Render = Callable[[ThemeModel], Union[str, bytes]]
+
+ENTRY_POINT_GROUP = "kumanui.exporters"
+
+# name -> (target, output path relative to the output root, description)
+BUILTIN_EXPORTERS: dict[str, tuple[str, str, str]] = {
+    "css": ("exporters.web:css", "css/kumanui.css", "CSS custom properties"),
+    "vscode": (
+        "exporters.web:vscode",
+        "vscode/kumanui-color-theme.json",
+        "VS Code color theme",
+    ),
+    "macos-terminal": (
+        "exporters.apple:macos_terminal",
+        "macos-terminal/Kumanui.terminal",
+        "macOS Terminal profile",
+    ),
+    "iterm2": (
+        "exporters.apple:iterm2",
+        "iterm2/Kumanui.itermcolors",
+        "iTerm2 color preset",
+    ),
+    "windows-terminal": (
+        "exporters.terminals:windows_terminal",
+        "windows-terminal/kumanui.json",
+        "Windows Terminal color scheme",
+    ),
+    "alacritty": (
+        "exporters.terminals:alacritty",
+        "alacritty/kumanui.toml",
+        "Alacritty colors (TOML)",
+    ),
+    "kitty": ("exporters.terminals:kitty", "kitty/kumanui.conf", "kitty theme"),
+    "wezterm": (
+        "exporters.terminals:wezterm",
+        "wezterm/Kumanui.toml",
+        "WezTerm color scheme",
+    ),
+    "xresources": (
+        "exporters.terminals:xresources",
+        "xresources/kumanui.Xresources",
+        "X resources (xterm, urxvt)",
+    ),
+    "cube": (
+        "exporters.lut:cube",
+        "lut/kumanui.cube",
+        "33^3 3D LUT snapping sRGB to the palette",
+    ),
+}
+
+
+class Exporter(NamedTuple):
+    name: str
+    filename: str
+    description: str
+    loader: Callable[[], Render]
+
+    def load(self) -> Render:
+        return self.loader()
+
+
+def _import_target(target: str) -> Callable[[], Render]:
+    def load() -> Render:
+        module, _, attr = target.partition(":")
+        return getattr(importlib.import_module(module), attr)
+
+    return load
+
+
+def _builtin(name: str) -> Exporter:
+    target, filename, description = BUILTIN_EXPORTERS[name]
+    return Exporter(name, filename, description, _import_target(target))
+
+
+def _plugins() -> dict[str, Exporter]:
+    from importlib.metadata import entry_points
+
+    found: dict[str, Exporter] = {}
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        if ep.name in BUILTIN_EXPORTERS:
+            continue
+        description = f"plugin ({ep.value})"
+        found[ep.name] = Exporter(
+            ep.name, f"{ep.name}/kumanui.{ep.name}", description, ep.load
+        )
+    return found
+
+
+def available_exporters(plugins: bool = True) -> dict[str, Exporter]:
+    exporters = {name: _builtin(name) for name in BUILTIN_EXPORTERS}
+    if plugins:
+        exporters.update(_plugins())
+    return exporters
+
+
+def get_exporter(name: str) -> Exporter:
+    if name in BUILTIN_EXPORTERS:
+        return _builtin(name)
+    plugin = _plugins().get(name)
+    if plugin is None:
+        raise KeyError(f"Unknown export format: {name}")
+    return plugin
+
+
+def render_all(
+    graph: TokenGraph, names: list[str], theme_name: str = "Kumanui"
+) -> dict[str, tuple[str, bytes]]:
+    """Render each format from one shared model; name -> (filename, data)."""
+    model = theme_model(graph, theme_name)
+    out: dict[str, tuple[str, bytes]] = {}
+    for name in names:
+        exporter = get_exporter(name)
+        render = exporter.load()
+        data = render(model)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        out[name] = (getattr(render, "filename", exporter.filename), data)
+    return out
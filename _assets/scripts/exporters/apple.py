@@ -0,0 +1,50 @@
+"""
+macOS Terminal and iTerm2 exporters.
+"""
+
+from __future__ import annotations
+
+import plistlib
+
+from color_math import Color
+from exporters.model import ThemeModel
+
+_ITERM_KEYS = {
+    "background": "Background Color",
+    "foreground": "Foreground Color",
+    "bold": "Bold Color",
+    "cursor": "Cursor Color",
+    "cursor_text": "Cursor Text Color",
+    "selection": "Selection Color",
+}
+
+
+def macos_terminal(model: ThemeModel) -> bytes:
+    from generate_macos_terminal import (
+        DEFAULT_FONT_NAME,
+        DEFAULT_FONT_SIZE,
+        render_model_profile,
+    )
+
+    return render_model_profile(model, DEFAULT_FONT_NAME, DEFAULT_FONT_SIZE)
+
+
+def _iterm_color(color: Color) -> dict[str, object]:
+    r, g, b = color.rgb01
+    return {
+        "Alpha Component": color.alpha,
+        "Blue Component": b,
+        "Color Space": "sRGB",
+        "Green Component": g,
+        "Red Component": r,
+    }
+
+
+def iterm2(model: ThemeModel) -> bytes:
+    preset: dict[str, object] = {
+        f"Ansi {i} Color": _iterm_color(color) for i, color in enumerate(model.ansi)
+    }
+    for field, key in _ITERM_KEYS.items():
+        preset[key] = _iterm_color(getattr(model, field))
+    preset["Selected Text Color"] = _iterm_color(model.foreground)
+    return plistlib.dumps(preset, fmt=plistlib.FMT_XML)
@@ -0,0 +1,82 @@
+"""
+3D LUT (.cube) exporter mapping arbitrary sRGB onto the palette.
+
+Every lattice point is matched in OKLab against the palette tiers: either
+snapped to the nearest one, or (with a softness) blended from all of them
+with Gaussian weights on OKLab distance, which keeps gradients in photos
+from banding. The table is computed in NumPy blocks, so 65^3 takes well
+under a second.
+"""
+
+from __future__ import annotations
+
+from color_math import (
+    hex_to_rgb8_array,
+    linear_to_oklab,
+    linear_to_srgb_array,
+    oklab_to_linear,
+    require_numpy,
+    rgb8_to_oklab,
+    srgb_to_linear_array,
+)
+from exporters.model import ThemeModel, palette_tiers
+from token_utils import TokenGraph
+
+# Lattice points per distance block
+_BLOCK = 1 << 14
+
+
+def lut_table(hexes: list[str], size: int = 33, softness: float = 0.0):
+    """(size^3, 3) float sRGB table in .cube order (red varies fastest).
+
+    softness is the Gaussian sigma in OKLab units; 0 snaps to the nearest
+    color.
+    """
+    np = require_numpy()
+    if size < 2:
+        raise ValueError(f"LUT size must be at least 2, got {size}")
+    axis = np.linspace(0.0, 1.0, size)
+    b, g, r = np.meshgrid(axis, axis, axis, indexing="ij")
+    lattice = linear_to_oklab(srgb_to_linear_array(np.stack([r, g, b], axis=-1)))
+    lattice = lattice.reshape(-1, 3)
+    targets = rgb8_to_oklab(hex_to_rgb8_array(hexes))
+    target_rgb = hex_to_rgb8_array(hexes) / 255.0
+    norms = (targets**2).sum(axis=1)
+
+    out = np.empty((len(lattice), 3))
+    for start in range(0, len(lattice), _BLOCK):
+        block = lattice[start : start + _BLOCK]
+        d2 = (block**2).sum(axis=1)[:, None] - 2 * block @ targets.T + norms
+        if softness <= 0:
+            out[start : start + _BLOCK] = target_rgb[np.argmin(d2, axis=1)]
+            continue
+        # Relative to the nearest target, so the weights cannot underflow
+        w = np.exp(-(d2 - d2.min(axis=1, keepdims=True)) / (2 * softness**2))
+        lab = (w @ targets) / w.sum(axis=1, keepdims=True)
+        out[start : start + _BLOCK] = linear_to_srgb_array(oklab_to_linear(lab))
+    return np.clip(out, 0.0, 1.0)
+
+
+def format_cube(table, size: int, title: str) -> str:
+    header = (
+        f'TITLE "{title}"\n'
+        f"LUT_3D_SIZE {size}\n"
+        "DOMAIN_MIN 0.0 0.0 0.0\n"
+        "DOMAIN_MAX 1.0 1.0 1.0\n"
+    )
+    values = tuple(table.ravel().tolist())
+    return header + ("%.6f %.6f %.6f\n" * len(table)) % values
+
+
+def palette_lut(graph: TokenGraph, size: int = 33, softness: float = 0.0):
+    """lut_table() over the palette tiers."""
+    hexes = list(dict.fromkeys(h for _, _, h in palette_tiers(graph)))
+    return lut_table(hexes, size, softness)
+
+
+def cube_lut(model: ThemeModel, size: int = 33, softness: float = 0.0) -> str:
+    return format_cube(palette_lut(model.graph, size, softness), size, model.name)
+
+
+def cube(model: ThemeModel) -> str:
+    return cube_lut(model)
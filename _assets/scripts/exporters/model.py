@@ -0,0 +1,204 @@
+"""
+Resolved theme model shared by all exporters.
+
+Built once per token graph, so the semantics.terminal / semantics.web walk
+lives here instead of in every output format. Colors are interned
+color_math.Color objects, so themes that share a color share one object
+and its cached conversions. The web semantics and the palette are resolved
+on first access, so a format that does not use them does not read those
+tokens (build tracks the reads of each target to key its cache).
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from color_math import Color
+from token_utils import TokenGraph
+
+# ANSI order: index i is color i (standard), i + 8 its bright variant
+ANSI_NAMES = ("black", "red", "green", "yellow", "blue", "magenta", "cyan", "white")
+# Palette hues and tiers in README/CSS order
+PALETTE_HUES = ("black", "white", "red", "green", "blue", "yellow", "magenta", "cyan")
+PALETTE_TIERS = ("base", "light", "dark")
+TERMINAL = "semantics.terminal"
+WEB = "semantics.web"
+# semantics.web.<mode> key -> WebSemantics attribute, in CSS output order
+WEB_KEYS = {
+    "background": "background",
+    "surface": "surface",
+    "text": "text",
+    "mutedText": "muted_text",
+    "heading": "heading",
+    "link": "link",
+    "linkHover": "link_hover",
+    "border": "border",
+    "accent": "accent",
+    "selection": "selection",
+    "code.bg": "code.bg",
+    "code.text": "code.text",
+}
+
+
+class PaletteHue(NamedTuple):
+    base: Color
+    light: Color
+    dark: Color
+
+
+class Palette(NamedTuple):
+    black: PaletteHue
+    white: PaletteHue
+    red: PaletteHue
+    green: PaletteHue
+    blue: PaletteHue
+    yellow: PaletteHue
+    magenta: PaletteHue
+    cyan: PaletteHue
+
+
+class CodeColors(NamedTuple):
+    bg: Color | None = None
+    text: Color | None = None
+
+
+class WebSemantics(NamedTuple):
+    """One semantics.web.<mode>; keys the mode leaves out are None."""
+
+    background: Color
+    text: Color
+    surface: Color | None = None
+    muted_text: Color | None = None
+    heading: Color | None = None
+    link: Color | None = None
+    link_hover: Color | None = None
+    border: Color | None = None
+    accent: Color | None = None
+    selection: Color | None = None
+    code: CodeColors = CodeColors()
+
+    def get(self, key: str) -> Color | None:
+        """Color for a token key such as "mutedText" or "code.bg", or None."""
+        attr = WEB_KEYS.get(key)
+        if attr is None:
+            return None
+        value = self
+        for part in attr.split("."):
+            value = getattr(value, part)
+        return value
+
+
+class ThemeModel:
+    """A theme's resolved colors; web and palette resolve on first access."""
+
+    __slots__ = (
+        "name",
+        "background",
+        "foreground",
+        "bold",
+        "cursor",
+        "cursor_text",
+        "selection",
+        "ansi",
+        "graph",
+        "_web",
+        "_palette",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        background: Color,
+        foreground: Color,
+        bold: Color,
+        cursor: Color,
+        cursor_text: Color,
+        selection: Color,
+        ansi: tuple[Color, ...],  # 16 entries: standard 0-7, bright 8-15
+        graph: TokenGraph,  # for formats that need more than the model
+    ) -> None:
+        self.name = name
+        self.background = background
+        self.foreground = foreground
+        self.bold = bold
+        self.cursor = cursor
+        self.cursor_text = cursor_text
+        self.selection = selection
+        self.ansi = ansi
+        self.graph = graph
+        self._web: dict[str, WebSemantics] | None = None
+        self._palette: Palette | None = None
+
+    @property
+    def standard(self) -> tuple[Color, ...]:
+        return self.ansi[:8]
+
+    @property
+    def bright(self) -> tuple[Color, ...]:
+        return self.ansi[8:]
+
+    @property
+    def web(self) -> dict[str, WebSemantics]:
+        """theme.web["dark"].muted_text"""
+        if self._web is None:
+            graph = self.graph
+            self._web = {
+                mode: web_semantics(graph, f"{WEB}.{mode}") for mode in graph.children(WEB)
+            }
+        return self._web
+
+    @property
+    def palette(self) -> Palette:
+        """theme.palette.red.light"""
+        if self._palette is None:
+            color = self.graph.color
+            self._palette = Palette(
+                *(
+                    PaletteHue(*(color(f"palette.{hue}.{tier}") for tier in PALETTE_TIERS))
+                    for hue in PALETTE_HUES
+                )
+            )
+        return self._palette
+
+
+def palette_tiers(graph: TokenGraph) -> list[tuple[str, str, str]]:
+    """(hue, tier, hex) for every palette tier, by hue then tier."""
+    return [
+        (hue, tier, graph.hex(f"palette.{hue}.{tier}"))
+        for hue in PALETTE_HUES
+        for tier in PALETTE_TIERS
+    ]
+
+
+def web_semantics(graph: TokenGraph, prefix: str) -> WebSemantics:
+    """Resolve one semantics.web.<mode> group."""
+    fields: dict[str, Color] = {}
+    code: dict[str, Color] = {}
+    for key, attr in WEB_KEYS.items():
+        path = f"{prefix}.{key}"
+        if path in graph and graph.token(path).hex is not None:
+            if attr.startswith("code."):
+                code[attr[len("code.") :]] = graph.color(path)
+            else:
+                fields[attr] = graph.color(path)
+    return WebSemantics(**fields, code=CodeColors(**code))
+
+
+def theme_model(graph: TokenGraph, name: str = "Kumanui") -> ThemeModel:
+    """Resolve the terminal semantics of a token graph (the rest on access)."""
+    color = graph.color
+    standard = [color(f"{TERMINAL}.ansi.standard.{n}") for n in ANSI_NAMES]
+    bright = [color(f"{TERMINAL}.ansi.bright.{n}") for n in ANSI_NAMES]
+    background = color(f"{TERMINAL}.background")
+    return ThemeModel(
+        name=name,
+        background=background,
+        foreground=color(f"{TERMINAL}.text"),
+        bold=color(f"{TERMINAL}.boldText"),
+        cursor=color(f"{TERMINAL}.cursor"),
+        # Cursor text uses the background for contrast
+        cursor_text=background,
+        selection=color(f"{TERMINAL}.selection"),
+        ansi=tuple(standard + bright),
+        graph=graph,
+    )
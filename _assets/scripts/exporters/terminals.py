@@ -0,0 +1,122 @@
+"""
+Terminal emulator color schemes rendered from the shared ThemeModel.
+
+Formats without alpha support get selection and cursor colors composited
+onto the terminal background.
+"""
+
+from __future__ import annotations
+
+import json
+
+from exporters.model import ANSI_NAMES, ThemeModel
+
+# Windows Terminal calls magenta "purple"
+_WT_NAMES = tuple("purple" if n == "magenta" else n for n in ANSI_NAMES)
+
+
+def _solid(model: ThemeModel) -> dict[str, str]:
+    bg = model.background.hex
+    return {
+        "background": bg,
+        "foreground": model.foreground.hex,
+        "bold": model.bold.hex,
+        "cursor": model.cursor.over(bg),
+        "cursor_text": model.cursor_text.over(bg),
+        "selection": model.selection.over(bg),
+    }
+
+
+def windows_terminal(model: ThemeModel) -> str:
+    c = _solid(model)
+    scheme = {
+        "name": model.name,
+        "background": c["background"],
+        "foreground": c["foreground"],
+        "cursorColor": c["cursor"],
+        "selectionBackground": c["selection"],
+    }
+    for name, color in zip(_WT_NAMES, model.standard):
+        scheme[name] = color.hex
+    for name, color in zip(_WT_NAMES, model.bright):
+        scheme[f"bright{name.capitalize()}"] = color.hex
+    return json.dumps(scheme, indent=4) + "\n"
+
+
+def alacritty(model: ThemeModel) -> str:
+    c = _solid(model)
+    lines = [
+        f"# {model.name} for Alacritty (0.13+). Generated from tokens/colors.yaml.",
+        "",
+        "[colors.primary]",
+        f'background = "{c["background"]}"',
+        f'foreground = "{c["foreground"]}"',
+        f'bright_foreground = "{c["bold"]}"',
+        "",
+        "[colors.cursor]",
+        f'text = "{c["cursor_text"]}"',
+        f'cursor = "{c["cursor"]}"',
+        "",
+        "[colors.selection]",
+        'text = "CellForeground"',
+        f'background = "{c["selection"]}"',
+    ]
+    for table, colors in (("normal", model.standard), ("bright", model.bright)):
+        lines += ["", f"[colors.{table}]"]
+        lines += [f'{name} = "{color.hex}"' for name, color in zip(ANSI_NAMES, colors)]
+    return "\n".join(lines) + "\n"
+
+
+def kitty(model: ThemeModel) -> str:
+    c = _solid(model)
+    lines = [
+        f"# {model.name} for kitty. Generated from tokens/colors.yaml.",
+        "",
+        f"foreground {c['foreground']}",
+        f"background {c['background']}",
+        "selection_foreground none",
+        f"selection_background {c['selection']}",
+        f"cursor {c['cursor']}",
+        f"cursor_text_color {c['cursor_text']}",
+        "",
+    ]
+    lines += [f"color{i} {color.hex}" for i, color in enumerate(model.ansi)]
+    return "\n".join(lines) + "\n"
+
+
+def wezterm(model: ThemeModel) -> str:
+    c = _solid(model)
+
+    def array(colors) -> str:
+        return "[" + ", ".join(f'"{color.hex}"' for color in colors) + "]"
+
+    lines = [
+        "[colors]",
+        f'foreground = "{c["foreground"]}"',
+        f'background = "{c["background"]}"',
+        f'cursor_bg = "{c["cursor"]}"',
+        f'cursor_fg = "{c["cursor_text"]}"',
+        f'cursor_border = "{c["cursor"]}"',
+        f'selection_bg = "{c["selection"]}"',
+        f'selection_fg = "{c["foreground"]}"',
+        f"ansi = {array(model.standard)}",
+        f"brights = {array(model.bright)}",
+        "",
+        "[metadata]",
+        f'name = "{model.name}"',
+        'origin_url = "https://github.com/kjm8/kumanui"',
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def xresources(model: ThemeModel) -> str:
+    c = _solid(model)
+    lines = [
+        f"! {model.name}. Generated from tokens/colors.yaml.",
+        f"*.foreground: {c['foreground']}",
+        f"*.background: {c['background']}",
+        f"*.cursorColor: {c['cursor']}",
+        f"*.colorBD: {c['bold']}",
+    ]
+    lines += [f"*.color{i}: {color.hex}" for i, color in enumerate(model.ansi)]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,85 @@
+"""
+CSS and VS Code theme exporters.
+"""
+
+from __future__ import annotations
+
+import json
+
+from color_math import Color
+from exporters.model import ANSI_NAMES, ThemeModel
+
+# VS Code workbench color -> semantics.web.<mode> key
+_VSCODE_WORKBENCH = {
+    "editor.background": "background",
+    "editor.foreground": "text",
+    "foreground": "text",
+    "descriptionForeground": "mutedText",
+    "editorLineNumber.foreground": "mutedText",
+    "editor.selectionBackground": "selection",
+    "sideBar.background": "surface",
+    "activityBar.background": "surface",
+    "statusBar.background": "surface",
+    "titleBar.activeBackground": "surface",
+    "panel.background": "surface",
+    "editorGroupHeader.tabsBackground": "surface",
+    "tab.inactiveBackground": "surface",
+    "tab.activeBackground": "background",
+    "panel.border": "border",
+    "sideBar.border": "border",
+    "editorGroup.border": "border",
+    "focusBorder": "accent",
+    "button.background": "accent",
+    "textLink.foreground": "link",
+    "textLink.activeForeground": "linkHover",
+    "textCodeBlock.background": "code.bg",
+    "textPreformat.foreground": "code.text",
+}
+
+# TextMate scopes -> semantics.web.<mode> key
+_VSCODE_TOKENS = (
+    ("Comment", ["comment", "punctuation.definition.comment"], "mutedText"),
+    ("Keyword", ["keyword", "storage"], "accent"),
+    ("Heading", ["markup.heading", "entity.name.section"], "heading"),
+    ("Link", ["markup.underline.link", "string.other.link"], "link"),
+)
+
+
+def css(model: ThemeModel) -> str:
+    from generate_css import generate_css
+
+    return generate_css(model.graph)
+
+
+def vscode(model: ThemeModel, mode: str = "dark") -> str:
+    web = model.web.get(mode)
+
+    def color(key: str) -> Color | None:
+        return web.get(key) if web is not None else None
+
+    colors: dict[str, str] = {}
+    for workbench_key, key in _VSCODE_WORKBENCH.items():
+        value = color(key)
+        if value is not None:
+            colors[workbench_key] = value.hex8
+
+    colors["terminal.background"] = model.background.hex
+    colors["terminal.foreground"] = model.foreground.hex
+    colors["terminalCursor.foreground"] = model.cursor.hex8
+    colors["terminal.selectionBackground"] = model.selection.hex8
+    for prefix, group in (("", model.standard), ("Bright", model.bright)):
+        for name, value in zip(ANSI_NAMES, group):
+            colors[f"terminal.ansi{prefix}{name.capitalize()}"] = value.hex
+
+    token_colors = [
+        {"name": name, "scope": scope, "settings": {"foreground": color(key).hex8}}
+        for name, scope, key in _VSCODE_TOKENS
+        if color(key) is not None
+    ]
+    theme = {
+        "name": f"{model.name} {mode.capitalize()}",
+        "type": mode,
+        "colors": colors,
+        "tokenColors": token_colors,
+    }
+    return json.dumps(theme, indent=2) + "\n"
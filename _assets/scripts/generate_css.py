@@ -1,37 +1,44 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+import gzip
+import re
+import sys
 from pathlib import Path
-import yaml
+from typing import Collection
 
-from token_utils import color_entry_to_hex, hex_to_rgb
+from exporters.model import WEB_KEYS
+from token_utils import TokenGraph, TokenGraphError, load_graph
 
 ROOT = Path(__file__).resolve().parents[2]
 TOKENS_PATH = ROOT / "tokens/colors.yaml"
 OUT_DIR = ROOT / "dist/css"
 OUT_FILE = OUT_DIR / "kumanui.css"
+MIN_OUT_FILE = OUT_DIR / "kumanui.min.css"
+# Content-Encoding -> suffix of the precompressed siblings of MIN_OUT_FILE
+SUFFIXES = {"gzip": ".gz", "br": ".br"}
 
 
-def token_to_css_color(entry: dict, tokens: dict) -> str:
-    hexv = color_entry_to_hex(tokens, entry)
-    alpha = entry.get("alpha")
+def token_to_css_color(graph: TokenGraph, path: str) -> str:
+    alpha = graph.entry(path).get("alpha")
     if alpha is not None:
-        r, g, b = hex_to_rgb(hexv)
+        r, g, b = graph.color(path).rgb
         return f"rgba({r}, {g}, {b}, {float(alpha)})"
-    return hexv
+    return graph.hex(path)
 
 
-def semantic_entry_to_css_value(entry: dict, tokens: dict) -> str:
+def semantic_entry_to_css_value(graph: TokenGraph, path: str) -> str:
     """Prefer referencing palette CSS variables when possible.
 
-    - If entry.value is a palette ref (e.g., {palette.cyan.dark}), emit
+    - If the token references a palette entry (e.g., {palette.cyan.dark}), emit
       var(--kumanui-cyan-dark) or a color-mix with transparent when alpha exists.
     - Otherwise, fall back to concrete color via token_to_css_color.
     """
-    val = entry.get("value")
-    alpha = entry.get("alpha")
-    if isinstance(val, str) and val.startswith("{") and val.endswith("}"):
-        parts = val[1:-1].split(".")
+    ref = graph.ref(path)
+    alpha = graph.entry(path).get("alpha")
+    if ref is not None:
+        parts = ref.split(".")
         if len(parts) == 3 and parts[0] == "palette":
             hue, tier = parts[1], parts[2]
             var_name = f"--kumanui-{hue}-{tier}"
@@ -46,82 +53,104 @@ def semantic_entry_to_css_value(entry: dict, tokens: dict) -> str:
                 return f"color-mix(in srgb, var({var_name}) {pct_str}, transparent)"
             return f"var({var_name})"
     # Fallback to resolved color (hex or rgba)
-    return token_to_css_color(entry, tokens)
+    return token_to_css_color(graph, path)
 
 
-def generate_css(tokens: dict) -> str:
-    lines: list[str] = []
-    lines.append("/* Generated from tokens/colors.yaml — do not edit directly. */")
-    lines.append(":root {")
-
-    # Palette variables
-    palette = tokens.get("palette", {})
+def palette_variables(graph: TokenGraph) -> list[tuple[str, str]]:
+    """Return (variable, token path) pairs for the palette, in output order."""
     order = ["black", "white", "red", "green", "blue", "yellow", "magenta", "cyan"]
     tiers = ["base", "light", "dark"]
+    variables: list[tuple[str, str]] = []
     for hue in order:
-        group = palette.get(hue, {})
-        if not isinstance(group, dict):
-            continue
         for tier in tiers:
-            entry = group.get(tier)
-            if not isinstance(entry, dict):
+            path = f"palette.{hue}.{tier}"
+            if path not in graph or graph.token(path).hex is None:
                 continue
-            val = entry.get("value")
-            if isinstance(val, str) and val.startswith("#"):
-                lines.append(f"  --kumanui-{hue}-{tier}: {val.upper()};")
+            variables.append((f"--kumanui-{hue}-{tier}", path))
+    # Extra groups (e.g. palette.brand from an extends: overlay), in file order,
+    # so semantic var() references to them resolve
+    for group in graph.children("palette"):
+        if group in order:
+            continue
+        for key in graph.children(f"palette.{group}"):
+            path = f"palette.{group}.{key}"
+            if path in graph and graph.token(path).hex is not None:
+                variables.append((f"--kumanui-{group}-{key}", path))
+    return variables
+
+
+def palette_properties(graph: TokenGraph) -> list[tuple[str, str]]:
+    return [(name, graph.hex(path)) for name, path in palette_variables(graph)]
+
+
+def web_variables(graph: TokenGraph, mode: str) -> list[tuple[str, str]]:
+    """Return (variable, token path) pairs for semantics.web.<mode>."""
+    prefix = f"semantics.web.{mode}"
+    if not graph.children(prefix):
+        return []
+
+    variables: list[tuple[str, str]] = []
+    # The model's key table, so CSS and the typed WebSemantics cover the same
+    # keys; values stay token paths since the CSS references palette variables
+    for key in WEB_KEYS:
+        path = f"{prefix}.{key}"
+        if path in graph:
+            name = re.sub(r"[A-Z]", lambda m: f"-{m.group().lower()}", key)
+            variables.append((f"--kumanui-web-{name.replace('.', '-')}", path))
+    return variables
+
+
+def web_properties(graph: TokenGraph, mode: str) -> list[tuple[str, str]]:
+    """Return (variable, value) pairs for semantics.web.<mode>."""
+    return [
+        (name, semantic_entry_to_css_value(graph, path))
+        for name, path in web_variables(graph, mode)
+    ]
+
+
+def variable_paths(graph: TokenGraph) -> dict[str, list[str]]:
+    """Map each emitted variable to the token paths behind it (one per mode)."""
+    paths: dict[str, list[str]] = {}
+    for name, path in palette_variables(graph):
+        paths.setdefault(name, []).append(path)
+    for mode in ("light", "dark"):
+        for name, path in web_variables(graph, mode):
+            paths.setdefault(name, []).append(path)
+    return paths
+
+
+def _keep(
+    properties: list[tuple[str, str]], only: Collection[str] | None
+) -> list[tuple[str, str]]:
+    if only is None:
+        return properties
+    return [(name, value) for name, value in properties if name in only]
+
+
+def generate_css(graph: TokenGraph, only: Collection[str] | None = None) -> str:
+    """Full CSS; with `only`, just the variables named there (see shake_css)."""
+    lines: list[str] = []
+    lines.append("/* Generated from tokens/colors.yaml — do not edit directly. */")
+    lines.append(":root {")
+
+    # Palette variables
+    for name, value in _keep(palette_properties(graph), only):
+        lines.append(f"  {name}: {value};")
 
     lines.append("}")
     lines.append("")
 
     # Web semantics (light/dark)
-    web = tokens.get("semantics", {}).get("web", {})
-
-    def collect_web_properties(mode: str) -> list[tuple[str, str]]:
-        group = web.get(mode)
-        if not isinstance(group, dict):
-            return []
-
-        properties: list[tuple[str, str]] = []
-
-        flat_keys = [
-            "background",
-            "surface",
-            "text",
-            "mutedText",
-            "heading",
-            "link",
-            "linkHover",
-            "border",
-            "accent",
-            "selection",
-        ]
-        for key in flat_keys:
-            entry = group.get(key)
-            if isinstance(entry, dict):
-                css_val = semantic_entry_to_css_value(entry, tokens)
-                var_name = key.replace("mutedText", "muted-text").replace(
-                    "linkHover", "link-hover"
-                )
-                properties.append((f"--kumanui-web-{var_name}", css_val))
-
-        code = group.get("code")
-        if isinstance(code, dict):
-            for sub in ("bg", "text"):
-                entry = code.get(sub)
-                if isinstance(entry, dict):
-                    css_val = semantic_entry_to_css_value(entry, tokens)
-                    properties.append((f"--kumanui-web-code-{sub}", css_val))
-
-        return properties
+    light_properties = _keep(web_properties(graph, "light"), only)
+    dark_properties = _keep(web_properties(graph, "dark"), only)
 
-    def add_web_block(mode: str, selector: str, *, include_color_scheme: bool) -> None:
-        properties = collect_web_properties(mode)
+    def add_web_block(
+        properties: list[tuple[str, str]], scheme: str, selector: str
+    ) -> None:
         if not properties:
             return
         lines.append(f"{selector} {{")
-        if include_color_scheme:
-            scheme = "dark" if mode == "dark" else "light"
-            lines.append(f"  color-scheme: {scheme};")
+        lines.append(f"  color-scheme: {scheme};")
         for name, value in properties:
             lines.append(f"  {name}: {value};")
         lines.append("}")
@@ -129,11 +158,10 @@ def generate_css(tokens: dict) -> str:
 
     # Emit variables for light and dark modes.
     # Attach to data-theme attribute selectors for easy toggling in apps.
-    add_web_block("light", ":root, [data-theme='light']", include_color_scheme=True)
-    add_web_block("dark", "[data-theme='dark']", include_color_scheme=True)
+    add_web_block(light_properties, "light", ":root, [data-theme='light']")
+    add_web_block(dark_properties, "dark", "[data-theme='dark']")
 
     # System preference fallback when no explicit theme is set.
-    dark_properties = collect_web_properties("dark")
     if dark_properties:
         lines.append("@media (prefers-color-scheme: dark) {")
         lines.append("  :root:not([data-theme]) {")
@@ -146,14 +174,137 @@ def generate_css(tokens: dict) -> str:
     return "\n".join(lines)
 
 
-def main() -> int:
-    tokens = yaml.safe_load(TOKENS_PATH.read_text(encoding="utf-8"))
-    css = generate_css(tokens)
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
-    OUT_FILE.write_text(css, encoding="utf-8")
-    print(f"Wrote {OUT_FILE}")
+def _min_value(value: str) -> str:
+    value = re.sub(r"\s*,\s*", ",", value)
+    # #AABBCC -> #ABC when each channel repeats its digit
+    return re.sub(
+        r"#([0-9A-Fa-f])\1([0-9A-Fa-f])\2([0-9A-Fa-f])\3\b", r"#\1\2\3", value
+    )
+
+
+def generate_css_min(graph: TokenGraph, only: Collection[str] | None = None) -> str:
+    """Minified CSS with the dark-mode variables emitted only once.
+
+    Instead of repeating the dark block for [data-theme='dark'] and the
+    prefers-color-scheme query, every web variable that differs between
+    modes is written once as light-dark(<light>, <dark>). The browser picks
+    a side from the inherited color-scheme, which the three small rules set
+    (system preference by default, forced by data-theme).
+    """
+    rules: list[str] = []
+    root = [f"{n}:{_min_value(v)}" for n, v in _keep(palette_properties(graph), only)]
+
+    light = dict(_keep(web_properties(graph, "light"), only))
+    dark = dict(_keep(web_properties(graph, "dark"), only))
+    for name in list(light) + [n for n in dark if n not in light]:
+        lv, dv = light.get(name), dark.get(name)
+        if lv is None or dv is None or lv == dv:
+            root.append(f"{name}:{_min_value(lv or dv)}")
+        else:
+            root.append(f"{name}:light-dark({_min_value(lv)},{_min_value(dv)})")
+
+    if light and dark:
+        root.append("color-scheme:light dark")
+    elif light or dark:
+        root.append(f"color-scheme:{'light' if light else 'dark'}")
+    rules.append(":root{" + ";".join(root) + "}")
+    if light and dark:
+        rules.append("[data-theme=light]{color-scheme:light}")
+        rules.append("[data-theme=dark]{color-scheme:dark}")
+    return "".join(rules) + "\n"
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the archive reproducible across builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes | None:
+    try:
+        import brotli  # type: ignore
+    except Exception:
+        return None
+    return brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+
+
+def precompress(data: bytes) -> dict[str, bytes]:
+    """Return Content-Encoding -> compressed bytes ("br" only with brotli)."""
+    variants = {"gzip": _gzip(data)}
+    br = _brotli(data)
+    if br is not None:
+        variants["br"] = br
+    return variants
+
+
+def write_css_min(
+    graph: TokenGraph, out_file: Path = MIN_OUT_FILE
+) -> list[tuple[Path, int]]:
+    """Write minified CSS plus .gz/.br siblings; return (path, size) per variant.
+
+    Without the brotli package the .br sibling is not written, and one left
+    by an earlier build is removed so that it cannot be served stale.
+    """
+    data = generate_css_min(graph).encode("utf-8")
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    written: list[tuple[Path, int]] = []
+    compressed = precompress(data)
+    variants = [(out_file, data)] + [
+        (Path(f"{out_file}{suffix}"), compressed[enc])
+        for enc, suffix in SUFFIXES.items()
+        if enc in compressed
+    ]
+    for path, payload in variants:
+        path.write_bytes(payload)
+        written.append((path, len(payload)))
+    for enc, suffix in SUFFIXES.items():
+        if enc not in compressed:
+            Path(f"{out_file}{suffix}").unlink(missing_ok=True)
+    return written
+
+
+def size_report(full_bytes: int, variants: list[tuple[Path, int]]) -> list[str]:
+    lines = [f"{'kumanui.css':<24} {full_bytes:>7} B"]
+    for path, size in variants:
+        saved = 100.0 * (full_bytes - size) / full_bytes if full_bytes else 0.0
+        lines.append(f"{path.name:<24} {size:>7} B  (-{saved:.1f}%)")
+    return lines
+
+
+def write_css(graph: TokenGraph, out_file: Path = OUT_FILE) -> Path:
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    out_file.write_text(generate_css(graph), encoding="utf-8")
+    return out_file
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument(
+        "--minify",
+        action="store_true",
+        help="Also write kumanui.min.css with .gz/.br siblings and report sizes",
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        graph = load_graph(TOKENS_PATH)
+    except TokenGraphError as e:
+        for problem in e.problems:
+            print(f"ERROR: {problem}", file=sys.stderr)
+        return 2
+    out = write_css(graph)
+    print(f"Wrote {out}")
+    if args.minify:
+        variants = write_css_min(graph)
+        for line in size_report(out.stat().st_size, variants):
+            print(line)
     return 0
 
 
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Generate CSS variables from tokens")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -4,7 +4,10 @@ Generate a macOS Terminal .terminal profile from tokens/colors.yaml
 
 Requirements:
   - PyYAML:   pip3 install pyyaml
-  - PyObjC:   pip3 install pyobjc
+
+NSColor/NSFont blobs are encoded in pure Python (see nskeyed.py), so this
+runs on any platform. NSRGB values from the existing output profile are
+reused so unchanged colors archive byte-for-byte as before.
 
 Usage:
   python3 _assets/scripts/generate_macos_terminal.py dist/macos-terminal/Kumanui.terminal
@@ -19,45 +22,14 @@ import sys
 from pathlib import Path
 import plistlib
 
-from token_utils import (
-    resolve_ref,
-    color_entry_to_hex,
-    color_entry_to_rgba,
-    hex_to_rgb01,
-)
-
-try:
-    import yaml  # type: ignore
-except Exception:
-    print(
-        "ERROR: PyYAML not installed. Install with: pip3 install pyyaml",
-        file=sys.stderr,
-    )
-    sys.exit(1)
-
-try:
-    from AppKit import NSColor, NSFont  # type: ignore
-    from Foundation import NSKeyedArchiver, NSURL  # type: ignore
-
-    # Optional: CoreText for registering app-bundled fonts at runtime
-    try:
-        from CoreText import (
-            CTFontManagerRegisterFontsForURL,
-            kCTFontManagerScopeProcess,
-        )  # type: ignore
-    except Exception:
-        CTFontManagerRegisterFontsForURL = None  # type: ignore
-        kCTFontManagerScopeProcess = None  # type: ignore
-except Exception:
-    print(
-        "ERROR: PyObjC not installed. Install with: pip3 install pyobjc",
-        file=sys.stderr,
-    )
-    sys.exit(1)
-
+from color_math import Color
+from exporters.model import ANSI_NAMES, ThemeModel, theme_model
+from nskeyed import archive_color, archive_font, seed_ns_rgb_from_profile
+from token_utils import TokenGraph, TokenGraphError, load_graph, parse_tokens
 
 ROOT = Path(__file__).resolve().parents[2]
 TOKENS_PATH = ROOT / "tokens/colors.yaml"
+OUT_FILE = ROOT / "dist/macos-terminal/Kumanui.terminal"
 
 # Embedded default font configuration for simplicity
 DEFAULT_FONT_NAME = "SF Mono Terminal"
@@ -65,121 +37,41 @@ DEFAULT_FONT_SIZE = 12.0
 
 
 def load_tokens(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return parse_tokens(path.read_bytes())
 
 
 def archive_color_rgb(r: float, g: float, b: float, a: float = 1.0) -> bytes:
-    """Return NSKeyedArchiver bytes for an NSColor using sRGB color space.
+    """Return NSKeyedArchiver bytes for an NSColor using sRGB color space."""
+    return archive_color(r, g, b, a)
 
-    Falls back to calibrated RGB if sRGB initializer is unavailable.
-    """
-    # Prefer sRGB to match token color space and ensure consistent rendering
-    if hasattr(NSColor, "colorWithSRGBRed_green_blue_alpha_"):
-        color = NSColor.colorWithSRGBRed_green_blue_alpha_(r, g, b, a)
-    else:
-        # Fallback for older macOS versions
-        color = NSColor.colorWithCalibratedRed_green_blue_alpha_(r, g, b, a)
-    # Use non-secure coding for broader compatibility with Terminal imports
-    data = NSKeyedArchiver.archivedDataWithRootObject_(color)
-    # Convert to Python bytes for plistlib.Data
-    return bytes(data)
-
-
-def _register_sf_mono_terminal_if_needed(requested_name: str) -> None:
-    """Attempt to register Terminal's bundled SF Mono font for this process.
-
-    Terminal.app bundles its own SF Mono fonts that are not globally installed.
-    Registering them at process-scope allows NSFont lookups to succeed, so we
-    can embed the font in the .terminal profile.
-    """
-    # Only attempt if CoreText is available and the requested name looks like SF Mono
-    if CTFontManagerRegisterFontsForURL is None:
-        return
-    lower = requested_name.lower()
-    if not ("sf mono" in lower or "sfmono" in lower):
-        return
-    font_dir = "/System/Applications/Utilities/Terminal.app/Contents/Resources/Fonts"
-    # The essential faces for Terminal rendering; register if present
-    candidates = [
-        "SFMono-Terminal.ttf",
-        "SFMonoItalic-Terminal.ttf",
-    ]
-    for fname in candidates:
-        fpath = Path(font_dir) / fname
-        if not fpath.exists():
-            continue
-        try:
-            url = NSURL.fileURLWithPath_(str(fpath))
-            # Ignore errors; if registration fails we'll fall back later
-            CTFontManagerRegisterFontsForURL(url, kCTFontManagerScopeProcess, None)
-        except Exception:
-            # Silently ignore; fallback will handle missing fonts
-            pass
-
-
-def archive_font(name: str, size: float) -> bytes:
-    """Return NSKeyedArchiver bytes for an NSFont with given name and size.
-
-    Falls back to Menlo if the requested font cannot be created.
-    """
-    # First try the requested name directly
-    font = NSFont.fontWithName_size_(name, float(size))
-    # If not found, and the name suggests SF Mono, try registering Terminal's bundled fonts
-    if font is None:
-        _register_sf_mono_terminal_if_needed(name)
-        font = NSFont.fontWithName_size_(name, float(size))
-    # Try common aliases/PostScript names for SF Mono if initial lookup fails
-    if font is None and name.lower().startswith("sf mono"):
-        for alt in ("SF Mono", "SFMono-Regular"):
-            font = NSFont.fontWithName_size_(alt, float(size))
-            if font is not None:
-                break
-    if font is None:
-        # Fallback to a common monospaced font and warn
-        print(
-            f"WARN: Font '{name}' not found. Falling back to Menlo {size}pt.",
-            file=sys.stderr,
-        )
-        font = NSFont.fontWithName_size_("Menlo", float(size))
-    data = NSKeyedArchiver.archivedDataWithRootObject_(font)
-    return bytes(data)
-
-
-def build_profile(tokens: dict, font_name: str, font_size: float) -> dict:
-    term = tokens["semantics"]["terminal"]
-
-    # Core colors
-    bg_hex = color_entry_to_hex(tokens, term["background"])
-    fg_hex = color_entry_to_hex(tokens, term["text"])
-    bold_hex = color_entry_to_hex(tokens, term["boldText"])
-    sel_hex = color_entry_to_hex(tokens, term["selection"])
-    cur_hex = color_entry_to_hex(tokens, term["cursor"])
-
-    # ANSI standard and bright
-    ansi_std = term["ansi"]["standard"]
-    ansi_bri = term["ansi"]["bright"]
-
-    def d(hexv: str) -> bytes:
-        r, g, b = hex_to_rgb01(hexv)
+
+def build_profile(graph: TokenGraph, font_name: str, font_size: float) -> dict:
+    return model_profile(theme_model(graph), font_name, font_size)
+
+
+def model_profile(model: ThemeModel, font_name: str, font_size: float) -> dict:
+    def d(color: Color) -> bytes:
+        r, g, b = color.rgb01
         # plistlib will serialize bytes as <data> (base64) in XML plists
         return archive_color_rgb(r, g, b, 1.0)
 
-    def d_entry_with_alpha(entry: dict) -> bytes:
-        r, g, b, a = color_entry_to_rgba(tokens, entry)
-        return archive_color_rgb(r, g, b, a)
+    def d_with_alpha(color: Color) -> bytes:
+        r, g, b = color.rgb01
+        return archive_color_rgb(r, g, b, color.alpha)
+
+    std = dict(zip(ANSI_NAMES, model.standard))
+    bri = dict(zip(ANSI_NAMES, model.bright))
 
     profile: dict[str, object] = {
-        "name": "Kumanui",
+        "name": model.name,
         # Core color keys
-        "BackgroundColor": d(bg_hex),
-        "TextColor": d(fg_hex),
-        "TextBoldColor": d(bold_hex),
+        "BackgroundColor": d(model.background),
+        "TextColor": d(model.foreground),
+        "TextBoldColor": d(model.bold),
         # Honor alpha on selection/cursor if provided by tokens
-        "SelectionColor": d_entry_with_alpha(term["selection"]),
-        "CursorColor": d_entry_with_alpha(term["cursor"]),
-        # Set cursor text to background for contrast
-        "CursorTextColor": d(bg_hex),
+        "SelectionColor": d_with_alpha(model.selection),
+        "CursorColor": d_with_alpha(model.cursor),
+        "CursorTextColor": d(model.cursor_text),
         # Window size (in character cells)
         "columnCount": 108,
         "rowCount": 40,
@@ -193,23 +85,23 @@ def build_profile(tokens: dict, font_name: str, font_size: float) -> dict:
         "FontHeightSpacing": 0.90,
         "FontWidthSpacing": 1.0,
         # ANSI standard (0-7)
-        "ANSIBlackColor": d(color_entry_to_hex(tokens, ansi_std["black"])),
-        "ANSIRedColor": d(color_entry_to_hex(tokens, ansi_std["red"])),
-        "ANSIGreenColor": d(color_entry_to_hex(tokens, ansi_std["green"])),
-        "ANSIYellowColor": d(color_entry_to_hex(tokens, ansi_std["yellow"])),
-        "ANSIBlueColor": d(color_entry_to_hex(tokens, ansi_std["blue"])),
-        "ANSIMagentaColor": d(color_entry_to_hex(tokens, ansi_std["magenta"])),
-        "ANSICyanColor": d(color_entry_to_hex(tokens, ansi_std["cyan"])),
-        "ANSIWhiteColor": d(color_entry_to_hex(tokens, ansi_std["white"])),
+        "ANSIBlackColor": d(std["black"]),
+        "ANSIRedColor": d(std["red"]),
+        "ANSIGreenColor": d(std["green"]),
+        "ANSIYellowColor": d(std["yellow"]),
+        "ANSIBlueColor": d(std["blue"]),
+        "ANSIMagentaColor": d(std["magenta"]),
+        "ANSICyanColor": d(std["cyan"]),
+        "ANSIWhiteColor": d(std["white"]),
         # ANSI bright (8-15)
-        "ANSIBrightBlackColor": d(color_entry_to_hex(tokens, ansi_bri["black"])),
-        "ANSIBrightRedColor": d(color_entry_to_hex(tokens, ansi_bri["red"])),
-        "ANSIBrightGreenColor": d(color_entry_to_hex(tokens, ansi_bri["green"])),
-        "ANSIBrightYellowColor": d(color_entry_to_hex(tokens, ansi_bri["yellow"])),
-        "ANSIBrightBlueColor": d(color_entry_to_hex(tokens, ansi_bri["blue"])),
-        "ANSIBrightMagentaColor": d(color_entry_to_hex(tokens, ansi_bri["magenta"])),
-        "ANSIBrightCyanColor": d(color_entry_to_hex(tokens, ansi_bri["cyan"])),
-        "ANSIBrightWhiteColor": d(color_entry_to_hex(tokens, ansi_bri["white"])),
+        "ANSIBrightBlackColor": d(bri["black"]),
+        "ANSIBrightRedColor": d(bri["red"]),
+        "ANSIBrightGreenColor": d(bri["green"]),
+        "ANSIBrightYellowColor": d(bri["yellow"]),
+        "ANSIBrightBlueColor": d(bri["blue"]),
+        "ANSIBrightMagentaColor": d(bri["magenta"]),
+        "ANSIBrightCyanColor": d(bri["cyan"]),
+        "ANSIBrightWhiteColor": d(bri["white"]),
         # Mark type so Terminal recognizes it as a profile
         "type": "Window Settings",
     }
@@ -219,11 +111,37 @@ def build_profile(tokens: dict, font_name: str, font_size: float) -> dict:
     return profile
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser(
-        description="Generate macOS Terminal .terminal profile from tokens/colors.yaml"
+def render_profile(
+    graph: TokenGraph, font_name: str, font_size: float, seed: Path = OUT_FILE
+) -> bytes:
+    """Return the profile as XML plist bytes, reusing NSRGB values from `seed`."""
+    return render_model_profile(theme_model(graph), font_name, font_size, seed)
+
+
+def render_model_profile(
+    model: ThemeModel, font_name: str, font_size: float, seed: Path = OUT_FILE
+) -> bytes:
+    seed_ns_rgb_from_profile(seed)
+    profile = model_profile(model, font_name, font_size)
+    return plistlib.dumps(profile, fmt=plistlib.FMT_XML)
+
+
+def write_profile(
+    graph: TokenGraph, out_path: Path, font_name: str, font_size: float
+) -> Path:
+    data = render_profile(graph, font_name, font_size, seed=out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(data)
+    return out_path
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument(
+        "out",
+        nargs="?",
+        default=str(OUT_FILE),
+        help="Output path (.terminal) or '-' for stdout (default: %(default)s)",
     )
-    ap.add_argument("out", help="Output path (.terminal) or '-' for stdout")
     ap.add_argument(
         "--font-name",
         default=DEFAULT_FONT_NAME,
@@ -232,21 +150,45 @@ def main() -> int:
     ap.add_argument(
         "--font-size", type=float, default=DEFAULT_FONT_SIZE, help="Font size in points"
     )
-    args = ap.parse_args()
+    ap.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check that the output is up to date; exit 1 if it would change",
+    )
 
-    tokens = load_tokens(TOKENS_PATH)
-    profile = build_profile(tokens, args.font_name, args.font_size)
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        graph = load_graph(TOKENS_PATH)
+    except TokenGraphError as e:
+        for problem in e.problems:
+            print(f"ERROR: {problem}", file=sys.stderr)
+        return 2
 
     if args.out == "-":
-        plistlib.dump(profile, sys.stdout.buffer, fmt=plistlib.FMT_XML)
-    else:
+        data = render_profile(graph, args.font_name, args.font_size)
+        sys.stdout.buffer.write(data)
+    elif args.check:
         out_path = Path(args.out)
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        with out_path.open("wb") as f:
-            plistlib.dump(profile, f, fmt=plistlib.FMT_XML)
+        data = render_profile(graph, args.font_name, args.font_size, seed=out_path)
+        current = out_path.read_bytes() if out_path.exists() else None
+        if data != current:
+            print(f"{out_path} is out of date", file=sys.stderr)
+            return 1
+        print(f"{out_path} is up to date")
+    else:
+        out_path = write_profile(graph, Path(args.out), args.font_name, args.font_size)
         print(f"Wrote Terminal profile: {out_path}")
     return 0
 
 
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Generate macOS Terminal .terminal profile from tokens/colors.yaml"
+    )
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
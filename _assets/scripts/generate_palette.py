@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Derive palette tiers and 50-900 ramps from brand base colors.
+
+Works in OKLCH. The light/dark tiers follow the relationship between the
+hand-picked tiers in tokens/colors.yaml: lightness is a least-squares fit
+(tier L = a * base L + b) and chroma the median tier/base ratio over the
+chromatic hues, refitted from the reference file on every run so the
+generator tracks edits to the palette. Hue is kept. Ramps use a fixed
+lightness per step, with chroma tapering away from the base through the
+light and dark tier points; the step closest to the base is the base itself.
+Everything is computed for all inputs at once with NumPy and gamut-mapped
+into sRGB by reducing chroma.
+
+The output is an overlay that extends --extends (default: the reference
+file), so it loads, validates and batches as a complete theme.
+
+Usage:
+  python3 _assets/scripts/kumanui.py palette '#477EEB' --name brand
+  python3 _assets/scripts/kumanui.py palette --from brands.txt --ramp -o dist/palette.yaml
+  python3 _assets/scripts/kumanui.py palette --bench 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from color_math import (
+    gamut_map_oklch,
+    hex_to_rgb8_array,
+    oklch_to_srgb,
+    require_numpy,
+    rgb8_to_oklch,
+    rgb_array_to_hex,
+)
+from token_schema import check_tokens
+from token_utils import (
+    TokenGraph,
+    TokenGraphError,
+    load_graph,
+    overlay_graph,
+    parse_tokens,
+)
+
+ROOT = Path(__file__).resolve().parents[2]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+
+REFERENCE_HUES = ["red", "green", "blue", "yellow", "magenta", "cyan"]
+# Hues below this OKLCH chroma are neutrals and say nothing about chroma ratios
+CHROMATIC_MIN = 0.05
+RAMP_STEPS = (50, 100, 200, 300, 400, 500, 600, 700, 800, 900)
+RAMP_LIGHTNESS = (0.97, 0.93, 0.86, 0.78, 0.70, 0.62, 0.53, 0.44, 0.36, 0.28)
+NAME_RE = re.compile(r"[A-Za-z][A-Za-z0-9_-]*")
+# Chroma left at the ends of a ramp, relative to the neighbouring tier
+RAMP_END_CHROMA = 0.25
+
+
+class TierModel(NamedTuple):
+    """tier L = l_scale * base L + l_offset; tier C = chroma * base C."""
+
+    l_scale: float
+    l_offset: float
+    chroma: float
+
+
+class PaletteModel(NamedTuple):
+    light: TierModel
+    dark: TierModel
+
+
+class Palette(NamedTuple):
+    names: list[str]
+    base: list[str]
+    light: list[str]
+    dark: list[str]
+    ramps: list[list[str]] | None  # per name, one hex per RAMP_STEPS entry
+
+
+def fit_model(graph: TokenGraph, hues: list[str] = REFERENCE_HUES) -> PaletteModel:
+    """Fit the light/dark tier relationships of an existing palette."""
+    np = require_numpy()
+    tiers = ("base", "light", "dark")
+    present = [h for h in hues if all(f"palette.{h}.{t}" in graph for t in tiers)]
+    lch = {
+        tier: rgb8_to_oklch(
+            hex_to_rgb8_array([graph.hex(f"palette.{h}.{tier}") for h in present])
+        )
+        for tier in tiers
+    }
+    chromatic = lch["base"][:, 1] >= CHROMATIC_MIN
+    if chromatic.sum() < 2:
+        raise ValueError("Reference palette needs two chromatic hues with all tiers")
+    base = lch["base"][chromatic]
+    fit = np.stack([base[:, 0], np.ones(len(base))], axis=1)
+    models = []
+    for tier in ("light", "dark"):
+        target = lch[tier][chromatic]
+        (scale, offset), *_ = np.linalg.lstsq(fit, target[:, 0], rcond=None)
+        ratio = float(np.median(target[:, 1] / base[:, 1]))
+        models.append(TierModel(float(scale), float(offset), ratio))
+    return PaletteModel(*models)
+
+
+def _tier(base_lch, model: TierModel):
+    out = base_lch.copy()
+    out[:, 0] = model.l_scale * base_lch[:, 0] + model.l_offset
+    out[:, 1] = model.chroma * base_lch[:, 1]
+    return out
+
+
+def _ramp_chroma_ratio(step_l, base_l, light_l, dark_l, model: PaletteModel):
+    """Chroma relative to the base for ramp lightness step_l (rows x steps)."""
+    np = require_numpy()
+    eps = 1e-6
+    bl, ll, dl = base_l[:, None], light_l[:, None], dark_l[:, None]
+    # Above the base: through (light L, light ratio) to the end ratio at L=1
+    light_knot = np.maximum(ll, bl + eps)
+    up_near = 1.0 + (model.light.chroma - 1.0) * (step_l - bl) / (light_knot - bl)
+    up_far = model.light.chroma + (
+        model.light.chroma * RAMP_END_CHROMA - model.light.chroma
+    ) * (step_l - light_knot) / np.maximum(1.0 - light_knot, eps)
+    up = np.where(step_l <= light_knot, up_near, up_far)
+    # Below the base: through (dark L, dark ratio) to the end ratio at L=0
+    dark_knot = np.minimum(dl, bl - eps)
+    down_near = 1.0 + (model.dark.chroma - 1.0) * (bl - step_l) / (bl - dark_knot)
+    down_far = model.dark.chroma + (
+        model.dark.chroma * RAMP_END_CHROMA - model.dark.chroma
+    ) * (dark_knot - step_l) / np.maximum(dark_knot, eps)
+    down = np.where(step_l >= dark_knot, down_near, down_far)
+    return np.clip(np.where(step_l >= bl, up, down), 0.0, 1.0)
+
+
+def derive_palette(
+    names: list[str], bases: list[str], model: PaletteModel, ramps: bool = False
+) -> Palette:
+    """Compute light/dark tiers (and optionally ramps) for many base colors."""
+    np = require_numpy()
+    rgb8 = hex_to_rgb8_array(bases)
+    base_lch = rgb8_to_oklch(rgb8)
+    light = gamut_map_oklch(_tier(base_lch, model.light))
+    dark = gamut_map_oklch(_tier(base_lch, model.dark))
+    base_hex = rgb_array_to_hex(rgb8 / 255.0)
+
+    ramp_hex = None
+    if ramps:
+        n, k = len(bases), len(RAMP_STEPS)
+        step_l = np.broadcast_to(np.array(RAMP_LIGHTNESS), (n, k))
+        ratio = _ramp_chroma_ratio(
+            step_l, base_lch[:, 0], light[:, 0], dark[:, 0], model
+        )
+        ramp = np.empty((n, k, 3))
+        ramp[..., 0] = step_l
+        ramp[..., 1] = base_lch[:, 1, None] * ratio
+        ramp[..., 2] = base_lch[:, 2, None]
+        flat = rgb_array_to_hex(oklch_to_srgb(gamut_map_oklch(ramp)))
+        ramp_hex = [flat[i * k : (i + 1) * k] for i in range(n)]
+        # The step nearest in lightness is the base color itself
+        anchor = np.abs(step_l - base_lch[:, 0, None]).argmin(axis=1)
+        for i, step in enumerate(anchor):
+            ramp_hex[i][step] = base_hex[i]
+
+    return Palette(
+        names,
+        base_hex,
+        rgb_array_to_hex(oklch_to_srgb(light)),
+        rgb_array_to_hex(oklch_to_srgb(dark)),
+        ramp_hex,
+    )
+
+
+def render_yaml(palette: Palette, extends: str | None = None) -> str:
+    """Token YAML in the style of tokens/colors.yaml.
+
+    With ``extends`` (a path relative to the output file) this is an overlay
+    that adds the palettes to that theme; without it, only the palette.
+    """
+    lines = [f"extends: {json.dumps(extends)}", ""] if extends else []
+    lines += [
+        "meta:",
+        "  name: Kumanui Generated Palette",
+        "  description: Tiers derived by generate_palette.py",
+        "  colorSpace: srgb",
+        "",
+        "palette:",
+    ]
+    for i, name in enumerate(palette.names):
+        lines += [
+            "",
+            f"  {name}:",
+            f'    base:  {{ value: "{palette.base[i]}", type: color }}',
+            f'    light: {{ value: "{palette.light[i]}", type: color }}',
+            f'    dark:  {{ value: "{palette.dark[i]}", type: color }}',
+        ]
+        if palette.ramps is not None:
+            lines.append("    ramp:")
+            for step, hexv in zip(RAMP_STEPS, palette.ramps[i]):
+                key = f'"{step}":'
+                lines.append(f'      {key:<6} {{ value: "{hexv}", type: color }}')
+    return "\n".join(lines) + "\n"
+
+
+def read_bases(path: Path) -> tuple[list[str], list[str]]:
+    """Read "name,#RRGGBB" (or bare hex) lines; unnamed colors get brand<N>."""
+    names: list[str] = []
+    bases: list[str] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        name, _, hexv = line.rpartition(",")
+        names.append(name.strip() or f"brand{len(names) + 1}")
+        bases.append(_normalize_hex(hexv))
+    return names, bases
+
+
+def _normalize_hex(value: str) -> str:
+    hexv = value.strip().upper().lstrip("#")
+    if len(hexv) != 6 or any(c not in "0123456789ABCDEF" for c in hexv):
+        raise ValueError(f"Unsupported color value: {value!r}")
+    return "#" + hexv
+
+
+def extends_ref(parent: Path, out: str) -> str:
+    """``parent`` relative to the directory the output is written to."""
+    out_dir = Path.cwd() if out == "-" else Path(out).resolve().parent
+    return Path(os.path.relpath(parent.resolve(), out_dir)).as_posix()
+
+
+def bench(model: PaletteModel, n: int) -> None:
+    np = require_numpy()
+    rng = np.random.default_rng(0)
+    bases = rgb_array_to_hex(rng.random((n, 3)))
+    names = [f"brand{i}" for i in range(n)]
+    for ramps in (False, True):
+        start = time.perf_counter()
+        palette = derive_palette(names, bases, model, ramps=ramps)
+        derived = time.perf_counter() - start
+        text = render_yaml(palette)
+        total = time.perf_counter() - start
+        label = "tiers + ramps" if ramps else "tiers"
+        print(
+            f"{label:<14} {n} bases: derive {derived * 1000:.1f} ms "
+            f"({n / derived:,.0f}/s), with YAML {total * 1000:.1f} ms "
+            f"({n / total:,.0f}/s, {len(text) // 1024} KiB)"
+        )
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("colors", nargs="*", help="Base colors as #RRGGBB")
+    ap.add_argument(
+        "--name",
+        action="append",
+        default=[],
+        help="Palette name for each base color, in order (default: brand, brand2, ...)",
+    )
+    ap.add_argument("--from", dest="from_file", help="File of 'name,#RRGGBB' lines")
+    ap.add_argument("--ramp", action="store_true", help="Also write 50-900 ramps")
+    ap.add_argument("-o", "--out", default="-", help="Output YAML path or '-' (default)")
+    ap.add_argument(
+        "--reference",
+        default=str(TOKENS_PATH),
+        help="Token file whose tiers define the model (default: tokens/colors.yaml)",
+    )
+    ap.add_argument(
+        "--extends",
+        help="Theme the output extends (default: the --reference file)",
+    )
+    ap.add_argument(
+        "--bench", type=int, metavar="N", help="Time N random base colors and exit"
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    reference = Path(args.reference)
+    parent = Path(args.extends) if args.extends else reference
+    try:
+        graph = load_graph(reference)
+        base = graph if parent.resolve() == reference.resolve() else load_graph(parent)
+    except TokenGraphError as e:
+        for problem in e.problems:
+            print(f"ERROR: {problem}", file=sys.stderr)
+        return 2
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    model = fit_model(graph)
+    if args.bench:
+        bench(model, args.bench)
+        return 0
+
+    try:
+        names, bases = read_bases(Path(args.from_file)) if args.from_file else ([], [])
+        for i, color in enumerate(args.colors):
+            if i < len(args.name):
+                name = args.name[i]
+            else:
+                name = "brand" if i == 0 and not names else f"brand{len(names) + 1}"
+            names.append(name)
+            bases.append(_normalize_hex(color))
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    if not bases:
+        print("ERROR: no base colors given", file=sys.stderr)
+        return 2
+    invalid = [n for n in names if not NAME_RE.fullmatch(n)]
+    if invalid:
+        print(f"ERROR: invalid palette names: {', '.join(invalid)}", file=sys.stderr)
+        return 2
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        print(f"ERROR: duplicate palette names: {', '.join(duplicates)}", file=sys.stderr)
+        return 2
+
+    palette = derive_palette(names, bases, model, ramps=args.ramp)
+    text = render_yaml(palette, extends_ref(parent, args.out))
+    # Check the overlay like load_graph would, so bad output never gets written
+    try:
+        tokens = parse_tokens(text)
+        check_tokens(tokens, text, args.out, base=base)
+        overlay_graph(base, tokens)
+    except TokenGraphError as e:
+        for problem in e.problems:
+            print(f"ERROR: {problem}", file=sys.stderr)
+        return 2
+    if args.out == "-":
+        sys.stdout.write(text)
+    else:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(text, encoding="utf-8")
+        print(f"Wrote {len(bases)} palette(s): {out}", file=sys.stderr)
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Derive palette tiers from base colors")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -15,15 +15,9 @@ import re
 import sys
 from pathlib import Path
 
-from token_utils import resolve_ref, color_entry_to_hex, hex_to_rgb
-
-try:
-    import yaml  # type: ignore
-except Exception as e:
-    print(
-        "ERROR: PyYAML not installed. Install with: pip install pyyaml", file=sys.stderr
-    )
-    sys.exit(1)
+from color_math import Color
+from exporters.model import palette_tiers
+from token_utils import TokenGraph, TokenGraphError, load_graph, parse_tokens
 
 # Repo root (this file lives in _assets/scripts/)
 ROOT = Path(__file__).resolve().parents[2]
@@ -34,8 +28,7 @@ SWATCH_DIR = ROOT / "_assets/swatches"
 
 
 def load_tokens(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return parse_tokens(path.read_bytes())
 
 
 def load_version(path: Path) -> str:
@@ -61,141 +54,130 @@ def update_download_section(text: str, version: str) -> str:
     return "\n".join(lines)
 
 
-def rgb_to_hsl(r: int, g: int, b: int) -> tuple[int, int, int]:
-    rf, gf, bf = r / 255.0, g / 255.0, b / 255.0
-    mx, mn = max(rf, gf, bf), min(rf, gf, bf)
-    l = (mx + mn) / 2.0
-    if mx == mn:
-        h = s = 0.0
-    else:
-        d = mx - mn
-        s = d / (2.0 - mx - mn) if l > 0.5 else d / (mx + mn)
-        if mx == rf:
-            h = (gf - bf) / d + (6 if gf < bf else 0)
-        elif mx == gf:
-            h = (bf - rf) / d + 2
-        else:
-            h = (rf - gf) / d + 4
-        h /= 6.0
-    return round(h * 360), round(s * 100), round(l * 100)
+def swatch_path(hex_str: str) -> Path:
+    return SWATCH_DIR / f"{hex_str.upper().lstrip('#')}.svg"
 
 
-def ensure_swatch(hex_str: str) -> None:
+def swatch_src(hex_str: str) -> str:
+    """README-relative path of a color's swatch (written by write_swatches)."""
+    return swatch_path(hex_str).relative_to(ROOT).as_posix()
+
+
+def swatch_svg(hex_str: str) -> str:
     s = hex_str.upper().lstrip("#")
+    return f'<svg xmlns="http://www.w3.org/2000/svg" width="12" height="12"><rect width="12" height="12" fill="#{s}"/></svg>'
+
+
+def ensure_swatch(hex_str: str) -> None:
     SWATCH_DIR.mkdir(parents=True, exist_ok=True)
-    svg_path = SWATCH_DIR / f"{s}.svg"
+    svg_path = swatch_path(hex_str)
     if svg_path.exists():
         return
-    svg = f'<svg xmlns="http://www.w3.org/2000/svg" width="12" height="12"><rect width="12" height="12" fill="#{s}"/></svg>'
-    svg_path.write_text(svg, encoding="utf-8")
+    svg_path.write_text(swatch_svg(hex_str), encoding="utf-8")
+
+
+def palette_hexes(graph: TokenGraph) -> list[str]:
+    """Every distinct palette color, in token order."""
+    hexes: list[str] = []
+    for hue in graph.children("palette"):
+        for tier in graph.children(f"palette.{hue}"):
+            tok = graph.token(f"palette.{hue}.{tier}")
+            if tok.hex is not None and tok.hex not in hexes:
+                hexes.append(tok.hex)
+    return hexes
+
+
+def write_swatches(graph: TokenGraph) -> list[str]:
+    """Ensure an SVG swatch exists for every palette color; return the hexes."""
+    hexes = palette_hexes(graph)
+    for hexv in hexes:
+        ensure_swatch(hexv)
+    return hexes
 
 
 # Primary palette block has been removed; brand colors are now consolidated
 
 
-def render_neutrals(tokens: dict) -> str:
+def render_neutrals(graph: TokenGraph) -> str:
     rows = [
         "| 🎨 | Tier | Name | Hex | RGB | HSL |",
         "|---|------|------|-----|-----|-----|",
     ]
     mapping = [
-        ("Base", "Black", tokens["palette"]["black"]["base"]),
-        ("Base", "White", tokens["palette"]["white"]["base"]),
-        ("Light", "Black", tokens["palette"]["black"]["light"]),
-        ("Light", "White", tokens["palette"]["white"]["light"]),
-        ("Dark", "Black", tokens["palette"]["black"]["dark"]),
-        ("Dark", "White", tokens["palette"]["white"]["dark"]),
+        ("Base", "Black", "palette.black.base"),
+        ("Base", "White", "palette.white.base"),
+        ("Light", "Black", "palette.black.light"),
+        ("Light", "White", "palette.white.light"),
+        ("Dark", "Black", "palette.black.dark"),
+        ("Dark", "White", "palette.white.dark"),
     ]
-    for tier, name, entry in mapping:
-        hexv = entry["value"].upper()
-        r, g, b = hex_to_rgb(hexv)
-        h, s, l = rgb_to_hsl(r, g, b)
-        ensure_swatch(hexv)
+    for tier, name, path in mapping:
+        color = graph.color(path)
+        hexv = color.hex
+        (r, g, b), (h, s, l) = color.rgb, color.hsl
         rows.append(
-            f'| <img src="_assets/swatches/{hexv[1:]}.svg" width="12" height="12" alt="{hexv}" /> | {tier:<5} | {name:<5} | `{hexv}` | {r}, {g}, {b} | {h}°, {s}%, {l}% |'
+            f'| <img src="{swatch_src(hexv)}" width="12" height="12" alt="{hexv}" /> | {tier:<5} | {name:<5} | `{hexv}` | {r}, {g}, {b} | {h}°, {s}%, {l}% |'
         )
     return "\n".join(rows)
 
 
-def render_tiers(tokens: dict) -> str:
+def render_tiers(graph: TokenGraph) -> str:
     rows = [
         "| 🎨 | Hue | Tier | Hex | RGB | HSL |",
         "|---|-----|------|-----|-----|-----|",
     ]
-    # Desired order by color then tier within each color
-    hues = ["black", "white", "red", "green", "blue", "yellow", "magenta", "cyan"]
-    tiers = [("Base", "base"), ("Light", "light"), ("Dark", "dark")]
-    for hue in hues:
-        for tier_label, tier_key in tiers:
-            entry = tokens["palette"][hue][tier_key]
-            hexv = entry["value"].upper()
-            r, g, b = hex_to_rgb(hexv)
-            h, s, l = rgb_to_hsl(r, g, b)
-            ensure_swatch(hexv)
-            rows.append(
-                f'| <img src="_assets/swatches/{hexv[1:]}.svg" width="12" height="12" alt="{hexv}" /> | {hue.capitalize():<8} | {tier_label:<5} | `{hexv}` | {r}, {g}, {b} | {h}°, {s}%, {l}% |'
-            )
+    # Ordered by color then tier within each color
+    for hue, tier, hexv in palette_tiers(graph):
+        tier_label = tier.capitalize()
+        color = Color(hexv)
+        (r, g, b), (h, s, l) = color.rgb, color.hsl
+        rows.append(
+            f'| <img src="{swatch_src(hexv)}" width="12" height="12" alt="{hexv}" /> | {hue.capitalize():<8} | {tier_label:<5} | `{hexv}` | {r}, {g}, {b} | {h}°, {s}%, {l}% |'
+        )
     return "\n".join(rows)
 
 
-def render_terminal(tokens: dict) -> str:
-    term = tokens["semantics"]["terminal"]
-
-    def name_from_entry(entry: dict, fallback: str) -> str:
-        val = entry.get("value", "")
-        if isinstance(val, str) and val.startswith("{"):
-            parts = val.strip("{}").split(".")
-            # palette.<hue>.<tier> -> "Tier Hue"
-            if (
-                len(parts) >= 3
-                and parts[0] == "palette"
-                and parts[2] in ("base", "light", "dark")
-            ):
-                tier_map = {"base": "Base", "light": "Light", "dark": "Dark"}
-                hue = parts[1].capitalize()
-                tier = tier_map.get(parts[2], parts[2].capitalize())
-                return f"{tier} {hue}"
-            # palette.brand.<Name>
-            if len(parts) >= 3 and parts[0] == "palette" and parts[1] == "brand":
-                return parts[-1]
+def friendly_name(graph: TokenGraph, path: str, fallback: str) -> str:
+    """Describe a semantic token by the palette entry it references.
+
+    palette.<hue>.<tier> -> "Tier Hue"; palette.brand.<Name> -> "Name".
+    """
+    ref = graph.ref(path)
+    if ref is None:
         return fallback
+    parts = ref.split(".")
+    if len(parts) >= 3 and parts[0] == "palette" and parts[2] in ("base", "light", "dark"):
+        tier_map = {"base": "Base", "light": "Light", "dark": "Dark"}
+        return f"{tier_map[parts[2]]} {parts[1].capitalize()}"
+    if len(parts) >= 3 and parts[0] == "palette" and parts[1] == "brand":
+        return parts[-1]
+    return fallback
 
-    bg_hex = color_entry_to_hex(tokens, term["background"])
-    fg_hex = color_entry_to_hex(tokens, term["text"])
-    bold_hex = color_entry_to_hex(tokens, term["boldText"])
 
-    bg_name = name_from_entry(term["background"], "Background")
-    fg_name = name_from_entry(term["text"], "Text")
+def render_terminal(graph: TokenGraph) -> str:
+    term = "semantics.terminal"
+
+    bg_hex = graph.hex(f"{term}.background")
+    fg_hex = graph.hex(f"{term}.text")
+    bold_hex = graph.hex(f"{term}.boldText")
+
+    bg_name = friendly_name(graph, f"{term}.background", "Background")
+    fg_name = friendly_name(graph, f"{term}.text", "Text")
 
     # selection/cursor: keep color name + base hex + opacity from alpha
-    def format_named_alpha(entry: dict) -> tuple[str, str, int]:
-        val = entry.get("value", "")
-        alpha = entry.get("alpha", 1)
+    def format_named_alpha(path: str) -> tuple[str, str, int]:
+        alpha = graph.entry(path).get("alpha", 1)
+        ref = graph.ref(path)
         name = ""
         base_hex = ""
-        if isinstance(val, str) and val.startswith("{"):
-            # derive a friendly name from the reference path
-            parts = val.strip("{}").split(".")
-            # palette.<hue>.<tier> -> "Base/Light/Dark Hue"
-            if (
-                len(parts) >= 3
-                and parts[0] == "palette"
-                and parts[2] in ("base", "light", "dark")
-            ):
-                tier_map = {"base": "Base", "light": "Light", "dark": "Dark"}
-                hue = parts[1].capitalize()
-                tier = tier_map.get(parts[2], parts[2].capitalize())
-                name = f"{tier} {hue}"
-            else:
-                # fallback to last segment
-                name = parts[-1]
-            refd = resolve_ref(tokens, val)
-            if refd:
-                base_hex = refd["value"].upper()
+        if ref is not None:
+            # fallback to last segment of the reference path
+            name = friendly_name(graph, path, ref.split(".")[-1])
+            base_hex = graph.token(ref).hex or ""
         return name or "Color", base_hex or "#000000", int(round(float(alpha) * 100))
 
-    sel_name, sel_hex, sel_op = format_named_alpha(term["selection"])
-    cur_name, cur_hex, cur_op = format_named_alpha(term["cursor"])
+    sel_name, sel_hex, sel_op = format_named_alpha(f"{term}.selection")
+    cur_name, cur_hex, cur_op = format_named_alpha(f"{term}.cursor")
 
     lines = [
         f"- **Background**: {bg_name} `{bg_hex}`",
@@ -214,63 +196,46 @@ def render_terminal(tokens: dict) -> str:
 # ANSI note is included in render_terminal(); no separate renderer needed.
 
 
-def render_web(tokens: dict) -> str:
-    web = tokens.get("semantics", {}).get("web", {})
-
-    def friendly_name(entry: dict, fallback: str) -> str:
-        val = entry.get("value", "")
-        if isinstance(val, str) and val.startswith("{"):
-            parts = val.strip("{}").split(".")
-            if (
-                len(parts) >= 3
-                and parts[0] == "palette"
-                and parts[2] in ("base", "light", "dark")
-            ):
-                tier_map = {"base": "Base", "light": "Light", "dark": "Dark"}
-                return f"{tier_map.get(parts[2], parts[2].capitalize())} {parts[1].capitalize()}"
-        return fallback
-
-    def named(entry: dict, fallback: str) -> str:
-        name = friendly_name(entry, fallback)
-        hexv = color_entry_to_hex(tokens, entry)
-        return f"{name} `{hexv}`"
+def render_web(graph: TokenGraph) -> str:
+    def named(path: str, fallback: str) -> str:
+        name = friendly_name(graph, path, fallback)
+        return f"{name} `{graph.hex(path)}`"
 
-    def named_alpha(entry: dict, fallback: str) -> str:
-        name = friendly_name(entry, fallback)
-        hexv = color_entry_to_hex(tokens, entry)
-        alpha = float(entry.get("alpha", 1))
+    def named_alpha(path: str, fallback: str) -> str:
+        name = friendly_name(graph, path, fallback)
+        alpha = float(graph.entry(path).get("alpha", 1))
         pct = int(round(alpha * 100))
-        return f"{name} `{hexv}` at {pct}% opacity"
+        return f"{name} `{graph.hex(path)}` at {pct}% opacity"
 
     lines: list[str] = []
-    if isinstance(web.get("light"), dict):
-        l = web["light"]
+    if graph.children("semantics.web.light"):
+        l = "semantics.web.light"
         lines.append("### Light Mode")
-        lines.append(f"- Background: {named(l['background'], 'Background')}")
-        lines.append(f"- Surface: {named(l['surface'], 'Surface')}")
-        lines.append(f"- Text: {named(l['text'], 'Text')}")
-        lines.append(f"- Muted Text: {named(l['mutedText'], 'Muted Text')}")
-        lines.append(f"- Heading: {named(l['heading'], 'Heading')}")
-        lines.append(f"- Link: {named(l['link'], 'Link')}")
-        lines.append(f"- Link Hover: {named(l['linkHover'], 'Link Hover')}")
-        lines.append(f"- Border: {named(l['border'], 'Border')}")
-        lines.append(f"- Accent: {named(l['accent'], 'Accent')}")
-        lines.append(f"- Selection: {named_alpha(l['selection'], 'Selection')}")
+        lines.append(f"- Background: {named(f'{l}.background', 'Background')}")
+        lines.append(f"- Surface: {named(f'{l}.surface', 'Surface')}")
+        lines.append(f"- Text: {named(f'{l}.text', 'Text')}")
+        lines.append(f"- Muted Text: {named(f'{l}.mutedText', 'Muted Text')}")
+        lines.append(f"- Heading: {named(f'{l}.heading', 'Heading')}")
+        lines.append(f"- Link: {named(f'{l}.link', 'Link')}")
+        lines.append(f"- Link Hover: {named(f'{l}.linkHover', 'Link Hover')}")
+        lines.append(f"- Border: {named(f'{l}.border', 'Border')}")
+        lines.append(f"- Accent: {named(f'{l}.accent', 'Accent')}")
+        lines.append(f"- Selection: {named_alpha(f'{l}.selection', 'Selection')}")
         lines.append("")
 
-    if isinstance(web.get("dark"), dict):
-        d = web["dark"]
+    if graph.children("semantics.web.dark"):
+        d = "semantics.web.dark"
         lines.append("### Dark Mode")
-        lines.append(f"- Background: {named(d['background'], 'Background')}")
-        lines.append(f"- Surface: {named(d['surface'], 'Surface')}")
-        lines.append(f"- Text: {named(d['text'], 'Text')}")
-        lines.append(f"- Muted Text: {named(d['mutedText'], 'Muted Text')}")
-        lines.append(f"- Heading: {named(d['heading'], 'Heading')}")
-        lines.append(f"- Link: {named(d['link'], 'Link')}")
-        lines.append(f"- Link Hover: {named(d['linkHover'], 'Link Hover')}")
-        lines.append(f"- Border: {named(d['border'], 'Border')}")
-        lines.append(f"- Accent: {named(d['accent'], 'Accent')}")
-        lines.append(f"- Selection: {named_alpha(d['selection'], 'Selection')}")
+        lines.append(f"- Background: {named(f'{d}.background', 'Background')}")
+        lines.append(f"- Surface: {named(f'{d}.surface', 'Surface')}")
+        lines.append(f"- Text: {named(f'{d}.text', 'Text')}")
+        lines.append(f"- Muted Text: {named(f'{d}.mutedText', 'Muted Text')}")
+        lines.append(f"- Heading: {named(f'{d}.heading', 'Heading')}")
+        lines.append(f"- Link: {named(f'{d}.link', 'Link')}")
+        lines.append(f"- Link Hover: {named(f'{d}.linkHover', 'Link Hover')}")
+        lines.append(f"- Border: {named(f'{d}.border', 'Border')}")
+        lines.append(f"- Accent: {named(f'{d}.accent', 'Accent')}")
+        lines.append(f"- Selection: {named_alpha(f'{d}.selection', 'Selection')}")
 
     return "\n".join(lines)
 
@@ -287,23 +252,11 @@ def replace_block(text: str, begin: str, end: str, payload: str) -> str:
     return pattern.sub(repl, text)
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(
-        description="Generate README color sections from tokens/colors.yaml"
-    )
-    parser.add_argument(
-        "--check",
-        action="store_true",
-        help="Only check if README is up to date; exit 1 if changes are needed",
-    )
-    args = parser.parse_args()
-
-    tokens = load_tokens(TOKENS_PATH)
-
-    tiers_md = render_tiers(tokens)
-    terminal_md = render_terminal(tokens)
+def render_readme(graph: TokenGraph, readme: str, version: str) -> str:
+    """Return README text with all generated blocks refreshed from tokens."""
+    tiers_md = render_tiers(graph)
+    terminal_md = render_terminal(graph)
 
-    readme = README_PATH.read_text(encoding="utf-8")
     readme = replace_block(
         readme,
         "BEGIN:COLORS (generated from tokens/colors.yaml)",
@@ -316,15 +269,34 @@ def main() -> int:
         "END:TERMINAL",
         terminal_md,
     )
-    web_md = render_web(tokens)
+    web_md = render_web(graph)
     readme = replace_block(
         readme, "BEGIN:WEB (generated from tokens/colors.yaml)", "END:WEB", web_md
     )
 
-    version = load_version(VERSION_PATH)
-    readme = update_download_section(readme, version)
+    return update_download_section(readme, version)
+
 
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check if README is up to date; exit 1 if changes are needed",
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        graph = load_graph(TOKENS_PATH)
+    except TokenGraphError as e:
+        for problem in e.problems:
+            print(f"ERROR: {problem}", file=sys.stderr)
+        return 2
     current = README_PATH.read_text(encoding="utf-8")
+    if not args.check:
+        write_swatches(graph)
+    readme = render_readme(graph, current, load_version(VERSION_PATH))
+
     if args.check:
         if current == readme:
             print("README is up to date with tokens/colors.yaml")
@@ -338,5 +310,13 @@ def main() -> int:
         return 0
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Generate README color sections from tokens/colors.yaml"
+    )
+    add_arguments(parser)
+    return run(parser.parse_args())
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Kumanui command line entry point.
+
+Installed with `pip install -e .` this is the `kumanui` console script;
+from a checkout without installing, run it as _assets/scripts/kumanui.py.
+
+Usage:
+  kumanui build [targets...]
+  kumanui css [--minify]
+  kumanui terminal [OUT|-] [--font-name NAME] [--font-size PT] [--check]
+  kumanui readme [--check]
+  kumanui contrast [--matrix FILE] [--fg GLOB] [--bg GLOB] [--cvd]
+  kumanui demo
+  kumanui batch <dir|glob>... [--out DIR]
+  kumanui export [formats...] [--out DIR]
+  kumanui palette <#RRGGBB>... [--ramp] [-o FILE]
+  kumanui validate [files...]
+  kumanui serve [--store DIR] [--port N]
+  kumanui shake <dir>... [-o FILE] [--min]
+  kumanui audit [--json FILE] [--junit FILE]
+  kumanui remap [files...] [--to ansi|palette]
+  kumanui lut [--size N] [--blend S] [--apply PNG...]
+  kumanui preview [--tokens FILE] [-o FILE] [--png]
+  kumanui check [artifacts...] [--diff] [--write]
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+
+# Subcommand -> (module, help). Modules are imported only when selected so
+# adding commands does not slow down startup.
+COMMANDS: dict[str, tuple[str, str]] = {
+    "build": ("build", "Build resources from tokens in a single process"),
+    "css": ("generate_css", "Generate CSS variables from tokens"),
+    "terminal": ("generate_macos_terminal", "Generate the macOS Terminal profile"),
+    "readme": ("generate_readme", "Regenerate the README color sections"),
+    "contrast": ("check_contrast", "WCAG/APCA contrast report for the colors"),
+    "demo": ("terminal_demo", "Show the colors in this terminal"),
+    "batch": ("batch", "Generate themes for many tenant token files in parallel"),
+    "export": ("export", "Export the theme to terminal and editor formats"),
+    "palette": ("generate_palette", "Derive palette tiers and ramps from base colors"),
+    "validate": ("validate", "Check token files against the token schema"),
+    "serve": ("serve", "Serve per-tenant CSS over HTTP with caching"),
+    "shake": ("shake_css", "Emit only the CSS variables a codebase uses"),
+    "audit": ("contrast_audit", "Audit contrast of every semantic color pair"),
+    "remap": ("remap", "Snap truecolor ANSI output to Kumanui colors"),
+    "lut": ("cube_lut", "Build or apply a 3D LUT that recolors images to the palette"),
+    "preview": ("preview", "Render the terminal demo as an SVG/PNG theme preview"),
+    "check": ("check", "Check generated artifacts are up to date with the tokens"),
+}
+
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    lines = [
+        "usage: kumanui <command> [options]",
+        "",
+        "Kumanui theme tools",
+        "",
+        "commands:",
+        *(f"  {name:<{width}}  {text}" for name, (_, text) in COMMANDS.items()),
+        "",
+        "Run 'kumanui <command> --help' for the options of a command.",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None) -> int:
+    args_list = sys.argv[1:] if argv is None else argv
+    chosen = args_list[0] if args_list else None
+    # The top-level help is formatted here, so it imports nothing (not even
+    # argparse); only the selected subcommand's module is ever loaded.
+    if chosen in ("-h", "--help"):
+        sys.stdout.write(usage())
+        return 0
+    if chosen not in COMMANDS:
+        sys.stderr.write(usage())
+        problem = f"unknown command '{chosen}'" if chosen else "a command is required"
+        print(f"kumanui: error: {problem}", file=sys.stderr)
+        return 2
+
+    import argparse
+
+    module_name, help_text = COMMANDS[chosen]
+    module = importlib.import_module(module_name)
+    ap = argparse.ArgumentParser(prog=f"kumanui {chosen}", description=help_text)
+    module.add_arguments(ap)
+    return module.run(ap.parse_args(args_list[1:]))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,290 @@
+"""
+Pure-Python NSKeyedArchiver encoding for the NSColor and NSFont blobs that
+macOS Terminal profiles embed, so .terminal files can be built without
+PyObjC (and off macOS).
+
+The binary plist writer follows CoreFoundation's layout: objects are
+flattened depth first (a dict, then its keys, then its values), the offset
+table uses the smallest integer size that holds its own position, and
+uniquing is by identity. Foundation shares one instance of short
+(tagged-pointer) and constant strings such as "$class" or "NSObject" but
+writes longer class names like "NSColorSpace" once per use; the archive
+builders below reproduce that by passing the same Python object where
+Foundation does. Given the same NSRGB values (below), the blobs are
+byte-for-byte those in the checked-in dist/macos-terminal/Kumanui.terminal,
+which was written by NSKeyedArchiver.archivedDataWithRootObject_.
+
+NSRGB, the legacy Generic RGB (gamma 1.8) copy of an sRGB color, comes from
+a ColorSync transform that cannot be reproduced exactly. Values recorded
+from a profile built on macOS can be loaded with seed_ns_rgb(); any other
+color falls back to a fitted approximation (within 0.03 per channel).
+Terminal reads NSComponents with the embedded sRGB profile, not NSRGB.
+"""
+
+from __future__ import annotations
+
+import plistlib
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+SRGB_ICC_PATH = Path(__file__).with_name("sRGB_IEC61966-2.1.icc")
+ARCHIVER_VERSION = 100000
+
+# Terminal shows a friendly font name but NSFont archives the PostScript name
+POSTSCRIPT_NAMES = {
+    "SF Mono Terminal": "SFMonoTerminal-Regular",
+    "SF Mono": "SFMono-Regular",
+    "Menlo": "Menlo-Regular",
+    "Monaco": "Monaco",
+    "Courier": "Courier",
+    "Courier New": "CourierNewPSMT",
+}
+# NSfFlags as archived for a regular monospaced face
+FONT_FLAGS = 16
+
+# Least-squares fit of ColorSync's sRGB -> Generic RGB conversion, applied to
+# linear light before re-encoding with gamma 1.8
+_GENERIC_RGB_FIT = (
+    (0.97486, 0.027294, -0.002153),
+    (-0.001564, 1.023034, -0.019213),
+    (0.001684, 0.001555, 0.996761),
+)
+_GENERIC_RGB_GAMMA = 1.8
+
+# NSComponents string -> archived NSRGB bytes, see seed_ns_rgb()
+_NS_RGB_SEEDS: dict[bytes, bytes] = {}
+# Profiles already seeded from: path -> ((mtime_ns, size), seed count)
+_SEEDED_PROFILES: dict[Path, tuple[tuple[int, int], int]] = {}
+
+
+class UID(int):
+    """Reference to another entry of $objects."""
+
+
+class _Str(str):
+    """A string with its own identity, so equal values are not merged."""
+
+
+# Shared instances, mirroring the constant strings Foundation reuses
+_CLASS = _Str("$class")
+_CLASSNAME = _Str("$classname")
+_CLASSES = _Str("$classes")
+_NSOBJECT = _Str("NSObject")
+_NULL = _Str("$null")
+
+
+def _int_bytes(value: int) -> bytes:
+    if value < 0:
+        return b"\x13" + struct.pack(">q", value)
+    for marker, fmt, bits in ((0x10, ">B", 8), (0x11, ">H", 16), (0x12, ">L", 32)):
+        if value < 1 << bits:
+            return bytes([marker]) + struct.pack(fmt, value)
+    return b"\x13" + struct.pack(">Q", value)
+
+
+def _marker(kind: int, length: int) -> bytes:
+    if length < 15:
+        return bytes([kind | length])
+    return bytes([kind | 0xF]) + _int_bytes(length)
+
+
+def _size_for(value: int) -> int:
+    for size in (1, 2, 4):
+        if value < 1 << (8 * size):
+            return size
+    return 8
+
+
+def _flatten(obj: object, objects: list, refs: dict[int, int]) -> None:
+    if id(obj) in refs:
+        return
+    refs[id(obj)] = len(objects)
+    objects.append(obj)
+    if isinstance(obj, dict):
+        for child in (*obj.keys(), *obj.values()):
+            _flatten(child, objects, refs)
+    elif isinstance(obj, list):
+        for child in obj:
+            _flatten(child, objects, refs)
+
+
+def write_bplist(root: object) -> bytes:
+    """Encode dict/list/str/bytes/int/float/bool/UID values as a binary plist.
+
+    Objects are uniqued by identity only; pass the same instance to share it.
+    """
+    objects: list = []
+    refs: dict[int, int] = {}
+    _flatten(root, objects, refs)
+    ref_size = _size_for(len(objects))
+    ref_fmt = {1: ">B", 2: ">H", 4: ">L", 8: ">Q"}[ref_size]
+
+    def ref(obj: object) -> bytes:
+        return struct.pack(ref_fmt, refs[id(obj)])
+
+    out = bytearray(b"bplist00")
+    offsets: list[int] = []
+    for obj in objects:
+        offsets.append(len(out))
+        if isinstance(obj, bool):
+            out += b"\x09" if obj else b"\x08"
+        elif isinstance(obj, UID):
+            raw = obj.to_bytes(_size_for(obj), "big")
+            out += bytes([0x80 | (len(raw) - 1)]) + raw
+        elif isinstance(obj, int):
+            out += _int_bytes(obj)
+        elif isinstance(obj, float):
+            out += b"\x23" + struct.pack(">d", obj)
+        elif isinstance(obj, bytes):
+            out += _marker(0x40, len(obj)) + obj
+        elif isinstance(obj, str):
+            if obj.isascii():
+                out += _marker(0x50, len(obj)) + obj.encode("ascii")
+            else:
+                raw = obj.encode("utf-16-be")
+                out += _marker(0x60, len(raw) // 2) + raw
+        elif isinstance(obj, list):
+            out += _marker(0xA0, len(obj)) + b"".join(ref(o) for o in obj)
+        elif isinstance(obj, dict):
+            out += _marker(0xD0, len(obj))
+            out += b"".join(ref(k) for k in obj.keys())
+            out += b"".join(ref(v) for v in obj.values())
+        else:
+            raise TypeError(f"Unsupported plist value: {type(obj).__name__}")
+
+    table_offset = len(out)
+    offset_size = _size_for(table_offset)
+    offset_fmt = {1: ">B", 2: ">H", 4: ">L", 8: ">Q"}[offset_size]
+    for offset in offsets:
+        out += struct.pack(offset_fmt, offset)
+    out += struct.pack(">6xBBQQQ", offset_size, ref_size, len(objects), 0, table_offset)
+    return bytes(out)
+
+
+def _class_dict(name: str, classname: str | None = None) -> dict:
+    # Pass a separate classname for names Foundation writes twice
+    return {_CLASSNAME: classname or name, _CLASSES: [name, _NSOBJECT]}
+
+
+def _archive(objects: list) -> bytes:
+    return write_bplist(
+        {
+            _Str("$version"): ARCHIVER_VERSION,
+            _Str("$archiver"): _Str("NSKeyedArchiver"),
+            _Str("$top"): {_Str("root"): UID(1)},
+            _Str("$objects"): [_NULL, *objects],
+        }
+    )
+
+
+@lru_cache(maxsize=1)
+def srgb_icc_profile() -> bytes:
+    return SRGB_ICC_PATH.read_bytes()
+
+
+def _fmt(value: float) -> bytes:
+    return b"%.10g" % value
+
+
+def _approx_ns_rgb(r: float, g: float, b: float) -> tuple[float, float, float]:
+    def linear(c: float) -> float:
+        return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+    lin = (linear(r), linear(g), linear(b))
+    out = []
+    for row in _GENERIC_RGB_FIT:
+        v = min(1.0, max(0.0, sum(m * c for m, c in zip(row, lin))))
+        out.append(v ** (1 / _GENERIC_RGB_GAMMA))
+    return out[0], out[1], out[2]
+
+
+def seed_ns_rgb(blobs: Iterable[bytes]) -> int:
+    """Record the NSRGB values of archived NSColors for reuse; return the count.
+
+    Memoized archives are only dropped when a seed is new or different, so
+    reseeding from the same profile on every render keeps them warm.
+    """
+    seeded = 0
+    changed = False
+    for blob in blobs:
+        try:
+            objects = plistlib.loads(blob)["$objects"]
+            color = objects[1]
+            components, ns_rgb = color["NSComponents"], color["NSRGB"]
+        except Exception:
+            continue
+        if isinstance(components, bytes) and isinstance(ns_rgb, bytes):
+            if _NS_RGB_SEEDS.get(components) != ns_rgb:
+                _NS_RGB_SEEDS[components] = ns_rgb
+                changed = True
+            seeded += 1
+    if changed:
+        archive_color.cache_clear()
+    return seeded
+
+
+def seed_ns_rgb_from_profile(path: Path) -> int:
+    """Seed NSRGB values from an existing .terminal profile, if there is one.
+
+    A profile that has not changed since it was last read is not parsed again.
+    """
+    try:
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        seen = _SEEDED_PROFILES.get(path)
+        if seen is not None and seen[0] == stamp:
+            return seen[1]
+        with path.open("rb") as f:
+            profile = plistlib.load(f)
+    except (OSError, plistlib.InvalidFileException, ValueError):
+        return 0
+    seeded = seed_ns_rgb(v for v in profile.values() if isinstance(v, bytes))
+    _SEEDED_PROFILES[path] = (stamp, seeded)
+    return seeded
+
+
+@lru_cache(maxsize=4096)
+def archive_color(r: float, g: float, b: float, a: float = 1.0) -> bytes:
+    """Return NSKeyedArchiver bytes for NSColor colorWithSRGBRed:green:blue:alpha:."""
+    components = b" ".join(_fmt(c) for c in (r, g, b, a))
+    ns_rgb = _NS_RGB_SEEDS.get(components)
+    if ns_rgb is None:
+        values = [_fmt(c) for c in _approx_ns_rgb(r, g, b)]
+        if a != 1.0:
+            values.append(_fmt(a))
+        ns_rgb = b" ".join(values) + b"\0"
+    color = {
+        _CLASS: UID(5),
+        _Str("NSComponents"): components,
+        _Str("NSRGB"): ns_rgb,
+        _Str("NSColorSpace"): 1,
+        _Str("NSCustomColorSpace"): UID(2),
+        # Observed in Foundation's output: "0" whenever the color is translucent
+        _Str("NSLinearExposure"): b"1" if a == 1.0 else b"0",
+    }
+    color_space = {_Str("NSID"): 7, _Str("NSICC"): UID(3), _CLASS: UID(4)}
+    space_class = _class_dict(_Str("NSColorSpace"), _Str("NSColorSpace"))
+    color_class = _class_dict(_Str("NSColor"))
+    return _archive([color, color_space, srgb_icc_profile(), space_class, color_class])
+
+
+def postscript_name(name: str) -> str:
+    if name in POSTSCRIPT_NAMES:
+        return POSTSCRIPT_NAMES[name]
+    if "-" in name:
+        return name
+    return name.replace(" ", "") + "-Regular"
+
+
+@lru_cache(maxsize=64)
+def archive_font(name: str, size: float) -> bytes:
+    """Return NSKeyedArchiver bytes for NSFont fontWithName:size:."""
+    font = {
+        _Str("NSSize"): float(size),
+        _Str("NSfFlags"): FONT_FLAGS,
+        _Str("NSName"): UID(2),
+        _CLASS: UID(3),
+    }
+    return _archive([font, _Str(postscript_name(name)), _class_dict(_Str("NSFont"))])
@@ -0,0 +1,256 @@
+"""
+Band-at-a-time PNG reading and writing with zlib and NumPy.
+
+8-bit, non-interlaced gray, gray+alpha, RGB and RGBA images are decoded
+here: rows are decompressed and unfiltered incrementally and handed out in
+bands of (rows, width, channels) uint8 arrays, so memory is bounded by the
+band size, not the image. Gray is expanded to RGB on read.
+
+When Pillow is installed, read_bands decodes with it instead for frames of
+up to PILLOW_MAX_PIXELS (faster, but the whole decoded frame is held in
+memory) and, at any size, for PNGs the streaming decoder does not support
+(16-bit, palette or interlaced).
+
+In the streaming decoder the None, Sub and Up filters are vectorized.
+Average and Paeth depend on the previous pixel of the same row and are
+unfiltered in plain Python, one channel at a time: over half a second per
+megapixel of Paeth-filtered RGB, against under 0.1 s for Sub. Most encoders
+use Paeth, which is why Pillow is preferred for frames that fit in memory.
+PngWriter only uses Sub.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import BinaryIO, Iterator, NamedTuple
+
+from color_math import require_numpy
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# PNG color type -> channels
+CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+READ_SIZE = 1 << 16
+# Largest frame decoded whole with Pillow (64 MiB as RGBA); larger ones are
+# streamed so memory does not grow with the frame
+PILLOW_MAX_PIXELS = 1 << 24
+
+
+class PngHeader(NamedTuple):
+    width: int
+    height: int
+    color_type: int
+
+    @property
+    def channels(self) -> int:
+        return CHANNELS[self.color_type]
+
+
+def _chunks(f: BinaryIO) -> Iterator[tuple[bytes, bytes]]:
+    if f.read(8) != SIGNATURE:
+        raise ValueError("not a PNG file")
+    while True:
+        head = f.read(8)
+        if len(head) < 8:
+            raise ValueError("truncated PNG (no IEND)")
+        length, kind = struct.unpack(">I4s", head)
+        if kind == b"IDAT":
+            # Large IDAT chunks are passed on in pieces
+            remaining = length
+            while remaining:
+                piece = f.read(min(remaining, READ_SIZE))
+                if not piece:
+                    raise ValueError("truncated PNG")
+                remaining -= len(piece)
+                yield kind, piece
+        else:
+            yield kind, f.read(length)
+        f.read(4)  # CRC
+        if kind == b"IEND":
+            return
+
+
+def _unfilter_slow(kind: int, raw, prev, bpp: int):
+    # One strided pass per channel: the left neighbour of a byte is the
+    # previous byte of its channel, so the inner loop is a plain zip
+    line = bytearray(raw.tobytes())
+    up = prev.tobytes()
+    for ch in range(bpp):
+        out = []
+        a = c = 0
+        if kind == 3:
+            for x, b in zip(line[ch::bpp], up[ch::bpp]):
+                a = (x + ((a + b) >> 1)) & 0xFF
+                out.append(a)
+        else:
+            for x, b in zip(line[ch::bpp], up[ch::bpp]):
+                # Paeth distances, with p = a + b - c folded in
+                pa, pb, pc = abs(b - c), abs(a - c), abs(a + b - c - c)
+                if pa <= pb and pa <= pc:
+                    a = (x + a) & 0xFF
+                elif pb <= pc:
+                    a = (x + b) & 0xFF
+                else:
+                    a = (x + c) & 0xFF
+                c = b
+                out.append(a)
+        line[ch::bpp] = bytes(out)
+    np = require_numpy()
+    return np.frombuffer(bytes(line), dtype=np.uint8)
+
+
+def _unfilter(kind: int, raw, prev, bpp: int):
+    np = require_numpy()
+    if kind == 0:
+        return raw
+    if kind == 1:
+        return np.cumsum(raw.reshape(-1, bpp), axis=0, dtype=np.uint8).ravel()
+    if kind == 2:
+        return raw + prev
+    if kind in (3, 4):
+        return _unfilter_slow(kind, raw, prev, bpp)
+    raise ValueError(f"invalid PNG filter type {kind}")
+
+
+def _pillow():
+    try:
+        from PIL import Image  # type: ignore
+    except Exception:
+        return None
+    return Image
+
+
+def _read_bands_pillow(Image, f: BinaryIO, band_pixels: int) -> tuple[PngHeader, Iterator]:
+    np = require_numpy()
+    image = Image.open(f)
+    if image.format != "PNG":
+        image.close()
+        raise ValueError("not a PNG file")
+    alpha = image.mode in ("RGBA", "LA", "PA", "La", "RGBa") or "transparency" in image.info
+    mode = "RGBA" if alpha else "RGB"
+    width, height = image.size
+    band_rows = max(1, band_pixels // max(1, width))
+
+    def bands() -> Iterator:
+        with image:
+            # Decodes the whole image once; bands are crops of it
+            pixels = image if image.mode == mode else image.convert(mode)
+            for top in range(0, height, band_rows):
+                box = (0, top, width, min(height, top + band_rows))
+                yield np.asarray(pixels.crop(box))
+
+    return PngHeader(width, height, 6 if alpha else 2), bands()
+
+
+def read_bands(f: BinaryIO, band_pixels: int = 1 << 20) -> tuple[PngHeader, Iterator]:
+    """Parse the header; the iterator yields (rows, width, channels) uint8 bands.
+
+    Bands hold about `band_pixels` pixels (at least one row). Gray and
+    gray+alpha are returned as RGB and RGBA. Decodes with Pillow when it is
+    installed and the frame has at most PILLOW_MAX_PIXELS pixels, or cannot
+    be streamed; `f` must then be seekable.
+    """
+    np = require_numpy()
+    start = f.tell()
+    chunks = _chunks(f)
+    kind, data = next(chunks)
+    if kind != b"IHDR":
+        raise ValueError("PNG does not start with IHDR")
+    width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", data)
+    streamable = depth == 8 and color_type in CHANNELS and not interlace
+    if not streamable or width * height <= PILLOW_MAX_PIXELS:
+        Image = _pillow()
+        if Image is not None:
+            f.seek(start)
+            return _read_bands_pillow(Image, f, band_pixels)
+    if not streamable:
+        raise ValueError(
+            f"unsupported PNG (bit depth {depth}, color type {color_type}, "
+            f"interlace {interlace}); only 8-bit non-interlaced gray/RGB(A) is supported"
+        )
+    header = PngHeader(width, height, color_type)
+    bpp = header.channels
+    stride = width * bpp
+    band_rows = max(1, band_pixels // max(1, width))
+
+    def bands() -> Iterator:
+        inflate = zlib.decompressobj()
+        pending = bytearray()
+        prev = np.zeros(stride, dtype=np.uint8)
+        band: list = []
+        done = 0
+        for kind, data in chunks:
+            if kind != b"IDAT":
+                continue
+            pending += inflate.decompress(data)
+            view = memoryview(pending)
+            offset = 0
+            while len(pending) - offset > stride and done < height:
+                row = view[offset + 1 : offset + 1 + stride]
+                raw = np.frombuffer(row, dtype=np.uint8)
+                prev = _unfilter(pending[offset], raw, prev, bpp).copy()
+                band.append(prev)
+                del row, raw
+                offset += stride + 1
+                done += 1
+                if len(band) == band_rows:
+                    yield _expand(np.stack(band).reshape(-1, width, bpp))
+                    band = []
+            view.release()
+            del pending[:offset]
+        if band:
+            yield _expand(np.stack(band).reshape(-1, width, bpp))
+        if done < height:
+            raise ValueError(f"truncated PNG image data ({done}/{height} rows)")
+
+    return header, bands()
+
+
+def _expand(band):
+    np = require_numpy()
+    if band.shape[-1] == 1:
+        return np.repeat(band, 3, axis=-1)
+    if band.shape[-1] == 2:
+        gray, alpha = band[..., :1], band[..., 1:]
+        return np.concatenate([np.repeat(gray, 3, axis=-1), alpha], axis=-1)
+    return band
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(data, zlib.crc32(kind))
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+
+class PngWriter:
+    """Write an 8-bit RGB or RGBA PNG band by band (Sub filter)."""
+
+    def __init__(self, f: BinaryIO, width: int, height: int, channels: int) -> None:
+        if channels not in (3, 4):
+            raise ValueError(f"channels must be 3 or 4, got {channels}")
+        self.f = f
+        self.channels = channels
+        self.deflate = zlib.compressobj(6)
+        self.buffer = bytearray()
+        color_type = 2 if channels == 3 else 6
+        f.write(SIGNATURE)
+        ihdr = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+        f.write(_chunk(b"IHDR", ihdr))
+
+    def write(self, band) -> None:
+        np = require_numpy()
+        rows = band.reshape(band.shape[0], -1)
+        filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 1
+        filtered[:, 1 : 1 + self.channels] = rows[:, : self.channels]
+        # Each byte minus the same channel of the pixel to its left
+        c = self.channels
+        np.subtract(rows[:, c:], rows[:, :-c], out=filtered[:, 1 + c :])
+        self.buffer += self.deflate.compress(filtered.tobytes())
+        if len(self.buffer) >= READ_SIZE:
+            self.f.write(_chunk(b"IDAT", bytes(self.buffer)))
+            self.buffer.clear()
+
+    def close(self) -> None:
+        self.buffer += self.deflate.flush()
+        self.f.write(_chunk(b"IDAT", bytes(self.buffer)))
+        self.f.write(_chunk(b"IEND", b""))
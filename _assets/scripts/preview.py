@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Render the terminal demo as an SVG (or PNG) preview of a theme, headless.
+
+The output of terminal_demo.render_banner and print_ansi_color_list is
+written into an in-memory cell grid by a small SGR interpreter, and ANSI
+color indices are resolved through the theme's semantics.terminal (the
+same model the terminal exporters use). Adjacent cells with the same style
+are coalesced into one rect or one text run, and colors become CSS
+classes, so a preview is a few KB.
+
+A preview renders in about a millisecond, so thousands of themes take
+seconds with `kumanui.py batch --formats preview` on its process pool.
+
+PNG output rasterizes the SVG with cairosvg, when it is installed.
+
+Usage:
+  python3 _assets/scripts/kumanui.py preview [-o dist/preview/kumanui.svg]
+  python3 _assets/scripts/kumanui.py preview --tokens tenants/acme.yaml --png
+  python3 _assets/scripts/kumanui.py batch tenants/ --formats preview -j 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import re
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+from token_utils import TokenGraph, TokenGraphError, load_graph
+
+ROOT = Path(__file__).resolve().parents[2]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+DEFAULT_OUT = ROOT / "dist/preview/kumanui.svg"
+
+COLUMNS = 128
+CELL_W = 9
+CELL_H = 18
+FONT_SIZE = 15
+PAD = 20
+TITLE_H = 28
+SGR_RE = re.compile(r"\x1b\[([0-9;]*)m")
+BLOCK = "█"
+# Window buttons, as in the macOS screenshot
+BUTTONS = ("#FF5F57", "#FEBC2E", "#28C840")
+
+# Cell style: (fg, bg, bold); colors are None (default), 0-15 or "#RRGGBB"
+DEFAULT_STYLE = (None, None, False)
+
+
+class Run(NamedTuple):
+    row: int
+    col: int
+    text: str
+    style: tuple
+
+
+def _palette_tokens(graph: TokenGraph) -> dict:
+    """The raw-token shape terminal_demo reads, built from resolved values.
+
+    graph.raw of an extends: overlay has no palette of its own.
+    """
+    from terminal_demo import palette_order
+
+    palette: dict = {}
+    for hue in palette_order():
+        palette[hue] = {
+            tier: {"value": graph.hex(f"palette.{hue}.{tier}")}
+            for tier in ("base", "light")
+            if f"palette.{hue}.{tier}" in graph
+        }
+    return {"palette": palette}
+
+
+def demo_text(tokens: dict, width: int = COLUMNS) -> str:
+    """The terminal_demo output for these tokens, as a string."""
+    from terminal_demo import hues_for_text, print_ansi_color_list, render_banner
+
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        print()
+        text = "Kumanui"
+        print(render_banner(text, hues_for_text(text)))
+        print_ansi_color_list(tokens, width)
+    return buf.getvalue().rstrip("\n") + "\n"
+
+
+def _apply_sgr(params: str, style: tuple) -> tuple:
+    fg, bg, bold = style
+    codes = [int(p) if p else 0 for p in params.split(";")]
+    i = 0
+    while i < len(codes):
+        c = codes[i]
+        if c == 0:
+            fg, bg, bold = DEFAULT_STYLE
+        elif c == 1:
+            bold = True
+        elif c == 22:
+            bold = False
+        elif 30 <= c <= 37:
+            fg = c - 30
+        elif 90 <= c <= 97:
+            fg = c - 90 + 8
+        elif c == 39:
+            fg = None
+        elif 40 <= c <= 47:
+            bg = c - 40
+        elif 100 <= c <= 107:
+            bg = c - 100 + 8
+        elif c == 49:
+            bg = None
+        elif c in (38, 48) and i + 4 < len(codes) and codes[i + 1] == 2:
+            color = "#%02X%02X%02X" % tuple(codes[i + 2 : i + 5])
+            fg, bg = (color, bg) if c == 38 else (fg, color)
+            i += 4
+        i += 1
+    return fg, bg, bold
+
+
+def parse_grid(text: str) -> tuple[list[Run], int, int]:
+    """Interpret ANSI text into runs of same-style cells; return (runs, cols, rows).
+
+    Consecutive cells with one style become one run; full blocks are kept
+    in runs of their own so they can be drawn as rects.
+    """
+    runs: list[Run] = []
+    style = DEFAULT_STYLE
+    cols = 0
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    for row, line in enumerate(lines):
+        col = 0
+        pos = 0
+        for m in [*SGR_RE.finditer(line), None]:
+            end = m.start() if m else len(line)
+            segment = line[pos:end]
+            # Split into block / non-block stretches
+            for piece in re.findall(f"{BLOCK}+|[^{BLOCK}]+", segment):
+                last = runs[-1] if runs else None
+                if (
+                    last is not None
+                    and last.row == row
+                    and last.style == style
+                    and last.col + len(last.text) == col
+                    and (last.text[0] == BLOCK) == (piece[0] == BLOCK)
+                ):
+                    runs[-1] = last._replace(text=last.text + piece)
+                else:
+                    runs.append(Run(row, col, piece, style))
+                col += len(piece)
+            if m is None:
+                break
+            style = _apply_sgr(m.group(1), style)
+            pos = m.end()
+        cols = max(cols, col)
+    return runs, cols, len(lines)
+
+
+class Colors:
+    """Resolve cell colors through the theme and assign CSS classes."""
+
+    def __init__(self, graph: TokenGraph) -> None:
+        from exporters import theme_model
+
+        model = theme_model(graph)
+        self.ansi = [c.hex for c in model.ansi]
+        self.foreground = model.foreground.hex
+        self.bold = model.bold.hex
+        self.background = model.background.hex
+        self.classes: dict[str, str] = {}
+
+    def fg(self, style: tuple) -> str:
+        fg, _, bold = style
+        if fg is None:
+            return self.bold if bold else self.foreground
+        return fg if isinstance(fg, str) else self.ansi[fg]
+
+    def bg(self, style: tuple) -> str | None:
+        bg = style[1]
+        if bg is None:
+            return None
+        return bg if isinstance(bg, str) else self.ansi[bg]
+
+    def cls(self, hexv: str) -> str:
+        name = self.classes.get(hexv)
+        if name is None:
+            name = self.classes[hexv] = f"c{len(self.classes)}"
+        return name
+
+
+def render_svg(
+    graph: TokenGraph, text: str | None = None, title: str = "kumanui"
+) -> str:
+    """SVG of `text` (default: the terminal demo) in the theme's terminal colors."""
+    if text is None:
+        text = demo_text(_palette_tokens(graph))
+    runs, cols, rows = parse_grid(text)
+    colors = Colors(graph)
+    width = cols * CELL_W + 2 * PAD
+    height = rows * CELL_H + 2 * PAD + TITLE_H
+
+    rects: list[str] = []
+    texts: list[str] = []
+    for run in runs:
+        x = PAD + run.col * CELL_W
+        y = TITLE_H + PAD + run.row * CELL_H
+        n = len(run.text)
+        bg = colors.bg(run.style)
+        if bg is not None:
+            rects.append(
+                f'<rect class="{colors.cls(bg)}" x="{x}" y="{y}" '
+                f'width="{n * CELL_W}" height="{CELL_H}"/>'
+            )
+        if run.text[0] == BLOCK:
+            rects.append(
+                f'<rect class="{colors.cls(colors.fg(run.style))}" x="{x}" y="{y}" '
+                f'width="{n * CELL_W}" height="{CELL_H}"/>'
+            )
+        elif run.text.strip():
+            weight = ' font-weight="bold"' if run.style[2] else ""
+            texts.append(
+                f'<text class="{colors.cls(colors.fg(run.style))}" x="{x}" '
+                f'y="{y + CELL_H - 5}"{weight}>{escape(run.text)}</text>'
+            )
+
+    buttons = "".join(
+        f'<circle cx="{PAD + 6 + i * 20}" cy="{TITLE_H // 2 + 4}" r="6" fill="{c}"/>'
+        for i, c in enumerate(BUTTONS)
+    )
+    style = "".join(f".{name}{{fill:{hexv}}}" for hexv, name in colors.classes.items())
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">'
+        f"<style>text{{font:{FONT_SIZE}px ui-monospace,SFMono-Regular,Menlo,Consolas,"
+        f"monospace;white-space:pre}}{style}</style>"
+        f'<rect width="{width}" height="{height}" rx="10" fill="{colors.background}"/>'
+        f"{buttons}"
+        f'<text x="{width // 2}" y="{TITLE_H // 2 + 9}" text-anchor="middle" '
+        f'fill="{colors.foreground}" opacity="0.6">{escape(title)}</text>'
+        + "".join(rects)
+        + "".join(texts)
+        + "</svg>\n"
+    )
+
+
+def svg_to_png(svg: str) -> bytes:
+    try:
+        import cairosvg  # type: ignore
+    except Exception:
+        raise RuntimeError(
+            "PNG output needs cairosvg. Install with: pip install cairosvg"
+        ) from None
+    return cairosvg.svg2png(bytestring=svg.encode("utf-8"))
+
+
+def write_preview(graph: TokenGraph, out_file: Path, png: bool = False) -> list[Path]:
+    """Write the SVG preview (and a .png sibling); return the written paths.
+
+    Both are rendered before anything is written, so a missing cairosvg
+    leaves no SVG behind.
+    """
+    svg = render_svg(graph, title=graph.raw.get("meta", {}).get("name", "kumanui"))
+    outputs: dict[Path, bytes] = {out_file: svg.encode("utf-8")}
+    if png:
+        outputs[out_file.with_suffix(".png")] = svg_to_png(svg)
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    for path, data in outputs.items():
+        path.write_bytes(data)
+    return list(outputs)
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--tokens", default=str(TOKENS_PATH), help="Token file")
+    ap.add_argument("-o", "--out", default=str(DEFAULT_OUT), help="Output SVG file")
+    ap.add_argument(
+        "--png", action="store_true", help="Also write a PNG (needs cairosvg)"
+    )
+    ap.add_argument(
+        "--bench", type=int, metavar="N", help="Time N renders instead of writing"
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        graph = load_graph(Path(args.tokens))
+        if args.bench:
+            render_svg(graph)
+            start = time.perf_counter()
+            for _ in range(args.bench):
+                render_svg(graph)
+            per = (time.perf_counter() - start) / args.bench * 1000
+            print(f"[preview] {per:.2f} ms per SVG ({60000 / per:.0f}/min per process)")
+            return 0
+        written = write_preview(graph, Path(args.out), args.png)
+    except (OSError, RuntimeError, TokenGraphError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    for path in written:
+        print(f"[preview] wrote {path} ({path.stat().st_size} B)")
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Render a theme preview as SVG/PNG")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Serve per-tenant CSS over HTTP, rendered on demand from the token store.
+
+  GET /<tenant>/kumanui.css       generate_css output
+  GET /<tenant>/kumanui.min.css   generate_css_min output
+  GET /kumanui.css                the default tenant (tokens/colors.yaml)
+  GET /_stats                     cache and latency counters as JSON
+
+A tenant is <store>/<tenant>.yaml or <store>/<tenant>/colors.yaml (the batch
+layout; extends: files work too). Rendered bytes, with their gzip and brotli
+variants, are kept in an LRU capped by total size. A cached tenant is reused
+while its token file and the files it extends are unchanged (checked with a
+stat per request). ETags hash the contents of those files and the CSS
+generator, and are kept per tenant after its bodies are evicted, so
+If-None-Match revalidation answers 304 after a stat (or, for a tenant not
+seen yet, reading its token files) without rendering or compressing.
+
+Usage:
+  python3 _assets/scripts/kumanui.py serve [--store DIR] [--port 8787]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import sys
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import NamedTuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPTS_DIR.parents[1]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+DEFAULT_TENANT = "default"
+FILES = ("kumanui.css", "kumanui.min.css")
+TENANT_RE = re.compile(r"[A-Za-z0-9_-]+")
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class Validator(NamedTuple):
+    """What a tenant's ETag was computed from."""
+
+    # Token file and the files it extends, with their (mtime, size) when read
+    sources: tuple[Path, ...]
+    signature: tuple
+    etag: str
+
+    def current(self) -> bool:
+        try:
+            return signature(self.sources) == self.signature
+        except OSError:
+            return False
+
+
+class Rendered(NamedTuple):
+    """Every representation of one tenant's CSS."""
+
+    sources: tuple[Path, ...]
+    signature: tuple
+    etag: str
+    # (file, content-encoding) -> body; "" is the identity encoding
+    bodies: dict[tuple[str, str], bytes]
+    size: int
+
+
+class RenderCache:
+    """LRU of rendered tenants bounded by the total size of their bodies."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, Rendered] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, tenant: str) -> Rendered | None:
+        """Return a tenant's entry while its token files are unchanged."""
+        entry = self._entries.get(tenant)
+        if entry is None:
+            return None
+        if not Validator(entry.sources, entry.signature, entry.etag).current():
+            self._drop(tenant)
+            return None
+        self._entries.move_to_end(tenant)
+        return entry
+
+    def put(self, tenant: str, entry: Rendered) -> None:
+        if tenant in self._entries:
+            self._drop(tenant)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[tenant] = entry
+        self.bytes += entry.size
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, tenant: str) -> None:
+        self.bytes -= self._entries.pop(tenant).size
+
+
+class Stats:
+    """Request counters plus a window of recent latencies."""
+
+    def __init__(self, window: int = 10000):
+        self.counters = {
+            "requests": 0,
+            "hits": 0,
+            "misses": 0,
+            "not_modified": 0,
+            "errors": 0,
+        }
+        self.latency: deque[float] = deque(maxlen=window)
+        self.render: deque[float] = deque(maxlen=window)
+        self.started = time.time()
+
+    @staticmethod
+    def _summary(samples: deque[float]) -> dict[str, float]:
+        if not samples:
+            return {"count": 0}
+        ordered = sorted(samples)
+        n = len(ordered)
+
+        def pct(p: float) -> float:
+            return round(ordered[min(n - 1, int(p * n))] * 1000, 3)
+
+        return {
+            "count": n,
+            "mean_ms": round(sum(ordered) / n * 1000, 3),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
+
+    def snapshot(self, cache: RenderCache) -> dict[str, object]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else None,
+            "uptime_s": round(time.time() - self.started, 1),
+            "cache": {
+                "entries": len(cache),
+                "bytes": cache.bytes,
+                "max_bytes": cache.max_bytes,
+                "evictions": cache.evictions,
+            },
+            "latency": self._summary(self.latency),
+            "render": self._summary(self.render),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Rendering (runs in a worker thread)
+
+
+_code_digest: str | None = None
+_encodings: frozenset[str] | None = None
+
+
+def _generator_digest() -> str:
+    global _code_digest
+    if _code_digest is None:
+        h = hashlib.sha256()
+        for name in (
+            "generate_css.py",
+            "color_math.py",
+            "token_utils.py",
+            "token_schema.py",
+            "exporters/model.py",
+        ):
+            h.update((SCRIPTS_DIR / name).read_bytes())
+        _code_digest = h.hexdigest()
+    return _code_digest
+
+
+def available_encodings() -> frozenset[str]:
+    """Content-encodings render_tenant produces besides identity."""
+    global _encodings
+    if _encodings is None:
+        from generate_css import precompress
+
+        _encodings = frozenset(precompress(b""))
+    return _encodings
+
+
+def token_sources(path: Path) -> list[Path]:
+    """The token file followed by every file it extends, in order."""
+    from token_utils import extends_path, parse_tokens
+
+    chain = [path]
+    while len(chain) <= 32:
+        parent = extends_path(chain[-1], parse_tokens(chain[-1].read_bytes()))
+        if parent is None:
+            break
+        chain.append(parent.resolve())
+    return chain
+
+
+def signature(sources: tuple[Path, ...]) -> tuple:
+    return tuple((st.st_mtime_ns, st.st_size) for st in map(Path.stat, sources))
+
+
+def tenant_validator(path: Path) -> Validator:
+    """Hash the tenant's token files and the generator; parses, never renders."""
+    sources = tuple(token_sources(path))
+    sig = signature(sources)
+    h = hashlib.sha256(_generator_digest().encode("ascii"))
+    for source in sources:
+        data = source.read_bytes()
+        h.update(f"{len(data)}:".encode("ascii"))
+        h.update(data)
+    return Validator(sources, sig, h.hexdigest()[:32])
+
+
+def render_tenant(path: Path) -> Rendered:
+    from generate_css import generate_css, generate_css_min, precompress
+    from token_utils import load_graph
+
+    validator = tenant_validator(path)
+    graph = load_graph(path)
+    bodies: dict[tuple[str, str], bytes] = {}
+    for name, text in (
+        ("kumanui.css", generate_css(graph)),
+        ("kumanui.min.css", generate_css_min(graph)),
+    ):
+        data = text.encode("utf-8")
+        bodies[(name, "")] = data
+        for encoding, payload in precompress(data).items():
+            bodies[(name, encoding)] = payload
+    size = sum(len(b) for b in bodies.values())
+    return Rendered(*validator, bodies, size)
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+
+
+_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+def choose_encoding(accept: str, available: set[str]) -> str:
+    """Pick br, then gzip, from an Accept-Encoding header ("" for identity)."""
+    offered: dict[str, float] = {}
+    for part in accept.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    for encoding in ("br", "gzip"):
+        q = offered.get(encoding, offered.get("*", 0.0))
+        if encoding in available and q > 0:
+            return encoding
+    return ""
+
+
+def _etag(digest: str, encoding: str) -> str:
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ThemeServer:
+    def __init__(self, store: Path | None, max_bytes: int, default_tokens: Path = TOKENS_PATH):
+        self.store = store
+        self.default_tokens = default_tokens
+        self.cache = RenderCache(max_bytes)
+        self.stats = Stats()
+        self._inflight: dict[str, asyncio.Future[Rendered]] = {}
+        # Tenant -> last validator; small, and kept when bodies are evicted
+        self.validators: dict[str, Validator] = {}
+
+    def tenant_path(self, tenant: str) -> Path | None:
+        if tenant == DEFAULT_TENANT:
+            return self.default_tokens
+        if self.store is None or not TENANT_RE.fullmatch(tenant):
+            return None
+        for candidate in (
+            self.store / f"{tenant}.yaml",
+            self.store / f"{tenant}.yml",
+            self.store / tenant / "colors.yaml",
+        ):
+            if candidate.is_file():
+                return candidate
+        return None
+
+    async def validator(self, tenant: str, path: Path) -> Validator:
+        known = self.validators.get(tenant)
+        if known is not None and known.current():
+            return known
+        loop = asyncio.get_running_loop()
+        known = await loop.run_in_executor(None, tenant_validator, path)
+        self.validators[tenant] = known
+        return known
+
+    async def rendered(self, tenant: str, path: Path) -> Rendered:
+        loop = asyncio.get_running_loop()
+        entry = self.cache.get(tenant)
+        if entry is not None:
+            self.stats.counters["hits"] += 1
+            return entry
+
+        self.stats.counters["misses"] += 1
+        # Concurrent misses for one tenant share a single render
+        pending = self._inflight.get(tenant)
+        if pending is not None:
+            return await pending
+        future: asyncio.Future[Rendered] = loop.create_future()
+        self._inflight[tenant] = future
+        start = time.perf_counter()
+        try:
+            entry = await loop.run_in_executor(None, render_tenant, path)
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it so a failure nobody else awaited is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(entry)
+            self.stats.render.append(time.perf_counter() - start)
+            self.cache.put(tenant, entry)
+            self.validators[tenant] = Validator(entry.sources, entry.signature, entry.etag)
+            return entry
+        finally:
+            del self._inflight[tenant]
+
+    async def respond(self, method: str, target: str, headers: dict[str, str]):
+        """Return (status, headers, body) for one request."""
+        path = target.split("?", 1)[0]
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, b""
+        if path == "/_stats":
+            body = json.dumps(self.stats.snapshot(self.cache), indent=2).encode() + b"\n"
+            return 200, {"Content-Type": "application/json", "Cache-Control": "no-store"}, body
+
+        parts = [p for p in path.split("/") if p]
+        if len(parts) == 1:
+            parts.insert(0, DEFAULT_TENANT)
+        if len(parts) != 2 or parts[1] not in FILES:
+            return 404, {}, b"not found\n"
+        tenant, name = parts
+        token_path = self.tenant_path(tenant)
+        if token_path is None:
+            return 404, {}, b"unknown tenant\n"
+        encoding = choose_encoding(headers.get("accept-encoding", ""), available_encodings())
+        out = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        try:
+            # Revalidation is answered from the validator alone
+            validator = await self.validator(tenant, token_path)
+            out["ETag"] = _etag(validator.etag, encoding)
+            if etag_matches(headers.get("if-none-match", ""), out["ETag"]):
+                self.stats.counters["not_modified"] += 1
+                return 304, out, b""
+            entry = await self.rendered(tenant, token_path)
+        except Exception as e:
+            self.stats.counters["errors"] += 1
+            print(f"[serve] ERROR: {tenant}: {e}", file=sys.stderr)
+            return 500, {}, f"cannot render {tenant}\n".encode()
+
+        # The files may have changed since the validator was read
+        out["ETag"] = _etag(entry.etag, encoding)
+        out["Content-Type"] = "text/css; charset=utf-8"
+        if encoding:
+            out["Content-Encoding"] = encoding
+        return 200, out, entry.bodies[(name, encoding)]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                start = time.perf_counter()
+                self.stats.counters["requests"] += 1
+                lines = head.decode("latin-1").split("\r\n")
+                request = lines[0].split()
+                headers = {}
+                for line in lines[1:]:
+                    key, sep, value = line.partition(":")
+                    if sep:
+                        headers[key.strip().lower()] = value.strip()
+                if len(request) != 3:
+                    status, out, body = 400, {}, b"bad request\n"
+                    method = "GET"
+                else:
+                    method, target, version = request
+                    status, out, body = await self.respond(method, target, headers)
+                keep_alive = (
+                    len(request) == 3
+                    and request[2] == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                head_lines = [f"HTTP/1.1 {status} {_REASONS[status]}"]
+                out["Content-Length"] = str(len(body))
+                if not keep_alive:
+                    out["Connection"] = "close"
+                head_lines += [f"{k}: {v}" for k, v in out.items()]
+                writer.write(("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD" and status != 304:
+                    writer.write(body)
+                await writer.drain()
+                self.stats.latency.append(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(server: ThemeServer, host: str, port: int) -> None:
+    srv = await asyncio.start_server(server.handle, host, port, limit=MAX_HEADER_BYTES)
+    store = server.store or "none, default tenant only"
+    print(f"[serve] http://{host}:{port}/kumanui.css (store: {store}); stats at /_stats")
+    async with srv:
+        await srv.serve_forever()
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--store", help="Directory of tenant token files")
+    ap.add_argument("--tokens", default=str(TOKENS_PATH), help="Default tenant token file")
+    ap.add_argument(
+        "--cache-mb", type=float, default=64.0, help="Rendered CSS cache size (default: 64)"
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    store = Path(args.store) if args.store else None
+    if store is not None and not store.is_dir():
+        print(f"ERROR: store is not a directory: {store}", file=sys.stderr)
+        return 2
+    server = ThemeServer(store, int(args.cache_mb * 1024 * 1024), Path(args.tokens))
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        print()
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Serve per-tenant CSS over HTTP")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Tree-shake the generated CSS against the code that consumes it.
+
+Scans CSS/HTML/JS/TS(X) and similar files for --kumanui-* variable usages
+and writes a CSS file with only the referenced variables plus the ones they
+depend on (web variables refer to palette variables with var()), then
+reports the variables, and so tokens, that nothing uses.
+
+Files are discovered with os.scandir and handed out in batches to a process
+pool while the walk is still running. Each file is read with unbuffered
+64 KiB os.read() calls and only chunks containing "--kumanui-" are searched,
+so most files cost one read. Declarations (--kumanui-x: ...), e.g. a vendored copy of kumanui.css,
+do not count as usages.
+
+Usage:
+  python3 _assets/scripts/kumanui.py shake apps/ packages/ -o dist/css/kumanui.app.css
+  python3 _assets/scripts/kumanui.py shake . --min --report dist/css/usage.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+ROOT = Path(__file__).resolve().parents[2]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+DEFAULT_OUT = ROOT / "dist/css/kumanui.shaken.css"
+
+SCAN_SUFFIXES = frozenset(
+    {
+        ".css", ".scss", ".sass", ".less", ".styl",
+        ".html", ".htm", ".vue", ".svelte", ".astro",
+        ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts",
+        ".md", ".mdx",
+    }
+)  # fmt: skip
+SKIP_DIRS = frozenset({".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv"})
+MARKER = b"--kumanui-"
+# A name not followed by ":" (which would make it a declaration)
+USAGE_RE = re.compile(rb"--kumanui-([A-Za-z0-9-]+)(?![A-Za-z0-9-]|\s*:)")
+VAR_RE = re.compile(r"--kumanui-[A-Za-z0-9-]+")
+# Small enough that allocating the read buffer is cheap for the typical file
+CHUNK = 1 << 16
+BATCH = 256
+
+
+class ScanResult(NamedTuple):
+    files: int
+    bytes: int
+    # variable -> number of files using it
+    usages: dict[str, int]
+
+
+def iter_files(roots: Iterable[Path], suffixes: frozenset[str] = SCAN_SUFFIXES) -> Iterator[str]:
+    """Yield matching file paths under each root (files are yielded as-is)."""
+    for root in roots:
+        if root.is_file():
+            yield str(root)
+            continue
+        stack = [str(root)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS:
+                                stack.append(entry.path)
+                        elif os.path.splitext(entry.name)[1] in suffixes:
+                            yield entry.path
+            except OSError:
+                continue
+
+
+def scan_file(path: str, found: set[bytes]) -> int:
+    """Add the variable names used in one file to `found`; return bytes read."""
+    size = 0
+    carry = b""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return 0
+    try:
+        while True:
+            chunk = os.read(fd, CHUNK)
+            size += len(chunk)
+            last = len(chunk) < CHUNK
+            buf = carry + chunk
+            # Without more input, a match ending near the end of the buffer
+            # may be cut short; carry it into the next chunk
+            limit = len(buf) if last else len(buf) - 128
+            carry = buf[limit:]
+            if MARKER in buf:
+                for m in USAGE_RE.finditer(buf):
+                    if m.end() > limit:
+                        carry = buf[min(m.start(), limit) :]
+                        break
+                    found.add(m.group(1))
+            if last:
+                break
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+    return size
+
+
+def scan_batch(paths: list[str]) -> ScanResult:
+    usages: dict[str, int] = {}
+    total = 0
+    for path in paths:
+        found: set[bytes] = set()
+        total += scan_file(path, found)
+        for name in found:
+            key = "--kumanui-" + name.decode("ascii")
+            usages[key] = usages.get(key, 0) + 1
+    return ScanResult(len(paths), total, usages)
+
+
+def _merge(results: Iterable[ScanResult]) -> ScanResult:
+    files = size = 0
+    usages: dict[str, int] = {}
+    for r in results:
+        files += r.files
+        size += r.bytes
+        for name, count in r.usages.items():
+            usages[name] = usages.get(name, 0) + count
+    return ScanResult(files, size, usages)
+
+
+def _batches(paths: Iterator[str], size: int) -> Iterator[list[str]]:
+    batch: list[str] = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def scan(roots: list[Path], jobs: int | None = None) -> ScanResult:
+    """Scan every file under `roots` for --kumanui-* usages."""
+    jobs = jobs or os.cpu_count() or 1
+    batches = _batches(iter_files(roots), BATCH)
+    if jobs == 1:
+        return _merge(map(scan_batch, batches))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # Submitting while walking overlaps directory listing with scanning
+        futures: list[Future[ScanResult]] = [pool.submit(scan_batch, b) for b in batches]
+        return _merge(f.result() for f in futures)
+
+
+def dependencies(properties: Iterable[tuple[str, str]]) -> dict[str, set[str]]:
+    deps: dict[str, set[str]] = {}
+    for name, value in properties:
+        deps.setdefault(name, set()).update(VAR_RE.findall(value))
+    return deps
+
+
+def closure(used: Iterable[str], deps: dict[str, set[str]]) -> set[str]:
+    """Used variables plus everything they reference, transitively."""
+    keep: set[str] = set()
+    pending = [name for name in used if name in deps]
+    while pending:
+        name = pending.pop()
+        if name not in keep:
+            keep.add(name)
+            pending.extend(deps.get(name, ()))
+    return keep
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("roots", nargs="+", help="Directories or files to scan")
+    ap.add_argument("-o", "--out", default=str(DEFAULT_OUT), help="Output CSS file")
+    ap.add_argument("--tokens", default=str(TOKENS_PATH), help="Token file")
+    ap.add_argument("--min", action="store_true", help="Write minified CSS")
+    ap.add_argument("--report", help="Also write usage and unused tokens as JSON")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes")
+
+
+def run(args: argparse.Namespace) -> int:
+    from generate_css import (
+        generate_css,
+        generate_css_min,
+        palette_properties,
+        variable_paths,
+        web_properties,
+    )
+    from token_utils import TokenGraphError, load_graph
+
+    roots = [Path(r) for r in args.roots]
+    missing = [str(r) for r in roots if not r.exists()]
+    if missing:
+        print(f"ERROR: not found: {', '.join(missing)}", file=sys.stderr)
+        return 2
+    try:
+        graph = load_graph(Path(args.tokens))
+    except (OSError, TokenGraphError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    result = scan(roots, args.jobs)
+    scan_seconds = time.perf_counter() - start
+
+    properties = palette_properties(graph)
+    for mode in ("light", "dark"):
+        properties += web_properties(graph, mode)
+    deps = dependencies(properties)
+    keep = closure(result.usages, deps)
+    paths = variable_paths(graph)
+    unused = [name for name in paths if name not in keep]
+    undefined = sorted(name for name in result.usages if name not in deps)
+
+    css = generate_css_min(graph, keep) if args.min else generate_css(graph, keep)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(css, encoding="utf-8")
+
+    mb = result.bytes / (1 << 20)
+    print(
+        f"[shake] scanned {result.files} files ({mb:.1f} MiB) in {scan_seconds:.2f} s"
+    )
+    used_direct = sum(1 for name in result.usages if name in deps)
+    print(
+        f"[shake] {len(keep)}/{len(paths)} variables kept "
+        f"({used_direct} used directly, {len(keep) - used_direct} as dependencies)"
+    )
+    print(f"[shake] wrote {out} ({len(css.encode('utf-8'))} B)")
+    if unused:
+        print(f"[shake] unused: {len(unused)} variables")
+        for name in unused:
+            print(f"  {name:<32} {', '.join(paths[name])}")
+    for name in undefined:
+        print(f"WARNING: {name} is used but not defined by the theme", file=sys.stderr)
+
+    if args.report:
+        report = {
+            "files": result.files,
+            "bytes": result.bytes,
+            "seconds": round(scan_seconds, 3),
+            "used": dict(sorted(result.usages.items())),
+            "kept": sorted(keep),
+            "unused": {name: paths[name] for name in unused},
+            "undefined": undefined,
+        }
+        Path(args.report).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Emit only the CSS variables a codebase uses")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
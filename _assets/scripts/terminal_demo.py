@@ -16,19 +16,12 @@ Notes:
 
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 import re
 import shutil
-import sys
 
-try:
-    import yaml  # type: ignore
-except Exception:
-    print(
-        "ERROR: PyYAML not installed. Install with: pip3 install pyyaml",
-        file=sys.stderr,
-    )
-    sys.exit(1)
+from token_utils import parse_tokens
 
 ROOT = Path(__file__).resolve().parents[2]
 TOKENS_PATH = ROOT / "tokens/colors.yaml"
@@ -37,12 +30,13 @@ TOKENS_PATH = ROOT / "tokens/colors.yaml"
 RESET = "\x1b[0m"
 
 
-def sgr(*codes: int) -> str:
+def sgr(*codes: int | str) -> str:
     return "\x1b[" + ";".join(str(c) for c in codes) + "m"
 
 
 def load_tokens(path: Path) -> dict:
-    return yaml.safe_load(path.read_text(encoding="utf-8"))
+    # libyaml's C loader when available, same as the generators
+    return parse_tokens(path.read_bytes())
 
 
 def palette_order() -> list[str]:
@@ -195,7 +189,8 @@ def render_banner(text: str, letter_hues: list[str]) -> str:
     return "\n".join(out_lines)
 
 
-def print_ansi_color_list(tokens: dict) -> None:
+def print_ansi_color_list(tokens: dict, width: int | None = None) -> None:
+    """Print the hue swatch blocks, wrapped to `width` (default: terminal, max 128)."""
     print("\nANSI colors (Standard/Bright):\n")
 
     # Build 3-line blocks for each hue
@@ -229,7 +224,7 @@ def print_ansi_color_list(tokens: dict) -> None:
             col_width = max(col_width, visible_len(line))
     col_width = max(col_width, 18)  # reasonable minimum
 
-    total_width = min(shutil.get_terminal_size((128, 24)).columns, 128)
+    total_width = width or min(shutil.get_terminal_size((128, 24)).columns, 128)
     gap = 2
     cols = max(1, total_width // (col_width + gap))
 
@@ -247,8 +242,12 @@ def print_ansi_color_list(tokens: dict) -> None:
         print("")
 
 
-def main() -> int:
-    tokens = load_tokens(TOKENS_PATH)
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--tokens", default=str(TOKENS_PATH), help="Token file")
+
+
+def run(args: argparse.Namespace) -> int:
+    tokens = load_tokens(Path(args.tokens))
 
     print()
     print()
@@ -260,5 +259,11 @@ def main() -> int:
     return 0
 
 
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Show Kumanui colors in the terminal")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
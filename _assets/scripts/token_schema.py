@@ -0,0 +1,353 @@
+"""
+Schema validation for token files.
+
+The schema below is compiled once, at import, into a tree of small checker
+closures, so validating a parsed file is a single walk with no schema
+interpretation (a couple of microseconds per token). All problems
+are collected before reporting. Line numbers come from re-composing the YAML
+only when there is something to report, which keeps the happy path cheap.
+
+Covered: meta, palette.<hue>.<tier> (the eight ANSI hues need base, light
+and dark), semantics.terminal (every key the generators read) and
+semantics.web.<mode>; color values (#RRGGBB / #RRGGBBAA or {reference}),
+alpha in 0..1, type: color, and that every reference points at a token
+without forming a cycle.
+
+load_graph() runs validate_tokens() before compiling a freshly parsed file,
+so generators never start on a malformed one. Files with extends: are
+checked as overlays against their parent graph.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, NamedTuple
+
+from token_utils import TokenGraph, TokenGraphError
+
+NAME_RE = re.compile(r"[A-Za-z0-9_-]+")
+# One match per value: group 1 is set for references
+VALUE_RE = re.compile(r"#[0-9A-Fa-f]{6}(?:[0-9A-Fa-f]{2})?|\{([A-Za-z0-9_.-]+)\}")
+TOKEN_KEYS = frozenset({"value", "type", "alpha", "description"})
+
+ANSI_HUES = ("black", "red", "green", "yellow", "blue", "magenta", "cyan", "white")
+TIERS = ("base", "light", "dark")
+WEB_KEYS = (
+    "surface",
+    "mutedText",
+    "heading",
+    "link",
+    "linkHover",
+    "border",
+    "accent",
+    "selection",
+)
+
+
+class SchemaProblem(NamedTuple):
+    path: str
+    message: str
+    line: int | None = None
+
+    def format(self, filename: str | None = None) -> str:
+        where = f"{filename}:{self.line}: " if filename and self.line else ""
+        if not filename and self.line:
+            where = f"line {self.line}: "
+        return f"{where}{self.path or '<root>'}: {self.message}"
+
+
+class TokenSchemaError(TokenGraphError):
+    """Raised when a token file does not match the schema."""
+
+    def __init__(self, problems: list[SchemaProblem], filename: str | None = None):
+        self.schema_problems = problems
+        super().__init__([p.format(filename) for p in problems])
+
+
+class _State:
+    __slots__ = ("errors", "tokens", "refs")
+
+    def __init__(self) -> None:
+        self.errors: list[tuple[str, str]] = []
+        self.tokens: set[str] = set()
+        self.refs: list[tuple[str, str]] = []
+
+
+Check = Callable[[object, str, _State], None]
+
+
+def _join(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+
+# ---------------------------------------------------------------------------
+# Schema nodes. compile() returns the checker closure for the node.
+
+
+class Color:
+    """A color token: {value: <hex or {ref}>, type?: color, alpha?: 0..1}."""
+
+    def compile(self, partial: bool = False) -> Check:
+        value_match = VALUE_RE.fullmatch
+        is_token_keys = TOKEN_KEYS.issuperset
+
+        def check(node: object, path: str, st: _State) -> None:
+            if not isinstance(node, dict):
+                st.errors.append((path, "expected a token mapping with 'value'"))
+                return
+            st.tokens.add(path)
+            value = node.get("value")
+            if not isinstance(value, str):
+                st.errors.append((_join(path, "value"), "missing or not a string"))
+            else:
+                m = value_match(value)
+                if m is None:
+                    st.errors.append((_join(path, "value"), f"invalid color {value!r}"))
+                elif m.group(1) is not None:
+                    st.refs.append((path, m.group(1)))
+            if len(node) > 1:
+                kind = node.get("type", "color")
+                if kind != "color":
+                    st.errors.append((_join(path, "type"), f"expected 'color', got {kind!r}"))
+                if "alpha" in node:
+                    alpha = node["alpha"]
+                    if (
+                        isinstance(alpha, bool)
+                        or not isinstance(alpha, (int, float))
+                        or not 0 <= alpha <= 1
+                    ):
+                        st.errors.append(
+                            (_join(path, "alpha"), f"must be a number in 0..1, got {alpha!r}")
+                        )
+                if not is_token_keys(node):
+                    for key in node.keys() - TOKEN_KEYS:
+                        st.errors.append((_join(path, str(key)), "unknown token field"))
+
+        return check
+
+
+class Text:
+    def compile(self, partial: bool = False) -> Check:
+        def check(node: object, path: str, st: _State) -> None:
+            if not isinstance(node, str):
+                st.errors.append((path, f"expected a string, got {type(node).__name__}"))
+
+        return check
+
+
+class Choice:
+    def __init__(self, *options: str):
+        self.options = frozenset(options)
+
+    def compile(self, partial: bool = False) -> Check:
+        options = self.options
+
+        def check(node: object, path: str, st: _State) -> None:
+            if node not in options:
+                expected = ", ".join(sorted(options))
+                st.errors.append((path, f"expected one of {expected}, got {node!r}"))
+
+        return check
+
+
+class Tree:
+    """Any nesting of groups whose leaves are color tokens."""
+
+    def compile(self, partial: bool = False) -> Check:
+        color = Color().compile()
+
+        def check(node: object, path: str, st: _State) -> None:
+            if isinstance(node, dict) and "value" not in node:
+                for key, child in node.items():
+                    check(child, _join(path, str(key)), st)
+            else:
+                color(node, path, st)
+
+        return check
+
+
+class Group:
+    """A mapping with required/optional keys; other keys go to `each`.
+
+    Compiled with partial=True, required keys may be missing.
+    """
+
+    def __init__(
+        self,
+        required: dict[str, object] | None = None,
+        optional: dict[str, object] | None = None,
+        each: object | None = None,
+    ):
+        self.required = required or {}
+        self.optional = optional or {}
+        self.each = each
+
+    def compile(self, partial: bool = False) -> Check:
+        required = {k: n.compile(partial) for k, n in self.required.items()}
+        known = {**required, **{k: n.compile(partial) for k, n in self.optional.items()}}
+        each = self.each.compile(partial) if self.each is not None else None
+        if partial:
+            # Overlays (extends:) only list what they change
+            required = {}
+        name_match = NAME_RE.fullmatch
+
+        def check(node: object, path: str, st: _State) -> None:
+            if not isinstance(node, dict):
+                st.errors.append((path, "expected a mapping"))
+                return
+            for key in required:
+                if key not in node:
+                    st.errors.append((_join(path, key), "missing"))
+            for key, child in node.items():
+                key = str(key)
+                sub = _join(path, key)
+                checker = known.get(key)
+                if checker is not None:
+                    checker(child, sub, st)
+                elif each is None:
+                    st.errors.append((sub, "unknown key"))
+                elif not name_match(key):
+                    st.errors.append((sub, "invalid name"))
+                else:
+                    each(child, sub, st)
+
+        return check
+
+
+COLOR = Color()
+
+SCHEMA = Group(
+    required={
+        "meta": Group(
+            required={"name": Text()},
+            optional={"colorSpace": Choice("srgb")},
+            each=Text(),
+        ),
+        "palette": Group(
+            required={
+                hue: Group(required={t: COLOR for t in TIERS}, each=Tree())
+                for hue in ANSI_HUES
+            },
+            each=Tree(),
+        ),
+        "semantics": Group(
+            required={
+                "terminal": Group(
+                    required={
+                        "background": COLOR,
+                        "text": COLOR,
+                        "boldText": COLOR,
+                        "selection": COLOR,
+                        "cursor": COLOR,
+                        "ansi": Group(
+                            required={
+                                kind: Group(required={h: COLOR for h in ANSI_HUES})
+                                for kind in ("standard", "bright")
+                            }
+                        ),
+                    }
+                ),
+            },
+            optional={
+                "web": Group(
+                    each=Group(
+                        required={"background": COLOR, "text": COLOR},
+                        optional={
+                            **{k: COLOR for k in WEB_KEYS},
+                            "code": Group(optional={"bg": COLOR, "text": COLOR}),
+                        },
+                    )
+                ),
+            },
+            each=Tree(),
+        ),
+    },
+    optional={"extends": Text()},
+)
+
+_CHECK = SCHEMA.compile()
+_CHECK_OVERLAY = SCHEMA.compile(partial=True)
+
+
+def _check_refs(st: _State, base: TokenGraph | None) -> None:
+    targets = dict(st.refs)
+    for path, target in st.refs:
+        if target not in st.tokens and (base is None or target not in base):
+            st.errors.append((_join(path, "value"), f"reference to unknown token {{{target}}}"))
+            continue
+        # Only tokens on the cycle are reported, not every alias leading into it
+        seen = {path}
+        while target in targets:
+            if target in seen:
+                if target == path:
+                    st.errors.append((_join(path, "value"), "reference cycle"))
+                break
+            seen.add(target)
+            target = targets[target]
+
+
+def _line_index(source: bytes | str) -> dict[str, int]:
+    """Map dotted paths to 1-based YAML line numbers."""
+    import yaml
+
+    from token_utils import yaml_loader
+
+    lines: dict[str, int] = {}
+    try:
+        root = yaml.compose(source, Loader=yaml_loader())
+    except yaml.YAMLError:
+        return lines
+
+    def walk(node, path: str) -> None:
+        if isinstance(node, yaml.MappingNode):
+            for key_node, value_node in node.value:
+                sub = _join(path, str(key_node.value))
+                lines[sub] = key_node.start_mark.line + 1
+                walk(value_node, sub)
+
+    walk(root, "")
+    return lines
+
+
+def _line_for(path: str, lines: dict[str, int]) -> int | None:
+    # Missing keys point at their closest existing parent
+    while path:
+        if path in lines:
+            return lines[path]
+        path = path.rpartition(".")[0]
+    return None
+
+
+def validate_tokens(
+    tokens: object,
+    source: bytes | str | None = None,
+    base: TokenGraph | None = None,
+) -> list[SchemaProblem]:
+    """Return every schema problem in a parsed token file (empty when valid).
+
+    Pass the YAML `source` to get line numbers in the problems. With `base`
+    (the parent graph of an extends: file) the file is checked as an overlay:
+    required keys may be missing and references may point into `base`.
+    """
+    st = _State()
+    if base is None:
+        _CHECK(tokens, "", st)
+    else:
+        _CHECK_OVERLAY(tokens, "", st)
+    _check_refs(st, base)
+    if not st.errors:
+        return []
+    lines = _line_index(source) if source is not None else {}
+    return [SchemaProblem(path, msg, _line_for(path, lines)) for path, msg in st.errors]
+
+
+def check_tokens(
+    tokens: object,
+    source: bytes | str | None = None,
+    filename: str | None = None,
+    base: TokenGraph | None = None,
+) -> None:
+    """Raise TokenSchemaError listing every problem, if there are any."""
+    problems = validate_tokens(tokens, source, base)
+    if problems:
+        raise TokenSchemaError(problems, filename)
@@ -1,16 +1,18 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import pickle
+import sys
+from collections import ChainMap
+from pathlib import Path
+from types import MappingProxyType
+from typing import Iterable, Iterator, Mapping, NamedTuple
 
-def resolve_ref(tokens: dict, ref: str) -> dict | None:
-    """Follow a reference string like "{path.to.token}" within tokens."""
-    if not (isinstance(ref, str) and ref.startswith("{") and ref.endswith("}")):
-        return None
-    cur: object = tokens
-    for key in ref[1:-1].split("."):
-        if not isinstance(cur, dict) or key not in cur:
-            return None
-        cur = cur[key]
-    return cur if isinstance(cur, dict) else None
+ROOT = Path(__file__).resolve().parents[2]
+SNAPSHOT_DIR = ROOT / "dist/.kumanui-cache"
+SNAPSHOT_VERSION = 1
 
 
 def hex_to_rgb(hex_str: str) -> tuple[int, int, int]:
@@ -24,45 +26,524 @@ def hex_to_rgb(hex_str: str) -> tuple[int, int, int]:
     return r, g, b
 
 
-def hex_to_rgb01(hex_str: str) -> tuple[float, float, float]:
-    """Return RGB floats in [0,1] from a hex string."""
-    r, g, b = hex_to_rgb(hex_str)
-    return r / 255.0, g / 255.0, b / 255.0
+# ---------------------------------------------------------------------------
+# Compiled token graph
+# ---------------------------------------------------------------------------
+
+
+class TokenGraphError(ValueError):
+    """Raised when a token tree has dangling references or reference cycles."""
+
+    def __init__(self, problems: list[str]):
+        self.problems = problems
+        super().__init__("; ".join(problems))
+
+
+class ResolvedToken(NamedTuple):
+    """A token with its reference chain already followed to a concrete color."""
+
+    path: str
+    entry: Mapping
+    ref: str | None
+    hex: str | None
+    alpha: float
 
 
-def color_entry_to_hex(tokens: dict, entry: dict) -> str:
-    """Resolve a color token entry to a hex value."""
-    val = entry.get("value")
-    if isinstance(val, str):
-        if val.startswith("#"):
-            return val.upper()
-        refd = resolve_ref(tokens, val)
-        if (
-            refd
-            and isinstance(refd.get("value"), str)
-            and refd["value"].startswith("#")
-        ):
-            return refd["value"].upper()
-    raise ValueError(f"Unsupported color value: {val}")
+def _parse_ref(val: object) -> str | None:
+    if isinstance(val, str) and val.startswith("{") and val.endswith("}"):
+        return sys.intern(val[1:-1])
+    return None
 
 
-def color_entry_to_rgba(tokens: dict, entry: dict) -> tuple[float, float, float, float]:
-    """Resolve a color token entry to RGBA floats in [0,1]."""
+def _entry_alpha(entry: Mapping) -> float | None:
+    if "alpha" not in entry:
+        return None
     try:
-        a = float(entry.get("alpha", 1.0))
+        return float(entry["alpha"])
     except Exception:
-        a = 1.0
-    hex_source = entry.get("value")
-    if isinstance(hex_source, str) and not hex_source.startswith("#"):
-        refd = resolve_ref(tokens, hex_source)
-        if refd:
-            if "alpha" in refd and "alpha" not in entry:
-                try:
-                    a = float(refd["alpha"])
-                except Exception:
-                    a = 1.0
-            hex_source = refd.get("value", hex_source)
-    if isinstance(hex_source, str) and hex_source.startswith("#"):
-        r, g, b = hex_to_rgb01(hex_source)
-        return r, g, b, a
-    raise ValueError(f"Unsupported color value: {hex_source}")
+        return 1.0
+
+
+# color_math imports this module, so its Color type is bound on first use
+_Color = None
+
+
+def _load_color_type():
+    global _Color
+    from color_math import Color
+
+    _Color = Color
+    return Color
+
+
+class TokenGraph:
+    """Immutable, pre-resolved view over a token tree.
+
+    Every token (a mapping with a ``value`` key) is interned by its dotted
+    path and resolved once, in dependency order, so generators can look up
+    hex/RGBA values in O(1) instead of re-walking the raw dict.
+    """
+
+    __slots__ = ("raw", "_tokens", "_children", "_dependents")
+
+    def __init__(self, raw: Mapping, tokens: Mapping, children: Mapping):
+        self.raw = raw
+        self._tokens = MappingProxyType(tokens)
+        self._children = MappingProxyType(children)
+        self._dependents: dict[str, tuple[str, ...]] | None = None
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._tokens
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tokens)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def token(self, path: str) -> ResolvedToken:
+        try:
+            return self._tokens[path]
+        except KeyError:
+            raise KeyError(f"Unknown token: {path}") from None
+
+    def entry(self, path: str) -> Mapping:
+        return self.token(path).entry
+
+    def ref(self, path: str) -> str | None:
+        """Return the path this token directly references, if any."""
+        return self.token(path).ref
+
+    def hex(self, path: str) -> str:
+        tok = self.token(path)
+        if tok.hex is None:
+            raise ValueError(f"Unsupported color value: {tok.entry.get('value')}")
+        return tok.hex
+
+    def color(self, path: str):
+        """The token's interned color_math.Color (with its alpha)."""
+        tok = self.token(path)
+        if tok.hex is None:
+            raise ValueError(f"Unsupported color value: {tok.entry.get('value')}")
+        return (_Color or _load_color_type())(tok.hex, tok.alpha)
+
+    def rgba(self, path: str) -> tuple[float, float, float, float]:
+        color = self.color(path)
+        return (*color.rgb01, color.alpha)
+
+    def children(self, path: str) -> tuple[str, ...]:
+        """Return child keys of a group path ("" for the root), in file order."""
+        return self._children.get(path, ())
+
+    def __reduce__(self):
+        # Mapping proxies do not pickle; store plain tuples and re-point each
+        # entry at its dict inside ``raw`` when restoring.
+        resolved = [(t.path, t.ref, t.hex, t.alpha) for t in self._tokens.values()]
+        return _restore_graph, (self.raw, resolved, dict(self._children))
+
+
+def _restore_graph(raw: dict, resolved: list, children: dict) -> TokenGraph:
+    tokens: dict[str, ResolvedToken] = {}
+    for path, ref, hexv, alpha in resolved:
+        node = raw
+        for key in path.split("."):
+            node = node[key]
+        tokens[path] = ResolvedToken(path, MappingProxyType(node), ref, hexv, alpha)
+    return TokenGraph(raw, tokens, children)
+
+
+def _walk_groups(
+    node: dict,
+    prefix: str,
+    entries: dict[str, Mapping],
+    children: dict[str, tuple[str, ...]],
+) -> None:
+    keys: list[str] = []
+    for key, child in node.items():
+        if not isinstance(child, dict):
+            continue
+        key = sys.intern(str(key))
+        keys.append(key)
+        path = sys.intern(f"{prefix}.{key}" if prefix else key)
+        if "value" in child:
+            entries[path] = MappingProxyType(child)
+        else:
+            _walk_groups(child, path, entries, children)
+    children[prefix] = tuple(keys)
+
+
+def _resolve(
+    entries: Mapping[str, Mapping],
+    known: Mapping[str, ResolvedToken],
+    problems: list[str],
+) -> dict[str, ResolvedToken]:
+    """Resolve ``entries`` in dependency order; refs may also point into ``known``."""
+    refs: dict[str, str | None] = {}
+    for path, entry in entries.items():
+        target = _parse_ref(entry.get("value"))
+        if target is not None and target not in entries and target not in known:
+            problems.append(f"{path}: dangling reference {{{target}}}")
+            target = None
+        refs[path] = target
+
+    # Resolve in topological order (dependencies first) with an iterative DFS
+    resolved: dict[str, ResolvedToken] = {}
+    state: dict[str, int] = {}  # 1 = visiting, 2 = done
+    for root in entries:
+        if root in state:
+            continue
+        trail = [root]
+        while trail:
+            path = trail[-1]
+            target = refs[path]
+            # Targets outside ``entries`` are already resolved in ``known``
+            target_state = state.get(target) if target in entries else 2
+            if state.get(path) is None:
+                state[path] = 1
+                if target is not None and target_state is None:
+                    trail.append(target)
+                    continue
+                if target is not None and target_state == 1:
+                    cycle = trail[trail.index(target) :] + [target]
+                    problems.append("reference cycle: " + " -> ".join(cycle))
+            trail.pop()
+            state[path] = 2
+            entry = entries[path]
+            own_alpha = _entry_alpha(entry)
+            parent = None
+            if target is not None:
+                parent = resolved.get(target) or known.get(target)
+            if parent is not None:
+                hexv = parent.hex
+                alpha = own_alpha if own_alpha is not None else parent.alpha
+            else:
+                val = entry.get("value")
+                hexv = val.upper() if isinstance(val, str) and val.startswith("#") else None
+                alpha = own_alpha if own_alpha is not None else 1.0
+            resolved[path] = ResolvedToken(path, entry, target, hexv, alpha)
+    return resolved
+
+
+def compile_tokens(tokens: dict) -> TokenGraph:
+    """Build a :class:`TokenGraph`, reporting all dangling refs and cycles."""
+    entries: dict[str, Mapping] = {}
+    children: dict[str, tuple[str, ...]] = {}
+    _walk_groups(tokens, "", entries, children)
+
+    problems: list[str] = []
+    resolved = _resolve(entries, {}, problems)
+    if problems:
+        raise TokenGraphError(problems)
+    # Iterate in file order rather than resolution order
+    ordered = {path: resolved[path] for path in entries}
+    return TokenGraph(tokens, ordered, children)
+
+
+# ---------------------------------------------------------------------------
+# Layered themes (extends:)
+# ---------------------------------------------------------------------------
+
+
+class LayeredMapping(Mapping):
+    """Read-only view of ``top`` laid over ``base`` without copying either.
+
+    Keys in ``top`` win. A group present in both layers comes back as another
+    LayeredMapping, so overrides merge group by group; a token (a mapping
+    with ``value``) in ``top`` replaces the base token whole.
+    """
+
+    __slots__ = ("top", "base")
+
+    def __init__(self, top: Mapping, base: Mapping):
+        self.top = top
+        self.base = base
+
+    def __getitem__(self, key):
+        if key in self.top:
+            value = self.top[key]
+            below = self.base.get(key)
+            if _is_group(value) and _is_group(below):
+                return LayeredMapping(value, below)
+            return value
+        return self.base[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.top or key in self.base
+
+    def __iter__(self) -> Iterator:
+        yield from self.base
+        for key in self.top:
+            if key not in self.base:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def _is_group(node: object) -> bool:
+    return isinstance(node, Mapping) and "value" not in node
+
+
+def _dependents(graph: TokenGraph) -> dict[str, tuple[str, ...]]:
+    """Reverse reference index (target -> direct referrers), built once per graph."""
+    if graph._dependents is None:
+        index: dict[str, list[str]] = {}
+        for tok in graph._tokens.values():
+            if tok.ref is not None:
+                index.setdefault(tok.ref, []).append(tok.path)
+        graph._dependents = {k: tuple(v) for k, v in index.items()}
+    return graph._dependents
+
+
+def overlay_graph(base: TokenGraph, overrides: dict) -> TokenGraph:
+    """Lay a partial token tree over ``base`` and return the combined graph.
+
+    Nothing from ``base`` is copied. Only overridden tokens and the base
+    tokens whose reference chains pass through them are re-resolved; every
+    other lookup falls through to ``base``, so many variants of one theme
+    share a single base graph in memory.
+    """
+    entries: dict[str, Mapping] = {}
+    own_children: dict[str, tuple[str, ...]] = {}
+    _walk_groups(overrides, "", entries, own_children)
+
+    problems: list[str] = []
+    children: dict[str, tuple[str, ...]] = {}
+    for group, keys in own_children.items():
+        if group in base:
+            problems.append(f"{group}: cannot replace a token with a group")
+            continue
+        below = base.children(group)
+        extra = tuple(k for k in keys if k not in below)
+        if extra or group not in base._children:
+            children[group] = below + extra
+    for path in entries:
+        if path in base._children:
+            problems.append(f"{path}: cannot replace a group with a token")
+
+    # Base tokens referencing an override (directly or through a chain)
+    dependents = _dependents(base)
+    pending = list(entries)
+    while pending:
+        for path in dependents.get(pending.pop(), ()):
+            if path not in entries:
+                entries[path] = base.token(path).entry
+                pending.append(path)
+
+    resolved = _resolve(entries, base._tokens, problems)
+    if problems:
+        raise TokenGraphError(problems)
+    return TokenGraph(
+        LayeredMapping(overrides, base.raw),
+        ChainMap(resolved, base._tokens),
+        ChainMap(children, base._children),
+    )
+
+
+class TrackingGraph(TokenGraph):
+    """A view of a :class:`TokenGraph` that records every path it is asked for.
+
+    Used by the build cache to learn which token subtrees a generator depends
+    on. Lookups of missing paths are recorded too, so adding a token later
+    invalidates targets that probed for it. Group listings are recorded with a
+    trailing "/".
+    """
+
+    __slots__ = ("reads",)
+
+    def __init__(self, graph: TokenGraph):
+        super().__init__(graph.raw, {}, {})
+        self._tokens = graph._tokens
+        self._children = graph._children
+        self.reads: set[str] = set()
+
+    def __contains__(self, path: str) -> bool:
+        self.reads.add(path)
+        return path in self._tokens
+
+    def token(self, path: str) -> ResolvedToken:
+        self.reads.add(path)
+        return super().token(path)
+
+    def children(self, path: str) -> tuple[str, ...]:
+        self.reads.add(path + "/")
+        return super().children(path)
+
+
+def digest_reads(graph: TokenGraph, reads: Iterable[str]) -> str:
+    """Hash the resolved values behind a set of recorded reads.
+
+    Token hashes cover the raw entry plus its resolved color, so a change to
+    any palette entry along a reference chain changes the digest of every
+    token that resolves through it.
+    """
+    h = hashlib.sha256()
+    for read in sorted(reads):
+        if read.endswith("/"):
+            state: object = graph._children.get(read[:-1], ())
+        else:
+            tok = graph._tokens.get(read)
+            state = None if tok is None else [dict(tok.entry), tok.ref, tok.hex, tok.alpha]
+        blob = json.dumps(state, sort_keys=True, default=str)
+        h.update(f"{read}={blob}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+
+def require_yaml():
+    """Import PyYAML on first use, so commands that never parse YAML skip it."""
+    try:
+        import yaml  # type: ignore
+    except Exception:
+        print(
+            "ERROR: PyYAML not installed. Install with: pip3 install pyyaml",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return yaml
+
+
+def yaml_loader():
+    """Return libyaml's C safe loader when PyYAML was built with it."""
+    yaml = require_yaml()
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def parse_tokens(source: bytes | str) -> dict:
+    return require_yaml().load(source, Loader=yaml_loader())
+
+
+def load_tokens(path: Path) -> dict:
+    return parse_tokens(path.read_bytes())
+
+
+_code_digest: str | None = None
+
+
+def snapshot_key(source: bytes) -> str:
+    """Hash of the token source plus the resolver and schema, so changes invalidate."""
+    global _code_digest
+    if _code_digest is None:
+        h = hashlib.sha256(Path(__file__).read_bytes())
+        h.update(Path(__file__).with_name("token_schema.py").read_bytes())
+        _code_digest = h.hexdigest()
+    h = hashlib.sha256(source)
+    h.update(f"{SNAPSHOT_VERSION}:{_code_digest}".encode("ascii"))
+    return h.hexdigest()
+
+
+def extends_path(path: Path, tokens: object) -> Path | None:
+    """Return the parent file named by a top-level ``extends:``, if any.
+
+    Relative paths are resolved against the directory of ``path``.
+    """
+    if not isinstance(tokens, dict) or "extends" not in tokens:
+        return None
+    parent = tokens["extends"]
+    if not isinstance(parent, str) or not parent:
+        raise TokenGraphError([f"{path}: extends must be a file path"])
+    return path.parent / parent
+
+
+# Parent themes loaded in this process: resolved path -> (source digest,
+# graph, its own parent path, the graph it was laid over). Variants that
+# extend the same parent share one graph.
+_parents: dict[Path, tuple[bytes, TokenGraph, Path | None, TokenGraph | None]] = {}
+
+
+def _parent_graph(
+    path: Path, snapshot_dir: Path | None, chain: tuple[Path, ...]
+) -> TokenGraph:
+    resolved = path.resolve()
+    if resolved in chain:
+        names = " -> ".join(str(p) for p in (*chain, resolved))
+        raise TokenGraphError([f"extends cycle: {names}"])
+    try:
+        source = resolved.read_bytes()
+    except OSError as e:
+        raise TokenGraphError([f"{chain[-1]}: cannot read {path}: {e.strerror}"]) from None
+    digest = hashlib.sha256(source).digest()
+    chain = (*chain, resolved)
+
+    cached = _parents.get(resolved)
+    if cached is not None and cached[0] == digest:
+        _, graph, grandparent, base = cached
+        # A layered parent is only current while the graph below it is
+        if grandparent is None or _parent_graph(grandparent, snapshot_dir, chain) is base:
+            return graph
+
+    graph = _load(resolved, source, snapshot_dir, chain)
+    grandparent = extends_path(resolved, parse_tokens(source)) if isinstance(
+        graph.raw, LayeredMapping
+    ) else None
+    base = _parent_graph(grandparent, snapshot_dir, chain) if grandparent else None
+    _parents[resolved] = (digest, graph, grandparent, base)
+    return graph
+
+
+def _compile_checked(
+    path: Path, source: bytes, snapshot_dir: Path | None, chain: tuple[Path, ...]
+) -> TokenGraph:
+    from token_schema import check_tokens
+
+    tokens = parse_tokens(source)
+    parent = extends_path(path, tokens)
+    if parent is None:
+        check_tokens(tokens, source, str(path))
+        return compile_tokens(tokens)
+    base = _parent_graph(parent, snapshot_dir, chain)
+    check_tokens(tokens, source, str(path), base=base)
+    return overlay_graph(base, tokens)
+
+
+def _load(
+    path: Path, source: bytes, snapshot_dir: Path | None, chain: tuple[Path, ...]
+) -> TokenGraph:
+    if snapshot_dir is None:
+        return _compile_checked(path, source, snapshot_dir, chain)
+
+    key = snapshot_key(source)
+    name = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+    snap = snapshot_dir / f"{name}.pickle"
+    try:
+        with snap.open("rb") as f:
+            data = pickle.load(f)
+        if isinstance(data, dict) and data.get("key") == key:
+            return data["graph"]
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+        pass
+
+    graph = _compile_checked(path, source, snapshot_dir, chain)
+    if isinstance(graph.raw, LayeredMapping):
+        # Overlays are small to parse, and a snapshot would copy the parent
+        return graph
+    try:
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        tmp = snap.with_suffix(f".{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            pickle.dump({"key": key, "graph": graph}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(snap)
+    except OSError:
+        # A read-only tree still builds; it just re-parses next time
+        pass
+    return graph
+
+
+def load_graph(path: Path, snapshot_dir: Path | None = SNAPSHOT_DIR) -> TokenGraph:
+    """Load and compile a token file, reusing a pickled snapshot when possible.
+
+    Snapshots are stored per source path under ``snapshot_dir`` and keyed by
+    the hash of the file contents, so an edited file is always re-parsed.
+    Pass ``snapshot_dir=None`` to always parse the YAML. Freshly parsed files
+    are checked against token_schema first (TokenSchemaError lists every
+    problem); snapshots are only written for files that passed.
+
+    A file with a top-level ``extends: <path>`` holds only overrides. It is
+    laid over its parent with :func:`overlay_graph`; parents are loaded once
+    per process and shared by every file that extends them.
+    """
+    return _load(path, path.read_bytes(), snapshot_dir, (path.resolve(),))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Check token files against the token schema (see token_schema.py).
+
+Every problem in every file is reported with its YAML line number, so a
+tenant file can be fixed in one pass. Exits 1 when any file is invalid.
+
+Usage:
+  python3 _assets/scripts/kumanui.py validate                     # tokens/colors.yaml
+  python3 _assets/scripts/kumanui.py validate tenants/*.yaml
+  python3 _assets/scripts/kumanui.py validate --bench 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from token_schema import validate_tokens
+from token_utils import (
+    TokenGraphError,
+    extends_path,
+    load_graph,
+    overlay_graph,
+    parse_tokens,
+    require_yaml,
+)
+
+ROOT = Path(__file__).resolve().parents[2]
+TOKENS_PATH = ROOT / "tokens/colors.yaml"
+
+
+def validate_file(path: Path) -> list[str]:
+    """Return formatted problems for one token file (empty when valid).
+
+    A file with extends: is checked as an overlay on its (loaded) parent,
+    then laid over it to catch reference cycles through the parent.
+    """
+    yaml = require_yaml()
+    source = path.read_bytes()
+    parent = None
+    try:
+        tokens = parse_tokens(source)
+        parent = extends_path(path, tokens)
+        base = load_graph(parent) if parent is not None else None
+    except yaml.YAMLError as e:
+        return [f"{path}: invalid YAML: {e}"]
+    except TokenGraphError as e:
+        if parent is None:
+            return list(e.problems)
+        return [f"{path}: extends {parent}: {problem}" for problem in e.problems]
+    except OSError as e:
+        return [f"{path}: extends {parent}: {e.strerror}"]
+    problems = [p.format(str(path)) for p in validate_tokens(tokens, source, base)]
+    if not problems and base is not None:
+        try:
+            overlay_graph(base, tokens)
+        except TokenGraphError as e:
+            problems = [f"{path}: {problem}" for problem in e.problems]
+    return problems
+
+
+def bench(path: Path, n: int) -> None:
+    tokens = parse_tokens(path.read_bytes())
+    validate_tokens(tokens)
+    start = time.perf_counter()
+    for _ in range(n):
+        validate_tokens(tokens)
+    per_call = (time.perf_counter() - start) / n * 1e6
+    print(f"[validate] {path.name}: {per_call:.1f} us per file ({n} runs)")
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("files", nargs="*", help="Token files (default: tokens/colors.yaml)")
+    ap.add_argument(
+        "--bench",
+        type=int,
+        metavar="N",
+        help="Time N validations of the parsed file instead of reporting",
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    paths = [Path(f) for f in args.files] or [TOKENS_PATH]
+    if args.bench:
+        for path in paths:
+            bench(path, args.bench)
+        return 0
+
+    failed = 0
+    for path in paths:
+        try:
+            problems = validate_file(path)
+        except OSError as e:
+            problems = [f"{path}: {e.strerror}"]
+        if problems:
+            failed += 1
+            for problem in problems:
+                print(f"ERROR: {problem}", file=sys.stderr)
+        else:
+            print(f"[validate] {path}: OK")
+    if len(paths) > 1:
+        print(f"[validate] {len(paths) - failed}/{len(paths)} files valid")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Validate token files against the schema")
+    add_arguments(ap)
+    return run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+"""
+File change notification for `kumanui build --watch`.
+
+Uses Linux inotify through ctypes (no extra dependency) and falls back to
+polling stat() results elsewhere or when inotify is unavailable. Directories
+are watched rather than files so editors that save via rename are seen too.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterator
+
+# From <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_CLOEXEC = os.O_CLOEXEC
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+DEFAULT_POLL_INTERVAL = 0.05
+# Editors often write a file in several steps; wait this long for the burst
+# to end before reporting it.
+DEFAULT_DEBOUNCE = 0.01
+
+
+def _inotify_changes(paths: list[Path], debounce: float) -> Iterator[set[Path]]:
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    fd = libc.inotify_init1(IN_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    wanted = {(p.parent, p.name): p for p in paths}
+    dirs: dict[int, Path] = {}
+    try:
+        for parent in {p.parent for p in paths}:
+            mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+            wd = libc.inotify_add_watch(fd, os.fsencode(parent), mask)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"cannot watch {parent}")
+            dirs[wd] = parent
+
+        while True:
+            select.select([fd], [], [])
+            changed: set[Path] = set()
+            while True:
+                buf = os.read(fd, 64 * 1024)
+                offset = 0
+                while offset < len(buf):
+                    wd, _mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+                    offset += _EVENT.size
+                    name = buf[offset : offset + length].rstrip(b"\0")
+                    offset += length
+                    key = (dirs.get(wd), os.fsdecode(name))
+                    if key in wanted:
+                        changed.add(wanted[key])
+                ready, _, _ = select.select([fd], [], [], debounce)
+                if not ready:
+                    break
+            if changed:
+                yield changed
+    finally:
+        os.close(fd)
+
+
+def _stat_key(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _poll_changes(paths: list[Path], interval: float) -> Iterator[set[Path]]:
+    last = {p: _stat_key(p) for p in paths}
+    while True:
+        time.sleep(interval)
+        changed: set[Path] = set()
+        for p in paths:
+            key = _stat_key(p)
+            if key != last[p]:
+                last[p] = key
+                changed.add(p)
+        if changed:
+            yield changed
+
+
+def iter_changes(
+    paths: list[Path],
+    *,
+    poll: bool = False,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    debounce: float = DEFAULT_DEBOUNCE,
+) -> Iterator[set[Path]]:
+    """Yield the set of changed paths each time any of them is written."""
+    paths = [p.resolve() for p in paths]
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            yield from _inotify_changes(paths, debounce)
+            return
+        except (OSError, AttributeError, TypeError) as e:
+            print(f"WARN: inotify unavailable ({e}); polling instead", file=sys.stderr)
+    yield from _poll_changes(paths, poll_interval)
+